@@ -69,6 +69,20 @@ BATTERY_CONFIG = {
     "cell_max_voltage": 4.0,         # 单体最大电压 (V) 
     "cell_min_voltage": 2.9,         # 单体最小电压 (V)
     "cell_cc_to_cv_voltage": 3.95,   # 单体CC-CV切换电压 (V)
+    "cell_count_parallel": 1,        # 每个串联单元的并联单体数
+
+    # 单体一致性与被动均衡参数 (SeriesPackModel)
+    "cell_capacity_spread": 0.02,      # 单体容量相对标准差
+    "cell_resistance_spread": 0.05,    # 单体内阻相对标准差
+    "balancing_current": 0.1,          # 被动均衡放电电流 (A)
+    "balancing_threshold": 0.01,       # 均衡启动压差 (V)
+    "cell_imbalance_threshold": 0.05,  # 单体不平衡告警压差 (V)
+
+    # 查找表CSV路径 (None 表示按上面的参数构造默认表)
+    # 文件格式: 表头 "soc,<T1>,<T2>,..."，每行 "<SOC>,<值@T1>,<值@T2>,..."
+    "ocv_table_path": None,   # OCV(SOC, T) (V)
+    "r0_table_path": None,    # R0(SOC, T) (Ω)
+    "r1_table_path": None,    # R1(SOC, T) (Ω)
 }
 
 # 模拟器配置
@@ -97,11 +111,58 @@ SIMULATOR_CONFIG = {
     # 默认循环数
     "default_cycle_count": 0,
     
+    # 是否启用单体级电池包模型 (SeriesPackModel)
+    "cell_model_enabled": False,
+    
+    # 仿真检查点文件 (服务器关闭时保存，启动时恢复；设为None禁用)
+    "checkpoint_path": os.path.join(BASE_DIR, "backend", "db", "simulator_checkpoint.npz"),
+    
+    # RUL 推理微批处理 (多个电池会话的预测请求合并为一次前向计算)
+    "rul_batching": {
+        "max_batch_size": 64,   # 每批最多请求数
+        "max_wait_ms": 5.0      # 第一个请求到达后最多等待的时间 (毫秒)
+    },
+    
+    # 充电中的记录保存在内存中，阶段切换、停止充电时以及每隔该时间 (秒) 按主键写入数据库
+    "charging_record_flush_interval": 5.0,
+    
+    # 是否记录充电过程的遥测数据 (每个周期的 SOC、电压、电流、温度)，随充电记录一起写入数据库
+    "record_telemetry": True,
+    
+    # RUL 模型权重的量化变体: None (float32)、"int8" 或 "float16"，由 NumPy 推理引擎加载
+    "rul_quantization": None,
+    
+    # RUL 预测缓存 (以缩放、量化后的输入窗口为键)
+    "rul_cache": {
+        "enabled": True,
+        "max_size": 4096,     # 最多缓存的窗口数
+        "tolerance": 1e-3,    # 量化步长 (缩放后的输入单位)，差异小于该值的窗口共用预测结果
+        "ttl": 60.0           # 缓存有效期 (秒)
+    },
+    
+    # RUL 重新计算的触发条件 (其余周期发布上一次的结果)
+    "rul_schedule": {
+        "interval": 60.0,                  # 最长重新计算间隔 (仿真秒)
+        "soc_delta": 1.0,                  # SOC 变化超过该值 (%) 时重新计算
+        "temperature_delta": 1.0,          # 温度变化超过该值 (°C) 时重新计算
+        "internal_resistance_delta": 0.002 # 内阻变化超过该值 (Ω) 时重新计算
+    },
+    
+    # RUL 预测 / 健康评估 / 充电参数计算的后台线程 (不在事件循环中执行)
+    "health_pipeline": {
+        "max_pending": 1,            # 待处理作业上限，计算跟不上时丢弃最旧的作业
+        "lag_probe_interval": 0.1    # 事件循环延迟探测间隔 (秒)
+    },
+    
     # 电池老化模型参数
     "aging_model": {
         "calendar_aging_factor": 0.001,  # 日历老化因子 (%/日)
         "cycle_aging_factor": 0.005,     # 循环老化因子 (%/满循环)
-        "temperature_aging_factor": 0.01  # 温度老化因子 (%/°C > 25°C)
+        "temperature_aging_factor": 0.01,  # 温度老化因子 (%/°C > 25°C)
+        "temperature_doubling_interval": 10.0,  # 老化速率翻倍的温升 (°C)，用于 AgingEngine
+        "dod_stress_exponent": 1.3,      # 放电深度应力指数 (>1 表示深循环每等效循环损伤更大)
+        "reference_temperature": 25.0,   # 老化参考温度 (°C)
+        "end_of_life_health": 80.0       # 寿命终止的健康状态阈值 (%)
     }
 }
 
@@ -116,5 +177,20 @@ WEBSOCKET_CONFIG = {
 # 数据库配置 (如果需要)
 DATABASE_CONFIG = {
     "url": os.path.join(BASE_DIR, "backend", "db", "battery_data.db"),
-    "connect_args": {"check_same_thread": False}
+    "connect_args": {"check_same_thread": False},
+    # 连接池: 每个线程复用一个读连接，写操作串行使用同一个写连接；False 时每次操作新建连接
+    "pool_connections": True,
+    # 每个连接创建时设置的 SQLite 参数
+    "journal_mode": "WAL",           # WAL 日志: 写入时读连接仍可并发读取
+    "synchronous": "NORMAL",         # WAL 模式下只在检查点时同步磁盘
+    "mmap_size": 256 * 1024 * 1024,  # 内存映射 I/O 大小 (字节)
+    "cache_size": -16000,            # 每个连接的页缓存大小 (负数表示 KiB)
+    "busy_timeout": 5.0,             # 等待其他连接释放锁的最长时间 (秒)
+    # 后台写入线程: 仿真周期中的充电记录写入放入队列，合并后批量提交
+    "write_behind": {
+        "enabled": True,
+        "max_queue": 10000,      # 队列中等待写入的项目数上限 (队列满时提交方阻塞)
+        "flush_size": 500,       # 每个事务最多包含的项目数
+        "flush_interval": 0.5    # 第一项入队后最多等待多少秒提交
+    }
 } 
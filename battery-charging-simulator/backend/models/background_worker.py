@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import deque
+import numpy as np
+
+import sys
+import os
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.rul_batcher import Histogram
+
+logger = logging.getLogger("battery-simulator")
+
+# 事件循环延迟直方图的桶上界 (毫秒)
+LAG_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# 通知工作线程退出的队列标记
+_STOP = object()
+
+
+class LatestResultWorker:
+    """在专用线程上执行耗时计算，调用方提交作业后立即返回，只读取最近一次完成的结果
+
+    作业队列有界 (max_pending)，计算跟不上提交速度时丢弃最旧的待处理作业，只计算最新的输入；
+    调用方 (事件循环) 不会因计算变慢而阻塞，始终发布最近一次完成的结果。
+    sequence 在每次完成计算后加一，调用方可据此判断结果是否为新结果。
+    """
+
+    def __init__(self, function, max_pending=1, name="background-worker"):
+        """初始化工作线程 (第一次提交作业时启动)
+
+        参数:
+            function: 在工作线程上执行的函数，参数为提交的作业，返回值作为最新结果
+            max_pending: 等待执行的作业数上限
+            name: 线程名
+        """
+        if max_pending < 1:
+            raise ValueError("max_pending 必须为正数")
+        self.function = function
+        self.name = name
+        self.max_pending = max_pending
+        self.result = None
+        self.sequence = 0
+        self.completed_at = None
+        self.last_duration = None
+        self.submitted = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """启动工作线程"""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """丢弃待处理的作业，等待当前作业完成后退出工作线程
+
+        参数:
+            timeout: 等待线程退出的最长秒数
+        """
+        if self._thread is None:
+            return
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"{self.name} 线程未在 {timeout} 秒内退出")
+        else:
+            self._thread = None
+
+    def submit(self, job):
+        """提交作业 (不阻塞)
+
+        返回:
+            accepted: 队列未满时为 True；队列已满时丢弃最旧的待处理作业后入队，返回 False
+        """
+        if not self.running:
+            self.start()
+        self.submitted += 1
+        return self._put(job)
+
+    def _put(self, item):
+        """放入队列，队列已满时丢弃最旧的项目 (只有一个提交方，丢弃后必定能放入)"""
+        accepted = True
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return accepted
+            except queue.Full:
+                accepted = False
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def latest(self):
+        """返回 (最近一次完成的结果, 序号)，尚无结果时为 (None, 0)"""
+        with self._lock:
+            return self.result, self.sequence
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            start = time.perf_counter()
+            try:
+                result = self.function(job)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"{self.name} 作业执行失败: {e}", exc_info=True)
+                continue
+            with self._lock:
+                self.result = result
+                self.sequence += 1
+                self.completed_at = time.time()
+                self.last_duration = time.perf_counter() - start
+
+    def metrics(self):
+        """导出工作线程统计"""
+        return {
+            "max_pending": self.max_pending,
+            "pending": self._queue.qsize(),
+            "submitted": self.submitted,
+            "completed": self.sequence,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "last_duration_ms": self.last_duration * 1000 if self.last_duration is not None else None,
+            "result_age": time.time() - self.completed_at if self.completed_at is not None else None,
+        }
+
+
+class EventLoopLagMonitor:
+    """测量 asyncio 事件循环的调度延迟
+
+    探测协程每隔 interval 秒休眠一次，实际唤醒时间超出 interval 的部分即为事件循环延迟
+    (期间事件循环被同步代码占用)。保留最近 window 个样本用于计算分位数。
+    """
+
+    def __init__(self, interval=0.1, window=600):
+        """初始化延迟监控
+
+        参数:
+            interval: 探测间隔 (秒)
+            window: 计算分位数使用的最近样本数
+        """
+        self.interval = interval
+        self.samples = deque(maxlen=window)
+        self.histogram = Histogram(LAG_BOUNDS_MS)
+        self.max_lag = 0.0
+        self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """在当前事件循环中启动探测协程"""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._probe())
+
+    async def stop(self):
+        """停止探测协程"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def reset(self):
+        """清空已记录的样本"""
+        self.samples.clear()
+        self.histogram = Histogram(LAG_BOUNDS_MS)
+        self.max_lag = 0.0
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - start - self.interval))
+
+    def record(self, lag):
+        """记录一个延迟样本 (秒)"""
+        self.samples.append(lag)
+        self.histogram.observe(lag * 1000)
+        self.max_lag = max(self.max_lag, lag)
+
+    def metrics(self):
+        """导出延迟统计 (毫秒)"""
+        samples = np.array(self.samples) * 1000 if self.samples else np.zeros(1)
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": self.histogram.count,
+            "p50_ms": float(np.percentile(samples, 50)),
+            "p99_ms": float(np.percentile(samples, 99)),
+            "max_ms": self.max_lag * 1000,
+            "histogram_ms": self.histogram.to_dict(),
+        }
@@ -0,0 +1,316 @@
+import copy
+import numpy as np
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 导入配置
+from config import BATTERY_CONFIG, SIMULATOR_CONFIG
+from models.lookup_tables import LookupTable2D, load_battery_tables
+from models.checkpoint import SimulationCheckpoint
+
+# 充电模式编码，数组中以 int8 存储
+CHARGING_MODES = ("none", "cc", "cv", "trickle")
+MODE_NONE = 0
+MODE_CC = 1
+MODE_CV = 2
+MODE_TRICKLE = 3
+
+# CV 阶段切换到涓流阶段的电流阈值 (A)，与 BatteryModel._update_charging 保持一致
+CV_TO_TRICKLE_SWITCH_CURRENT = 3.0
+
+# 逐包参数
+FLEET_PARAMETERS = (
+    "capacity", "nominal_voltage", "max_voltage", "min_voltage",
+    "max_charging_current", "max_discharging_current",
+    "cc_to_cv_voltage", "trickle_current", "ambient_temperature",
+)
+
+# 逐包状态数组
+FLEET_STATE = (
+    "soc", "voltage", "current", "temperature", "polarization_voltage",
+    "internal_resistance", "polarization_resistance",
+    "charging_mode", "is_charging", "is_discharging",
+)
+
+
+class BatteryFleet:
+    """批量电池仿真引擎，将成千上万个电池包的状态保存为连续的 NumPy 数组
+
+    每次 step(dt) 以掩码数组运算的方式完成 CC/CV/涓流状态机、戴维南 RC 电路
+    和热模型的更新，逻辑与 BatteryModel.update(elapsed_time=dt) 一一对应。
+    在相同参数和初始状态下，各状态量与 BatteryModel 的差异不超过 1e-6
+    (float64 舍入误差级别)。
+
+    不包含的部分: RUL 优化充电 (DynamicChargingController)、充电记录数据库写入、
+    时间加速因子 (dt 即为仿真时间)。
+    """
+
+    def __init__(self, size, soc=100.0, temperature=None, ocv_table=None, **params):
+        """初始化电池包阵列
+
+        参数:
+            size: 电池包数量
+            soc: 初始SOC (%)，标量或长度为 size 的数组
+            temperature: 初始温度 (°C)，默认等于环境温度
+            ocv_table: 所有电池包共用的 OCV(SOC, T) 查找表 (LookupTable2D)，
+                       默认按逐包电压参数使用分段线性模型
+            **params: 覆盖默认参数的逐包参数 (标量或数组)，可选键:
+                capacity, nominal_voltage, max_voltage, min_voltage,
+                max_charging_current, max_discharging_current,
+                cc_to_cv_voltage, trickle_current, ambient_temperature
+        """
+        self.size = int(size)
+
+        # 逐包参数 (允许每个电池包取不同的值，用于参数扫描)
+        defaults = {
+            "capacity": BATTERY_CONFIG["capacity"],
+            "nominal_voltage": BATTERY_CONFIG["nominal_voltage"],
+            "max_voltage": BATTERY_CONFIG["max_voltage"],
+            "min_voltage": BATTERY_CONFIG["min_voltage"],
+            "max_charging_current": BATTERY_CONFIG["max_charging_current"],
+            "max_discharging_current": BATTERY_CONFIG["max_discharging_current"],
+            "cc_to_cv_voltage": BATTERY_CONFIG["cc_to_cv_voltage"],
+            "trickle_current": BATTERY_CONFIG["trickle_current"],
+            "ambient_temperature": BATTERY_CONFIG["ambient_temperature"],
+        }
+        unknown = set(params) - set(defaults)
+        if unknown:
+            raise ValueError(f"未知的电池包参数: {sorted(unknown)}")
+        for name, default in defaults.items():
+            setattr(self, name, self._as_array(params.get(name, default)))
+
+        # 全局共享参数
+        self.default_internal_resistance = BATTERY_CONFIG["default_internal_resistance"]
+        self.default_polarization_resistance = BATTERY_CONFIG["polarization_resistance"]
+        self.polarization_capacitance = BATTERY_CONFIG["polarization_capacitance"]
+        self.thermal_capacity = BATTERY_CONFIG["thermal_capacity"]
+        self.thermal_resistance = BATTERY_CONFIG["thermal_resistance"]
+        self.temperature_coefficient = BATTERY_CONFIG["temperature_coefficient"]
+        battery_tables = load_battery_tables()
+        self.internal_resistance_table = battery_tables["internal_resistance"]
+        self.polarization_resistance_table = battery_tables["polarization_resistance"]
+        self.ocv_table = ocv_table
+        self.charging_efficiency = SIMULATOR_CONFIG["charging_efficiency"]
+        self.discharging_efficiency = SIMULATOR_CONFIG["discharging_efficiency"]
+        self.self_discharge_rate = SIMULATOR_CONFIG["self_discharge_rate"]
+
+        # 状态数组
+        self.soc = self._as_array(soc)
+        self.voltage = self.nominal_voltage.copy()
+        self.current = np.zeros(self.size)
+        self.temperature = self._as_array(self.ambient_temperature if temperature is None else temperature)
+        self.polarization_voltage = np.zeros(self.size)
+        self.internal_resistance = np.full(self.size, self.default_internal_resistance)
+        self.polarization_resistance = np.full(self.size, self.default_polarization_resistance)
+        self.charging_mode = np.zeros(self.size, dtype=np.int8)
+        self.is_charging = np.zeros(self.size, dtype=bool)
+        self.is_discharging = np.zeros(self.size, dtype=bool)
+
+    def _as_array(self, value):
+        """将标量或数组参数转换为长度为 size 的 float64 数组 (总是返回副本)"""
+        arr = np.array(value, dtype=np.float64)
+        if arr.ndim == 0:
+            return np.full(self.size, float(arr))
+        if arr.shape != (self.size,):
+            raise ValueError(f"参数形状 {arr.shape} 与电池包数量 {self.size} 不匹配")
+        return arr
+
+    def _select(self, mask):
+        """将 None/索引/布尔数组统一转换为布尔掩码"""
+        if mask is None:
+            return np.ones(self.size, dtype=bool)
+        mask = np.asarray(mask)
+        if mask.dtype == bool:
+            return mask
+        selected = np.zeros(self.size, dtype=bool)
+        selected[mask] = True
+        return selected
+
+    def start_charging(self, mask=None):
+        """开始充电 (进入恒流模式)
+
+        参数:
+            mask: 布尔掩码或索引数组，None 表示全部电池包
+        """
+        mask = self._select(mask) & ~self.is_charging
+        self.stop_discharging(mask)
+        self.is_charging[mask] = True
+        self.charging_mode[mask] = MODE_CC
+
+    def stop_charging(self, mask=None):
+        """停止充电"""
+        mask = self._select(mask) & self.is_charging
+        self.is_charging[mask] = False
+        self.current[mask] = 0.0
+        self.charging_mode[mask] = MODE_NONE
+
+    def start_discharging(self, mask=None):
+        """开始放电"""
+        mask = self._select(mask) & ~self.is_discharging
+        self.stop_charging(mask)
+        self.is_discharging[mask] = True
+        self.charging_mode[mask] = MODE_NONE
+
+    def stop_discharging(self, mask=None):
+        """停止放电"""
+        mask = self._select(mask) & self.is_discharging
+        self.is_discharging[mask] = False
+        self.current[mask] = 0.0
+
+    def calculate_ocv(self, soc, mask=None):
+        """根据SOC计算开路电压，分段线性模型与 BatteryModel._calculate_ocv_from_soc 相同
+
+        参数:
+            soc: SOC数组 (%)
+            mask: 若 soc 只对应部分电池包，传入对应的布尔掩码
+        """
+        select = slice(None) if mask is None else mask
+        if self.ocv_table is not None:
+            return self.ocv_table.interp(soc, self.temperature[select])
+        min_v = self.min_voltage[select]
+        nominal_v = self.nominal_voltage[select]
+        cc_to_cv_v = self.cc_to_cv_voltage[select]
+        max_v = self.max_voltage[select]
+
+        soc = np.clip(soc, 0, 100)
+        low = min_v + (nominal_v - min_v) * soc / 10
+        mid = nominal_v + (cc_to_cv_v - nominal_v) * (soc - 10) / 80
+        high = cc_to_cv_v + (max_v - cc_to_cv_v) * (soc - 90) / 10
+        return np.where(soc <= 10, low, np.where(soc <= 90, mid, high))
+
+    def step(self, dt):
+        """将所有电池包向前推进 dt 秒
+
+        参数:
+            dt: 仿真时间步长 (秒)
+        """
+        charging = self.is_charging.copy()
+        discharging = self.is_discharging & ~charging
+        idle = ~charging & ~discharging
+        mode = self.charging_mode.copy()
+
+        # ---- 充电状态机 ----
+        # 无充电模式的电池包先进入恒流模式，本步不累计SOC
+        self.charging_mode[charging & (mode == MODE_NONE)] = MODE_CC
+
+        cc = charging & (mode == MODE_CC)
+        self.current[cc] = self.max_charging_current[cc]
+        self.charging_mode[cc & (self.voltage >= self.cc_to_cv_voltage)] = MODE_CV
+
+        cv = charging & (mode == MODE_CV)
+        if cv.any():
+            ocv = self.calculate_ocv(self.soc[cv], cv)
+            cv_current = (self.max_voltage[cv] - ocv) / self.internal_resistance[cv]
+            cv_current = np.maximum(0, np.minimum(cv_current, self.max_charging_current[cv]))
+            self.current[cv] = cv_current
+            to_trickle = np.flatnonzero(cv)[cv_current < CV_TO_TRICKLE_SWITCH_CURRENT]
+            self.charging_mode[to_trickle] = MODE_TRICKLE
+
+        trickle = charging & (mode == MODE_TRICKLE)
+        if trickle.any():
+            soc = self.soc[trickle]
+            trickle_current = self.trickle_current[trickle]
+            trickle_current = np.where(soc > 99.0, trickle_current * (100 - soc) / 1.0, trickle_current)
+            self.current[trickle] = trickle_current
+            # SOC 达到 100% 的电池包停止充电，本步不再累计SOC
+            finished = np.flatnonzero(trickle)[soc >= 99.99]
+            self.stop_charging(finished)
+            trickle[finished] = False
+
+        integrating = cc | cv | trickle
+        soc_increment = (self.current * dt / 3600) / self.capacity * 100 * self.charging_efficiency
+        self.soc = np.where(integrating, np.minimum(100, self.soc + soc_increment), self.soc)
+
+        # ---- 放电 ----
+        self.current[discharging] = -self.max_discharging_current[discharging]
+        soc_decrement = (np.abs(self.current) * dt / 3600) / self.capacity * 100 / self.discharging_efficiency
+        self.soc = np.where(discharging, np.maximum(0, self.soc - soc_decrement), self.soc)
+        self.stop_discharging(discharging & (self.soc <= 5))
+
+        # ---- 待机自放电 ----
+        self.soc = np.where(idle, np.maximum(0, self.soc - self.self_discharge_rate * (dt / 3600)), self.soc)
+        self.current[idle] = 0
+
+        # ---- 电压 (戴维南 RC 模型) ----
+        ocv = self.calculate_ocv(self.soc)
+        exp_factor = np.exp(-dt / (self.polarization_resistance * self.polarization_capacitance))
+        self.polarization_voltage = self.polarization_voltage * exp_factor + \
+            self.current * self.polarization_resistance * (1 - exp_factor)
+        active = self.is_charging | self.is_discharging
+        voltage = np.where(active, ocv + self.current * self.internal_resistance + self.polarization_voltage,
+                           ocv + self.polarization_voltage)
+        self.voltage = np.maximum(self.min_voltage, np.minimum(voltage, self.max_voltage))
+
+        # ---- 温度 ----
+        joule_heat = self.current ** 2 * (self.internal_resistance + self.polarization_resistance * 0.5) * dt
+        heat_dissipation = (self.temperature - self.ambient_temperature) / self.thermal_resistance * dt
+        self.temperature = self.temperature + (joule_heat - heat_dissipation) / self.thermal_capacity
+        self.internal_resistance = self.internal_resistance_table.interp(self.soc, self.temperature)
+        self.polarization_resistance = self.polarization_resistance_table.interp(self.soc, self.temperature)
+
+        # ---- 边界检查 ----
+        self.soc = np.clip(self.soc, 0, 100)
+        self.current = np.where(self.is_charging, np.clip(self.current, 0, self.max_charging_current), self.current)
+        self.current = np.where(self.is_discharging, np.clip(self.current, -self.max_discharging_current, 0),
+                                self.current)
+
+    def get_state(self, index):
+        """获取单个电池包的状态字典 (字段与 BatteryModel.get_state 的物理量部分一致)"""
+        return {
+            "soc": float(self.soc[index]),
+            "voltage": float(self.voltage[index]),
+            "current": float(self.current[index]),
+            "temperature": float(self.temperature[index]),
+            "internal_resistance": float(self.internal_resistance[index]),
+            "polarization_resistance": float(self.polarization_resistance[index]),
+            "polarization_voltage": float(self.polarization_voltage[index]),
+            "is_charging": bool(self.is_charging[index]),
+            "is_discharging": bool(self.is_discharging[index]),
+            "charging_mode": CHARGING_MODES[self.charging_mode[index]],
+            "ambient_temperature": float(self.ambient_temperature[index]),
+        }
+
+    # ---- 检查点 ----
+
+    def checkpoint(self):
+        """生成包含全部逐包参数和状态数组的检查点 (数组为副本)"""
+        arrays = {name: getattr(self, name).copy() for name in FLEET_PARAMETERS + FLEET_STATE}
+        children = {}
+        if self.ocv_table is not None:
+            children["ocv_table"] = SimulationCheckpoint(
+                "lookup_table",
+                {"soc_axis": self.ocv_table.soc_axis, "temperature_axis": self.ocv_table.temperature_axis,
+                 "values": self.ocv_table.values},
+                {"name": self.ocv_table.name},
+            )
+        return SimulationCheckpoint("battery_fleet", arrays, {"size": self.size}, children)
+
+    def restore(self, checkpoint):
+        """从检查点恢复全部逐包参数和状态 (电池包数量随检查点改变)
+
+        参数:
+            checkpoint: BatteryFleet.checkpoint() 生成的 SimulationCheckpoint
+        """
+        checkpoint.expect("battery_fleet")
+        self.size = int(checkpoint.meta["size"])
+        for name in FLEET_PARAMETERS + FLEET_STATE:
+            setattr(self, name, checkpoint.arrays[name].copy())
+        table = checkpoint.children.get("ocv_table")
+        self.ocv_table = None if table is None else LookupTable2D(
+            table.arrays["soc_axis"], table.arrays["temperature_axis"], table.arrays["values"], table.meta["name"])
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint):
+        """由检查点创建新的 BatteryFleet"""
+        fleet = cls(int(checkpoint.meta["size"]))
+        fleet.restore(checkpoint)
+        return fleet
+
+    def fork(self):
+        """在内存中复制当前电池包阵列 (状态数组独立，查找表共享)，用于从同一状态分叉仿真"""
+        forked = copy.copy(self)
+        for name in FLEET_PARAMETERS + FLEET_STATE:
+            setattr(forked, name, getattr(self, name).copy())
+        return forked
@@ -1,6 +1,7 @@
 import time
 import math
 import json
+import copy
 import numpy as np
 from datetime import datetime
 import sys
@@ -11,14 +12,49 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # 导入配置和模型
 from config import BATTERY_CONFIG, SIMULATOR_CONFIG
 from models.dynamic_charging_controller import DynamicChargingController
+from models.lookup_tables import build_ocv_table, load_battery_tables, load_ocv_table
+from models.battery_state import BatteryState
+from models.history_buffer import HistoryRingBuffer
+from models.checkpoint import SimulationCheckpoint
+from models.sim_clock import SimulatedClock
 # 从本地models目录导入database模块
-from models.database import add_charging_record, update_charging_record, get_all_charging_records
+from models.database import get_all_charging_records
+from models.db_writer import add_charging_record, update_charging_record, append_telemetry
+
+# 检查点中以 float64 向量保存的数值状态 (参数、物理状态、健康状态和充电标志)
+CHECKPOINT_FIELDS = (
+    "capacity", "nominal_voltage", "max_voltage", "min_voltage",
+    "max_charging_current", "max_discharging_current",
+    "cc_to_cv_voltage", "cv_to_trickle_current", "trickle_current", "trickle_voltage",
+    "polarization_capacitance", "ambient_temperature",
+    "soc", "voltage", "current", "temperature",
+    "internal_resistance", "polarization_resistance", "polarization_voltage",
+    "cycle_count", "health", "estimated_rul",
+    "is_charging", "is_discharging", "rul_optimized_charging",
+    "simulated_time",
+)
+
+# 以布尔值恢复的字段
+_CHECKPOINT_FLAGS = ("is_charging", "is_discharging", "rul_optimized_charging")
+
 
 class BatteryModel:
     """比亚迪秦L EV电池模型类，用于模拟电池物理特性和状态变化"""
     
-    def __init__(self):
-        """初始化电池模型参数"""
+    def __init__(self, clock=None, persist_records=True, cell_pack=None):
+        """初始化电池模型参数
+        
+        参数:
+            clock: 时间源，返回当前时间(秒)的可调用对象，默认为 time.time；
+                   注入 SimulatedClock 时由时钟决定仿真时间，不再应用时间加速因子
+            persist_records: 是否将充电记录写入数据库，离线仿真时设为 False
+            cell_pack: 可选的 SeriesPackModel，按整包电流同步仿真各单体状态
+        """
+        # 时间源
+        self.clock = clock or time.time
+        self.use_time_acceleration = clock is None
+        self.persist_records = persist_records
+        
         # 基本参数
         self.capacity = BATTERY_CONFIG["capacity"]  # 电池容量 (Ah)
         self.nominal_voltage = BATTERY_CONFIG["nominal_voltage"]  # 标称电压 (V)
@@ -44,6 +80,12 @@ class BatteryModel:
         self.polarization_capacitance = BATTERY_CONFIG["polarization_capacitance"]  # 极化电容 C1 (F)
         self.polarization_voltage = 0.0  # 极化电压 (V) - RC电路上的电压
         
+        # 查找表: R0/R1(SOC, T) 在所有实例间共享；OCV 表未配置 CSV 时按电压参数构造
+        battery_tables = load_battery_tables()
+        self.internal_resistance_table = battery_tables["internal_resistance"]
+        self.polarization_resistance_table = battery_tables["polarization_resistance"]
+        self._refresh_ocv_table()
+        
         # 效率参数
         self.charging_efficiency = SIMULATOR_CONFIG["charging_efficiency"]  # 充电效率
         self.discharging_efficiency = SIMULATOR_CONFIG["discharging_efficiency"]  # 放电效率
@@ -71,10 +113,12 @@ class BatteryModel:
         self.current_charging_record_id = None  # 当前充电记录ID
         self.current_charging_record = None  # 当前充电记录（内存中的副本）
         self.current_charging_phase = None  # 当前充电阶段
+        self.last_record_flush = None  # 当前充电记录上次写入数据库的时间 (模型时钟)
+        self.telemetry_buffer = []  # 尚未写入数据库的遥测样本 (t, soc, voltage, current, temperature)
         
         # 电池历史数据
-        self.battery_history = []  # 电池历史数据
         self.max_history_length = 100  # 最大历史数据长度
+        self.battery_history = HistoryRingBuffer(self.max_history_length)  # 电池历史数据 (环形缓冲区)
         
         # RUL 优化充电
         self.rul_optimized_charging = False  # 默认禁用 RUL 优化充电
@@ -82,8 +126,18 @@ class BatteryModel:
         # 动态充电控制器
         self.dynamic_charging_controller = DynamicChargingController()
         
+        # 单体级电池包模型 (可选)
+        self.cell_pack = cell_pack
+        if self.cell_pack is not None:
+            self.cell_pack.reset(self.soc, self.temperature)
+        
         # 上次更新时间
-        self.last_update_time = time.time()
+        self.last_update_time = self.clock()
+        # 累计仿真时间 (秒，已乘时间加速因子)
+        self.simulated_time = 0.0
+        
+        # 最近一次更新生成的状态快照 (每个周期一个，由控制器、历史记录和广播共享)
+        self.state = self.snapshot()
         
     def update(self, elapsed_time=None):
         """更新电池状态
@@ -92,14 +146,16 @@ class BatteryModel:
             elapsed_time: 经过的时间(秒)，如果为None则自动计算
         """
         # 计算经过的时间
-        current_time = time.time()
+        current_time = self.clock()
         if elapsed_time is None:
             elapsed_time = current_time - self.last_update_time
             
         # 应用时间加速因子
-        elapsed_time = elapsed_time * SIMULATOR_CONFIG["time_acceleration_factor"]
+        if self.use_time_acceleration:
+            elapsed_time = elapsed_time * SIMULATOR_CONFIG["time_acceleration_factor"]
             
         self.last_update_time = current_time
+        self.simulated_time += elapsed_time
         
         # 充电或放电逻辑
         if self.is_charging:
@@ -110,41 +166,31 @@ class BatteryModel:
             # 待机状态，考虑自放电
             self._update_idle(elapsed_time)
         
-        # 更新电压和温度
-        self._update_voltage()
+        # 更新电压和温度 (RC电路与SOC、温度使用同一仿真时间步长)
+        self._update_voltage(elapsed_time)
         self._update_temperature(elapsed_time)
         
         # 检查电池状态边界
         self._check_boundaries()
         
-        # 记录电池历史数据
+        # 单体状态与整包电流同步
+        if self.cell_pack is not None:
+            self.cell_pack.step(self.current, elapsed_time)
+        
+        # 生成本周期的状态快照并记录历史数据
+        self.state = self.snapshot()
         self._record_history()
         
-        return self.get_state()
+        return self.state
     
     def _record_history(self):
-        """记录电池历史数据"""
-        # 获取当前状态
-        state = self.get_state()
-        
-        # 添加到历史数据
-        self.battery_history.append({
-            "timestamp": time.time(),
-            "soc": state["soc"],
-            "voltage": state["voltage"],
-            "current": state["current"],
-            "temperature": state["temperature"],
-            "charging_mode": state["charging_mode"]
-        })
-        
-        # 限制历史数据长度
-        if len(self.battery_history) > self.max_history_length:
-            self.battery_history = self.battery_history[-self.max_history_length:]
+        """记录电池历史数据 (O(1) 追加到环形缓冲区，最旧的记录被自动覆盖)"""
+        self.battery_history.append(self.state, self.clock())
     
     def _update_charging(self, elapsed_time):
         """更新充电状态"""
-        # 获取当前状态
-        battery_state = self.get_state()
+        # 控制器读取上一周期末的快照 (与本周期更新前的状态相同)，不再另外生成快照
+        battery_state = self.state
         
         # 根据不同的充电模式计算充电电流
         if self.charging_mode == "cc":  # 恒流充电
@@ -231,13 +277,18 @@ class BatteryModel:
         self.soc = max(0, self.soc - soc_decrement)
         self.current = 0
     
-    def _update_voltage(self):
-        """更新电池电压"""
+    def _update_voltage(self, dt=None):
+        """更新电池电压
+        
+        参数:
+            dt: RC电路的时间步长(秒)，如果为None则根据上次更新时间自动计算
+        """
         # 根据SOC计算开路电压
         ocv = self._calculate_ocv_from_soc(self.soc)
         
         # 计算时间步长 (秒)
-        dt = time.time() - self.last_update_time
+        if dt is None:
+            dt = self.clock() - self.last_update_time
         if dt <= 0:
             dt = 0.1  # 防止除零错误，设置一个默认值
         
@@ -276,10 +327,9 @@ class BatteryModel:
         # 更新温度
         self.temperature += temperature_change
         
-        # 温度对内阻的影响
-        temp_factor = 1 + self.temperature_coefficient * (self.temperature - 25)
-        self.internal_resistance = BATTERY_CONFIG["default_internal_resistance"] * temp_factor
-        self.polarization_resistance = BATTERY_CONFIG["polarization_resistance"] * temp_factor
+        # 温度对内阻的影响 (查表，与 BatteryFleet 使用同一组 R0/R1 表)
+        self.internal_resistance = self.internal_resistance_table.lookup(self.soc, self.temperature)
+        self.polarization_resistance = self.polarization_resistance_table.lookup(self.soc, self.temperature)
     
     def _check_boundaries(self):
         """检查电池状态边界"""
@@ -298,21 +348,15 @@ class BatteryModel:
     def _calculate_ocv_from_soc(self, soc):
         """根据SOC计算开路电压
         
-        使用简化的分段线性模型
+        查询 OCV(SOC, T) 表；默认表为分段线性模型，断点为
+        (0%, 最小电压)、(10%, 标称电压)、(90%, CC-CV切换电压)、(100%, 最大电压)
         """
-        # 将SOC限制在0-100之间
-        soc = max(0, min(soc, 100))
-        
-        # 分段线性模型
-        if soc <= 10:
-            # 低SOC区域
-            return self.min_voltage + (self.nominal_voltage - self.min_voltage) * soc / 10
-        elif soc <= 90:
-            # 中SOC区域
-            return self.nominal_voltage + (self.cc_to_cv_voltage - self.nominal_voltage) * (soc - 10) / 80
-        else:
-            # 高SOC区域
-            return self.cc_to_cv_voltage + (self.max_voltage - self.cc_to_cv_voltage) * (soc - 90) / 10
+        return self.ocv_table.lookup(soc, self.temperature)
+    
+    def _refresh_ocv_table(self):
+        """电压参数变化后重建默认 OCV 表 (从CSV加载的表保持不变)"""
+        self.ocv_table = load_ocv_table() or build_ocv_table(
+            self.min_voltage, self.nominal_voltage, self.cc_to_cv_voltage, self.max_voltage)
     
     def _switch_charging_mode(self, mode):
         """切换充电模式
@@ -326,7 +370,7 @@ class BatteryModel:
         
         # 结束当前充电阶段
         if self.current_charging_phase:
-            self.current_charging_phase["end_time"] = datetime.now().isoformat()
+            self.current_charging_phase["end_time"] = self._now_isoformat()
         
         # 更新充电模式
         self.charging_mode = mode
@@ -338,7 +382,7 @@ class BatteryModel:
         # 创建新的充电阶段
         new_phase = {
             "phase": mode,
-            "start_time": datetime.now().isoformat(),
+            "start_time": self._now_isoformat(),
             "end_time": None,
             "initial_soc": self.soc,
             "initial_temperature": self.temperature
@@ -359,6 +403,8 @@ class BatteryModel:
                 self.current_charging_record["charging_phases"] = []
             self.current_charging_record["charging_phases"].append(new_phase)
             self.current_charging_phase = new_phase
+            # 阶段切换立即写入数据库
+            self._update_current_charging_record(flush=True)
     
     def start_charging(self):
         """开始充电"""
@@ -374,7 +420,7 @@ class BatteryModel:
         
         # 创建新的充电记录
         self.current_charging_record = {
-            "start_time": datetime.now().isoformat(),
+            "start_time": self._now_isoformat(),
             "initial_soc": self.soc,
             "initial_temperature": self.temperature,
             "initial_internal_resistance": self.internal_resistance,
@@ -383,7 +429,8 @@ class BatteryModel:
         }
         
         # 将记录添加到数据库
-        self.current_charging_record_id = add_charging_record(self.current_charging_record)
+        if self.persist_records:
+            self.current_charging_record_id = add_charging_record(self.current_charging_record)
         
         # 切换到恒流充电模式
         self._switch_charging_mode("cc")
@@ -401,7 +448,7 @@ class BatteryModel:
         
         # 结束当前充电阶段
         if self.current_charging_phase:
-            self.current_charging_phase["end_time"] = datetime.now().isoformat()
+            self.current_charging_phase["end_time"] = self._now_isoformat()
             
         # 更新数据库中的充电记录
         self._update_current_charging_record(is_final=True)
@@ -472,6 +519,10 @@ class BatteryModel:
             self.internal_resistance = params["internal_resistance"]
         if "ambient_temperature" in params:
             self.ambient_temperature = params["ambient_temperature"]
+        if {"nominal_voltage", "max_voltage", "min_voltage"} & set(params):
+            self._refresh_ocv_table()
+        # 参数变化后刷新快照，下一周期的控制器读取新参数
+        self.state = self.snapshot()
     
     def update_charging_params(self, params):
         """更新充电参数，基于 RUL 预测结果
@@ -491,6 +542,7 @@ class BatteryModel:
             # 更新恒压充电电压和涓流充电电压
             self.cc_to_cv_voltage = params["cv_voltage"] * 0.98  # 略低于恒压充电电压
             self.max_voltage = params["cv_voltage"]
+            self._refresh_ocv_table()
         
         if "trickle_current" in params:
             # 更新涓流充电电流
@@ -499,62 +551,24 @@ class BatteryModel:
         if "termination_current" in params:
             # 更新恒压充电终止电流
             self.cv_to_trickle_current = params["termination_current"] * self.capacity
+        
+        # 参数变化后刷新快照，下一周期的控制器读取新参数
+        self.state = self.snapshot()
+    
+    def snapshot(self):
+        """生成当前状态的快照 (BatteryState)，派生的显示字段在读取时才计算"""
+        return BatteryState(
+            self.soc, self.voltage, self.current, self.temperature, self.internal_resistance,
+            self.is_charging, self.is_discharging, self.charging_mode,
+            self.cycle_count, self.health, self.estimated_rul, self.ambient_temperature,
+            self.max_charging_current, self.cc_to_cv_voltage, self.max_voltage, self.trickle_current,
+            self.trickle_voltage, self.polarization_resistance, self.polarization_capacitance,
+            self.polarization_voltage, SIMULATOR_CONFIG["time_acceleration_factor"], self.rul_optimized_charging,
+            self.cell_pack.get_statistics() if self.cell_pack is not None else None)
     
     def get_state(self):
-        """获取电池状态"""
-        # 获取时间加速因子
-        time_acceleration_factor = SIMULATOR_CONFIG["time_acceleration_factor"]
-        
-        # 计算显示电流和电压
-        display_current = self.current
-        display_voltage = self.voltage
-        
-        # 如果是充电或放电状态，调整显示电流以反映时间加速因子
-        if self.is_charging or self.is_discharging:
-            display_current = self.current * time_acceleration_factor
-            
-            # 如果是恒压充电模式，电压保持不变
-            if not (self.is_charging and self.charging_mode == "cv"):
-                # 计算因电流变化导致的额外电压变化
-                r_total = self.internal_resistance + self.polarization_resistance * 0.5
-                delta_v = (display_current - self.current) * r_total
-                display_voltage = self.voltage + delta_v
-        
-        return {
-            "soc": self.soc,
-            "voltage": self.voltage,
-            "current": self.current,
-            "temperature": self.temperature,
-            "internal_resistance": self.internal_resistance,
-            "is_charging": self.is_charging,
-            "is_discharging": self.is_discharging,
-            "charging_mode": self.charging_mode,
-            "charging_current": max(0, self.current) if self.is_charging else 0,  # 充电电流
-            "discharging_current": abs(min(0, self.current)) if self.is_discharging else 0,  # 放电电流
-            "charging_voltage": self.voltage if self.is_charging else 0,
-            "cycle_count": self.cycle_count,
-            "health": self.health,
-            "estimated_rul": self.estimated_rul,
-            "ambient_temperature": self.ambient_temperature,
-            
-            # 添加充电控制所需参数
-            "max_charging_current": self.max_charging_current,
-            "cc_to_cv_voltage": self.cc_to_cv_voltage,
-            "max_voltage": self.max_voltage,
-            "trickle_current": self.trickle_current,
-            "trickle_voltage": self.trickle_voltage,
-            "polarization_resistance": self.polarization_resistance,
-            "polarization_capacitance": self.polarization_capacitance,
-            "polarization_voltage": self.polarization_voltage,
-            
-            # 添加显示电流和电压（考虑时间加速因子）
-            "display_current": display_current,
-            "display_voltage": display_voltage,
-            "time_acceleration_factor": time_acceleration_factor,
-            
-            # 添加RUL优化充电状态
-            "rul_optimized_charging": self.rul_optimized_charging
-        }
+        """获取电池状态字典 (序列化边界使用；周期内请使用 update() 返回的快照或 self.state)"""
+        return self.snapshot().to_dict()
     
     def get_charging_records(self):
         """获取充电记录"""
@@ -572,43 +586,170 @@ class BatteryModel:
         self.internal_resistance = BATTERY_CONFIG["default_internal_resistance"]
         self.polarization_resistance = BATTERY_CONFIG["polarization_resistance"]
         self.polarization_voltage = 0.0  # 重置极化电压
-        self.last_update_time = time.time()
+        self.last_update_time = self.clock()
+        if self.cell_pack is not None:
+            self.cell_pack.reset(self.soc, self.temperature)
+        self.state = self.snapshot()
         
         return True 
 
-    def _update_current_charging_record(self, is_final=False):
-        """更新当前充电记录到数据库"""
-        if not self.current_charging_record_id:
-            return
+    def checkpoint(self):
+        """生成当前仿真状态的检查点
 
-        # 获取完整的充电记录
-        records = get_all_charging_records()
-        current_record = next((r for r in records if r['id'] == self.current_charging_record_id), None)
-        
-        if not current_record:
-            return
+        包含参数与物理状态、循环次数与健康状态、充电模式与 RUL 优化开关、
+        当前充电记录ID及内存中的充电记录、历史数据缓冲区，以及单体级电池包状态 (如启用)。
 
-        # 更新记录
-        updates = {
-            'end_time': datetime.now().isoformat(),
-            'final_soc': self.soc,
-            'final_temperature': self.temperature,
-            'charging_phases': current_record['charging_phases']
+        返回:
+            checkpoint: SimulationCheckpoint，可 save() 到文件或 fork() 分叉
+        """
+        phases = (self.current_charging_record or {}).get("charging_phases", [])
+        phase_index = next((i for i, phase in enumerate(phases) if phase is self.current_charging_phase), None)
+        meta = {
+            "time": self.clock(),
+            "charging_mode": self.charging_mode,
+            "current_charging_record_id": self.current_charging_record_id,
+            "current_charging_record": self.current_charging_record,
+            "current_charging_phase_index": phase_index,
+            "history_fields": list(self.battery_history.fields),
         }
+        arrays = {
+            "state": np.array([float(getattr(self, name)) for name in CHECKPOINT_FIELDS]),
+            "history": self.battery_history.window().copy(),
+        }
+        children = {}
+        if self.cell_pack is not None:
+            children["cell_pack"] = self.cell_pack.checkpoint()
+        return SimulationCheckpoint("battery_model", arrays, meta, children)
+
+    def restore(self, checkpoint):
+        """从检查点恢复仿真状态
+
+        注入 SimulatedClock 时，时钟回到检查点时间；使用真实时间时，从当前时刻继续，
+        停机期间不计入仿真。检查点包含单体状态而本模型未启用单体模型时忽略单体状态。
+
+        参数:
+            checkpoint: BatteryModel.checkpoint() 生成的 SimulationCheckpoint
+        """
+        checkpoint.expect("battery_model")
+        meta = checkpoint.meta
+        for name, value in zip(CHECKPOINT_FIELDS, checkpoint.arrays["state"].tolist()):
+            setattr(self, name, bool(value) if name in _CHECKPOINT_FLAGS else value)
+        self.charging_mode = meta["charging_mode"]
+        self._refresh_ocv_table()
+
+        # 充电记录: 当前阶段指向记录中的同一个字典，以便阶段更新同步到记录
+        self.current_charging_record_id = meta["current_charging_record_id"]
+        self.current_charging_record = copy.deepcopy(meta["current_charging_record"])
+        self.last_record_flush = None
+        self.telemetry_buffer = []
+        phase_index = meta["current_charging_phase_index"]
+        self.current_charging_phase = None if phase_index is None else \
+            self.current_charging_record["charging_phases"][phase_index]
+
+        # 历史数据
+        self.battery_history = HistoryRingBuffer(self.max_history_length, meta["history_fields"])
+        self.battery_history.extend(checkpoint.arrays["history"][-self.max_history_length:])
+
+        # 单体级电池包
+        if self.cell_pack is not None:
+            if "cell_pack" in checkpoint.children:
+                self.cell_pack.restore(checkpoint.children["cell_pack"])
+            else:
+                self.cell_pack.reset(self.soc, self.temperature)
+
+        if isinstance(self.clock, SimulatedClock):
+            self.clock.reset(meta["time"])
+        self.last_update_time = self.clock()
+        self.state = self.snapshot()
+        return True
+
+    def save_checkpoint(self, path):
+        """将当前仿真状态保存为 .npz 检查点文件"""
+        self.checkpoint().save(path)
+
+    def load_checkpoint(self, path):
+        """从 .npz 检查点文件恢复仿真状态"""
+        return self.restore(SimulationCheckpoint.load(path))
+
+    def fork(self, clock=None):
+        """在内存中分叉当前模型，用于从同一状态继续仿真多个假设情景而无需重新仿真前段
+
+        分叉模型的状态、历史数据、充电记录副本和单体级电池包相互独立，查找表和充电控制器共享。
+        分叉模型不写入数据库 (persist_records=False，不关联充电记录ID)。
+
+        参数:
+            clock: 分叉模型的时间源；默认时 SimulatedClock 复制为独立时钟，真实时间共享 time.time
+
+        返回:
+            model: 新的 BatteryModel
+        """
+        forked = copy.copy(self)
+        if clock is None:
+            clock = copy.copy(self.clock) if isinstance(self.clock, SimulatedClock) else self.clock
+        forked.clock = clock
+        forked.persist_records = False
+        forked.current_charging_record_id = None
+        forked.current_charging_record = copy.deepcopy(self.current_charging_record)
+        if self.current_charging_phase is not None and forked.current_charging_record is not None:
+            phases = self.current_charging_record["charging_phases"]
+            index = next((i for i, phase in enumerate(phases) if phase is self.current_charging_phase), None)
+            forked.current_charging_phase = None if index is None else \
+                forked.current_charging_record["charging_phases"][index]
+        else:
+            forked.current_charging_phase = copy.deepcopy(self.current_charging_phase)
+        forked.battery_history = self.battery_history.copy()
+        if self.cell_pack is not None:
+            forked.cell_pack = self.cell_pack.fork()
+        return forked
+
+    def _now_isoformat(self):
+        """按模型时间源返回当前时间的ISO格式字符串"""
+        return datetime.fromtimestamp(self.clock()).isoformat()
+
+    def _update_current_charging_record(self, is_final=False, flush=False):
+        """更新内存中的当前充电记录，阶段切换、停止充电时以及每隔
+        SIMULATOR_CONFIG["charging_record_flush_interval"] 秒按主键写入数据库
         
-        # 更新当前充电阶段
-        if self.current_charging_phase:
-            # 查找并更新阶段
-            for phase in updates['charging_phases']:
-                if phase['phase'] == self.current_charging_phase['phase'] and phase['end_time'] is None:
-                    phase.update(self.current_charging_phase)
-                    break
+        每个周期只更新内存中的记录并缓存一个遥测样本，开销与数据库中已有的记录数无关；
+        缓存的遥测样本随记录一起批量写入。
+        
+        没有充电记录ID (离线仿真、分叉模型) 时只更新内存中的记录，不写入数据库。
         
-        update_charging_record(self.current_charging_record_id, updates)
+        参数:
+            is_final: 是否为停止充电时的最终更新 (同时更新循环次数和健康状态)
+            flush: 是否立即写入数据库
+        """
+        record = self.current_charging_record
+        if record is None:
+            return
+
+        # 更新内存中的记录 (当前阶段是 charging_phases 中的同一个对象，无需再查找)
+        now = self.clock()
+        record["end_time"] = self._now_isoformat()
+        record["final_soc"] = self.soc
+        record["final_temperature"] = self.temperature
+        persist = bool(self.current_charging_record_id)
+        if persist and SIMULATOR_CONFIG.get("record_telemetry", False):
+            self.telemetry_buffer.append((now, self.soc, self.voltage, self.current, self.temperature))
+
+        interval = SIMULATOR_CONFIG.get("charging_record_flush_interval", 0.0)
+        if persist and (is_final or flush or self.last_record_flush is None or now - self.last_record_flush >= interval):
+            if self.telemetry_buffer:
+                append_telemetry(self.current_charging_record_id, self.telemetry_buffer)
+                self.telemetry_buffer = []
+            update_charging_record(self.current_charging_record_id, {
+                "start_time": record["start_time"],
+                "end_time": record["end_time"],
+                "final_soc": record["final_soc"],
+                "final_temperature": record["final_temperature"],
+                "charging_phases": record.get("charging_phases", []),
+            })
+            self.last_record_flush = now
 
         if is_final:
+            self.last_record_flush = None
             # 更新循环次数和健康状态
-            if updates["final_soc"] - current_record["initial_soc"] > 5:
-                delta_soc = updates["final_soc"] - current_record["initial_soc"]
+            if record["final_soc"] - record["initial_soc"] > 5:
+                delta_soc = record["final_soc"] - record["initial_soc"]
                 self.cycle_count += delta_soc / 100
                 self._update_health() 
\ No newline at end of file
@@ -0,0 +1,174 @@
+import json
+
+
+class BatteryState:
+    """电池状态快照 (使用 __slots__ 的紧凑对象)
+
+    BatteryModel.update() 每个周期只生成一个快照，由充电控制器、历史记录和广播共享，
+    只有在序列化边界 (Socket.IO 广播、REST 响应) 才通过 to_dict()/to_json() 转换为字典。
+
+    支持按键读取 (state["soc"]、state.get("soc")、"soc" in state)，可直接传给原先接收
+    get_state() 字典的代码。显示电流/电压等派生字段为属性，只在被读取时计算。
+    快照生成后不应再修改。
+    """
+
+    # 直接保存的字段
+    FIELDS = (
+        "soc", "voltage", "current", "temperature", "internal_resistance",
+        "is_charging", "is_discharging", "charging_mode",
+        "cycle_count", "health", "estimated_rul", "ambient_temperature",
+        "max_charging_current", "cc_to_cv_voltage", "max_voltage", "trickle_current", "trickle_voltage",
+        "polarization_resistance", "polarization_capacitance", "polarization_voltage",
+        "time_acceleration_factor", "rul_optimized_charging",
+    )
+
+    # 按需计算的派生字段
+    DERIVED = ("charging_current", "discharging_current", "charging_voltage", "display_current", "display_voltage")
+
+    # to_dict() 的键顺序 (与原 get_state() 一致)
+    KEYS = (
+        "soc", "voltage", "current", "temperature", "internal_resistance",
+        "is_charging", "is_discharging", "charging_mode",
+        "charging_current", "discharging_current", "charging_voltage",
+        "cycle_count", "health", "estimated_rul", "ambient_temperature",
+        "max_charging_current", "cc_to_cv_voltage", "max_voltage", "trickle_current", "trickle_voltage",
+        "polarization_resistance", "polarization_capacitance", "polarization_voltage",
+        "display_current", "display_voltage", "time_acceleration_factor", "rul_optimized_charging",
+    )
+
+    __slots__ = FIELDS + ("cell_statistics",)
+
+    def __init__(self, soc, voltage, current, temperature, internal_resistance,
+                 is_charging, is_discharging, charging_mode,
+                 cycle_count, health, estimated_rul, ambient_temperature,
+                 max_charging_current, cc_to_cv_voltage, max_voltage, trickle_current, trickle_voltage,
+                 polarization_resistance, polarization_capacitance, polarization_voltage,
+                 time_acceleration_factor, rul_optimized_charging, cell_statistics=None):
+        self.soc = soc
+        self.voltage = voltage
+        self.current = current
+        self.temperature = temperature
+        self.internal_resistance = internal_resistance
+        self.is_charging = is_charging
+        self.is_discharging = is_discharging
+        self.charging_mode = charging_mode
+        self.cycle_count = cycle_count
+        self.health = health
+        self.estimated_rul = estimated_rul
+        self.ambient_temperature = ambient_temperature
+        self.max_charging_current = max_charging_current
+        self.cc_to_cv_voltage = cc_to_cv_voltage
+        self.max_voltage = max_voltage
+        self.trickle_current = trickle_current
+        self.trickle_voltage = trickle_voltage
+        self.polarization_resistance = polarization_resistance
+        self.polarization_capacitance = polarization_capacitance
+        self.polarization_voltage = polarization_voltage
+        self.time_acceleration_factor = time_acceleration_factor
+        self.rul_optimized_charging = rul_optimized_charging
+        self.cell_statistics = cell_statistics
+
+    # ---- 派生字段 ----
+
+    @property
+    def charging_current(self):
+        """充电电流 (A)"""
+        return max(0, self.current) if self.is_charging else 0
+
+    @property
+    def discharging_current(self):
+        """放电电流 (A)"""
+        return abs(min(0, self.current)) if self.is_discharging else 0
+
+    @property
+    def charging_voltage(self):
+        """充电电压 (V)"""
+        return self.voltage if self.is_charging else 0
+
+    @property
+    def display_current(self):
+        """考虑时间加速因子的显示电流 (A)"""
+        if self.is_charging or self.is_discharging:
+            return self.current * self.time_acceleration_factor
+        return self.current
+
+    @property
+    def display_voltage(self):
+        """考虑时间加速因子的显示电压 (V)，恒压充电时保持不变"""
+        if not (self.is_charging or self.is_discharging) or (self.is_charging and self.charging_mode == "cv"):
+            return self.voltage
+        r_total = self.internal_resistance + self.polarization_resistance * 0.5
+        return self.voltage + (self.display_current - self.current) * r_total
+
+    # ---- 映射接口 (兼容原 get_state() 字典的读取方式) ----
+
+    def __getitem__(self, key):
+        if key in _STATE_KEYS:
+            return getattr(self, key)
+        if self.cell_statistics is not None and key in self.cell_statistics:
+            return self.cell_statistics[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in _STATE_KEYS or (self.cell_statistics is not None and key in self.cell_statistics)
+
+    def keys(self):
+        keys = list(self.KEYS)
+        if self.cell_statistics is not None:
+            keys.extend(self.cell_statistics)
+        return keys
+
+    def __repr__(self):
+        return (f"BatteryState(soc={self.soc:.2f}, voltage={self.voltage:.2f}, current={self.current:.2f}, "
+                f"temperature={self.temperature:.2f}, charging_mode={self.charging_mode!r})")
+
+    # ---- 序列化 ----
+
+    def to_dict(self):
+        """转换为与原 get_state() 相同结构的字典 (每次调用返回新字典，可自由修改)"""
+        state = {
+            "soc": self.soc,
+            "voltage": self.voltage,
+            "current": self.current,
+            "temperature": self.temperature,
+            "internal_resistance": self.internal_resistance,
+            "is_charging": self.is_charging,
+            "is_discharging": self.is_discharging,
+            "charging_mode": self.charging_mode,
+            "charging_current": self.charging_current,
+            "discharging_current": self.discharging_current,
+            "charging_voltage": self.charging_voltage,
+            "cycle_count": self.cycle_count,
+            "health": self.health,
+            "estimated_rul": self.estimated_rul,
+            "ambient_temperature": self.ambient_temperature,
+            "max_charging_current": self.max_charging_current,
+            "cc_to_cv_voltage": self.cc_to_cv_voltage,
+            "max_voltage": self.max_voltage,
+            "trickle_current": self.trickle_current,
+            "trickle_voltage": self.trickle_voltage,
+            "polarization_resistance": self.polarization_resistance,
+            "polarization_capacitance": self.polarization_capacitance,
+            "polarization_voltage": self.polarization_voltage,
+            "display_current": self.display_current,
+            "display_voltage": self.display_voltage,
+            "time_acceleration_factor": self.time_acceleration_factor,
+            "rul_optimized_charging": self.rul_optimized_charging,
+        }
+        if self.cell_statistics is not None:
+            state.update(self.cell_statistics)
+        return state
+
+    def to_json(self):
+        """序列化为JSON字符串"""
+        return json.dumps(self.to_dict())
+
+
+# 可按键读取的字段集合
+_STATE_KEYS = frozenset(BatteryState.KEYS)
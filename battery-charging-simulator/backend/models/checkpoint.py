@@ -0,0 +1,102 @@
+import os
+import json
+import numpy as np
+
+# 检查点文件格式版本
+CHECKPOINT_VERSION = 1
+
+
+class SimulationCheckpoint:
+    """仿真检查点: 一组命名的 NumPy 数组 + JSON 元数据，可嵌套子检查点
+
+    BatteryModel、BatteryFleet 和 SeriesPackModel 通过 checkpoint()/restore() 与检查点互相转换。
+    save() 写入未压缩的 .npz 文件 (二进制数组直接落盘，不使用 pickle)，load() 时按原样读回；
+    fork() 只复制数组，适合从同一个快照分叉出多个假设情景分别继续仿真。
+    """
+
+    def __init__(self, kind, arrays=None, meta=None, children=None):
+        """初始化检查点
+
+        参数:
+            kind: 检查点类型，如 "battery_model"、"battery_fleet"、"series_pack"
+            arrays: 字典，名称 -> NumPy 数组
+            meta: 可JSON序列化的元数据字典
+            children: 字典，名称 -> 子检查点 (如电池模型中的单体级电池包)
+        """
+        self.kind = kind
+        self.arrays = arrays or {}
+        self.meta = meta or {}
+        self.children = children or {}
+
+    @property
+    def nbytes(self):
+        """所有数组占用的字节数"""
+        return sum(arr.nbytes for arr in self.arrays.values()) + \
+            sum(child.nbytes for child in self.children.values())
+
+    def expect(self, kind):
+        """检查检查点类型，不匹配时抛出 ValueError"""
+        if self.kind != kind:
+            raise ValueError(f"检查点类型不匹配: 需要 {kind}，实际为 {self.kind}")
+        return self
+
+    def fork(self):
+        """复制检查点 (数组独立，元数据深拷贝)"""
+        return SimulationCheckpoint(
+            self.kind,
+            {name: arr.copy() for name, arr in self.arrays.items()},
+            json.loads(json.dumps(self.meta)),
+            {name: child.fork() for name, child in self.children.items()},
+        )
+
+    def _flatten(self, prefix=""):
+        """展开为 .npz 的扁平数组字典和描述结构的头信息"""
+        arrays = {prefix + name: arr for name, arr in self.arrays.items()}
+        header = {"kind": self.kind, "meta": self.meta, "children": {}}
+        for name, child in self.children.items():
+            child_arrays, header["children"][name] = child._flatten(f"{prefix}{name}/")
+            arrays.update(child_arrays)
+        return arrays, header
+
+    @classmethod
+    def _unflatten(cls, arrays, header, prefix=""):
+        own = {name[len(prefix):]: arr for name, arr in arrays.items()
+               if name.startswith(prefix) and "/" not in name[len(prefix):]}
+        children = {name: cls._unflatten(arrays, child_header, f"{prefix}{name}/")
+                    for name, child_header in header["children"].items()}
+        return cls(header["kind"], own, header["meta"], children)
+
+    def save(self, path):
+        """保存为 .npz 文件 (先写临时文件再替换，避免中途退出留下损坏的检查点)
+
+        参数:
+            path: 文件路径
+        """
+        arrays, header = self._flatten()
+        header["version"] = CHECKPOINT_VERSION
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, __header__=np.array(json.dumps(header, ensure_ascii=False)), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """从 .npz 文件加载检查点
+
+        参数:
+            path: 文件路径
+
+        返回:
+            checkpoint: SimulationCheckpoint
+        """
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(str(data["__header__"]))
+            if header.get("version") != CHECKPOINT_VERSION:
+                raise ValueError(f"不支持的检查点版本: {header.get('version')}")
+            arrays = {name: data[name] for name in data.files if name != "__header__"}
+        return cls._unflatten(arrays, header)
+
+    def __repr__(self):
+        return f"SimulationCheckpoint(kind={self.kind!r}, arrays={len(self.arrays)}, nbytes={self.nbytes})"
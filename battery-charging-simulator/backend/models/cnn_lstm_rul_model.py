@@ -3,20 +3,14 @@ import numpy as np
 import logging
 import shutil
 import time # Added for evaluate_battery_health
+import importlib.util
 
-# 添加TensorFlow导入的异常处理
-try:
-    import tensorflow as tf
-    from tensorflow.keras.models import load_model
-    from tensorflow.keras.layers import Dense, LSTM, Conv1D, Flatten, Input, concatenate
-    from tensorflow.keras.models import Model
-    TF_AVAILABLE = True
-except ImportError as e:
-    logging.getLogger("battery-simulator").warning(f"TensorFlow 导入失败: {e}，将使用简单估计方法")
-    TF_AVAILABLE = False
+# TensorFlow 只在需要 Keras 模型时 (训练、NumPy 引擎加载失败时的回退) 才导入:
+# 导入本身需要数秒，而默认的 NumPy 推理引擎不依赖 TensorFlow
+TF_AVAILABLE = importlib.util.find_spec("tensorflow") is not None
+if not TF_AVAILABLE:
+    logging.getLogger("battery-simulator").warning("未安装 TensorFlow，无法训练模型或加载 Keras 模型")
 
-from sklearn.preprocessing import MinMaxScaler
-import pandas as pd
 
 logger = logging.getLogger("battery-simulator")
 
@@ -24,7 +18,10 @@ logger = logging.getLogger("battery-simulator")
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import BATTERY_CONFIG
+from config import BATTERY_CONFIG, SIMULATOR_CONFIG
+from models.history_buffer import history_column
+from models.rul_inference_service import get_inference_service
+from models.prediction_cache import QuantizedLRUCache
 
 # 预训练模型路径
 PRETRAINED_MODEL_PATHS = [
@@ -36,41 +33,91 @@ PRETRAINED_MODEL_PATHS = [
 class CNNLSTM_RULModel:
     """CNN+LSTM 混合模型用于电池 RUL 预测"""
     
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, inference_service=None, lazy=False):
         """初始化 CNN+LSTM RUL 模型
         
         参数:
             model_path: 预训练模型路径，如果为 None 则尝试使用预定义路径
+            inference_service: RUL 推理服务，默认使用进程内共享的服务
+            lazy: 为 True 时不加载模型，由调用方稍后 (例如在后台线程中) 调用 load()；
+                加载完成前 predict_rul 使用简单估计方法
         """
         self.model = None
         self.models = []  # 用于存储多个模型（K折交叉验证）
-        
-        # 如果未指定模型路径，使用默认路径
-        if model_path is None:
-            self.model_path = os.path.join("models", "cnn_lstm_rul_model.keras")
-            # 尝试复制预训练模型
-            self._copy_pretrained_models()
-        else:
-            self.model_path = model_path
-            
-        self.scalers = {
-            "voltage": MinMaxScaler(feature_range=(0, 1)),
-            "current": MinMaxScaler(feature_range=(0, 1)),
-            "temperature": MinMaxScaler(feature_range=(0, 1)),
-            "capacity": MinMaxScaler(feature_range=(0, 1))
-        }
+        self.ensemble = None  # 合并全部折模型的 FusedEnsembleModel (仅 NumPy 推理时可用)
+        # 预测通过共享推理服务完成，加载的模型同时提供给 DynamicChargingController 等其他调用方
+        self.inference = inference_service or get_inference_service()
+        # 以缩放、量化后的输入窗口为键缓存预测结果 (空闲/涓流阶段窗口几乎不变，多个会话的窗口也可能相同)
+        cache_config = SIMULATOR_CONFIG["rul_cache"]
+        self.cache = QuantizedLRUCache(cache_config["max_size"], cache_config["tolerance"], cache_config["ttl"]) \
+            if cache_config["enabled"] else None
+        self.cache_deduplicated = 0  # 同一批量中与其他样本窗口相同、只计算一次的样本数
+        
+        # 如果未指定模型路径，使用默认路径 (加载时尝试复制预训练模型)
+        self.use_pretrained = model_path is None
+        self.model_path = os.path.join("models", "cnn_lstm_rul_model.keras") if model_path is None else model_path
+            
+        self.scalers = None  # 特征缩放器，加载模型或第一次预处理时创建 (导入 sklearn 较慢，不在构造时导入)
         self.seq_len_lstm = 5  # 时间步长或历史窗口大小
         self.seq_len_cnn = 5   # CNN 序列长度
         self.is_trained = False
         
+        # 加载状态: pending (尚未加载)、loading、ready、unavailable (没有可用模型)、failed
+        self.load_state = "pending"
+        self.load_times = {}  # 各加载阶段的耗时 (秒)
+        if not lazy:
+            self.load()
+    
+    @property
+    def models_ready(self):
+        """模型是否已加载并可用于预测 (否则 predict_rul 使用简单估计方法)"""
+        return self.is_trained and self.inference.ready
+    
+    def load(self):
+        """加载模型并交给共享推理服务，记录各阶段耗时 (可在后台线程中调用)
+        
+        返回:
+            ready: 是否加载了可用于预测的模型
+        """
+        self.load_state = "loading"
+        self.load_times = {}
+        start = time.perf_counter()
         try:
-            if TF_AVAILABLE:
+            if self.scalers is None:
+                self._create_scalers()
+                self.load_times["scalers"] = time.perf_counter() - start
+            if self.use_pretrained:
+                # 尝试复制预训练模型
+                copy_start = time.perf_counter()
+                self._copy_pretrained_models()
+                self.load_times["copy_pretrained"] = time.perf_counter() - copy_start
+            # 优先使用纯 NumPy 推理引擎 (推理不需要 TensorFlow)，导出失败时回退到 Keras 模型
+            if self._load_numpy_models():
+                pass
+            elif TF_AVAILABLE:
+                fallback_start = time.perf_counter()
                 self._load_or_create_model()
+                self.load_times["keras_fallback"] = time.perf_counter() - fallback_start
             else:
                 logger.warning("TensorFlow不可用，将使用简单估计方法")
+            self.load_state = "ready" if self.models_ready else "unavailable"
         except Exception as e:
+            self.load_state = "failed"
             logger.error(f"加载 CNN+LSTM RUL 模型失败: {e}")
             logger.warning("将使用简单估计方法代替")
+        self.load_times["total"] = time.perf_counter() - start
+        logger.info(f"CNN+LSTM RUL 模型加载结束 ({self.load_state})，耗时 {self.load_times['total']:.2f} 秒")
+        return self.load_state == "ready"
+    
+    def _create_scalers(self):
+        """创建特征缩放器"""
+        from sklearn.preprocessing import MinMaxScaler
+        self.scalers = {
+            "voltage": MinMaxScaler(feature_range=(0, 1)),
+            "current": MinMaxScaler(feature_range=(0, 1)),
+            "temperature": MinMaxScaler(feature_range=(0, 1)),
+            "capacity": MinMaxScaler(feature_range=(0, 1))
+        }
     
     def _copy_pretrained_models(self):
         """复制预训练模型到本地models目录"""
@@ -87,6 +134,41 @@ class CNNLSTM_RULModel:
                 except Exception as e:
                     logger.error(f"复制预训练模型失败: {e}")
     
+    def _load_numpy_models(self):
+        """从 .keras 模型 (K折模型，或单个模型) 导出权重并加载 NumPy 推理引擎
+        
+        返回:
+            loaded: 是否至少加载了一个模型
+        """
+        model_paths = [os.path.join("models", f"cnn_lstm_rul_model_k{i}.keras") for i in range(1, 4)]
+        model_paths = [path for path in model_paths if os.path.exists(path)] or \
+            [path for path in [self.model_path] if os.path.exists(path)]
+        self.models = []
+        if not model_paths:
+            return False
+        # 全部折模型经模型注册表加载 (每个文件只加载一次，与其他持有者共享) 后交给共享推理服务，
+        # 合并为一个网络，一次前向计算得到各折预测值
+        start = time.perf_counter()
+        if not self.inference.load(model_paths, quantization=SIMULATOR_CONFIG["rul_quantization"]):
+            return False
+        self.load_times["inference_service"] = time.perf_counter() - start
+        for model_path, handle in zip(model_paths, self.inference.handles):
+            self.load_times[os.path.basename(model_path)] = handle.load_seconds
+            logger.info(f"成功加载 CNN+LSTM RUL 预测模型 (NumPy 推理): {model_path}")
+        self.models = list(self.inference.models)
+        self.ensemble = self.inference.ensemble
+        # self.model 只保存可训练的 Keras 模型，训练时再加载
+        self.is_trained = True
+        logger.info(f"成功加载了 {len(self.models)} 个模型用于集成预测 (NumPy 推理)")
+        return True
+    
+    def reload_models(self):
+        """重新加载模型文件 (例如训练任务替换了 models 目录中的折模型后)，并更新共享推理服务"""
+        self.model = None
+        self.ensemble = None
+        if not self._load_numpy_models() and TF_AVAILABLE:
+            self._load_or_create_model()
+    
     def _load_or_create_model(self):
         """加载已有模型或创建新模型"""
         # 如果TensorFlow不可用，直接返回
@@ -95,8 +177,11 @@ class CNNLSTM_RULModel:
             return
             
         try:
+            from tensorflow.keras.models import load_model
+            
             # 尝试加载多个模型（K折交叉验证）
             models_loaded = False
+            self.models = []
             
             # 首先尝试从本地models目录加载
             for i in range(1, 4):  # 假设有3个K折模型
@@ -129,6 +214,7 @@ class CNNLSTM_RULModel:
             # 如果成功加载了至少一个模型，设置主模型为第一个
             if models_loaded and self.models:
                 self.model = self.models[0]
+                self.inference.set_models(self.models)
                 self.is_trained = True
                 logger.info(f"成功加载了 {len(self.models)} 个模型用于集成预测")
                 return
@@ -139,6 +225,7 @@ class CNNLSTM_RULModel:
                 self.model = load_model(self.model_path)
                 self.models = [self.model]  # 也添加到模型列表中
                 logger.info(f"成功加载 CNN+LSTM RUL 预测模型: {self.model_path}")
+                self.inference.set_models(self.models)
                 self.is_trained = True
             else:
                 # 创建新模型
@@ -154,6 +241,8 @@ class CNNLSTM_RULModel:
         if not TF_AVAILABLE:
             logger.warning("TensorFlow不可用，无法创建模型")
             return
+        from tensorflow.keras.layers import Dense, LSTM, Conv1D, Flatten, Input, concatenate
+        from tensorflow.keras.models import Model
             
         # 输入形状: [样本数, 时间步, 特征数]
         seq_len_lstm = self.seq_len_lstm
@@ -198,6 +287,8 @@ class CNNLSTM_RULModel:
         返回:
             scaled_data: 缩放后的数据
         """
+        if self.scalers is None:
+            self._create_scalers()
         scaler = self.scalers[scaler_type]
         
         # 如果数据是一维的，转换为二维
@@ -251,6 +342,36 @@ class CNNLSTM_RULModel:
         
         return lstm_input, cnn_input
     
+    def prepare_rul_inputs(self, battery_data):
+        """从电池历史数据提取模型输入
+        
+        参数:
+            battery_data: 电池历史数据 (HistoryRingBuffer 或字典列表)
+            
+        返回:
+            inputs: (lstm_input, cnn_input)，形状分别为 (1, T, 1) 和 (1, T, C)；
+                模型不可用或历史数据不足时返回 None
+        """
+        # 如果模型未训练或不可用，使用简单估计方法
+        if not self.is_trained or not self.models:
+            logger.warning("模型未训练或不可用，使用简单估计方法")
+            return None
+        
+        # 从电池历史数据中提取电压和容量
+        if len(battery_data) < max(self.seq_len_cnn, self.seq_len_lstm):
+            logger.warning("历史数据不足，使用简单估计方法")
+            return None
+        
+        # 提取电压和容量数据
+        # (只取模型输入所需的最近窗口)
+        voltage_data = history_column(battery_data, "voltage", self.seq_len_cnn)
+        
+        # 由于我们可能没有直接的容量数据，使用 SOC 和电压关系估计
+        capacity_data = history_column(battery_data, "soc", self.seq_len_lstm) / 100.0
+        
+        # 准备序列数据
+        return self._prepare_sequence_data(voltage_data, capacity_data)
+    
     def predict_rul(self, battery_data, static_features):
         """预测电池剩余寿命
         
@@ -261,74 +382,111 @@ class CNNLSTM_RULModel:
         返回:
             rul: 预测的剩余寿命 (循环数)
         """
-        # 如果TensorFlow不可用或模型未训练，使用简单估计方法
-        if not TF_AVAILABLE or not self.is_trained or not self.models:
-            logger.warning("模型未训练或不可用，使用简单估计方法")
-            return self._simple_estimate(static_features)
-        
         try:
-            # 从电池历史数据中提取电压和容量
-            if len(battery_data) < max(self.seq_len_cnn, self.seq_len_lstm):
-                logger.warning("历史数据不足，使用简单估计方法")
+            inputs = self.prepare_rul_inputs(battery_data)
+            if inputs is None:
                 return self._simple_estimate(static_features)
+            return self.predict_rul_batch(*inputs)[0]
             
-            # 提取电压和容量数据
-            voltage_data = np.array([data["voltage"] for data in battery_data])
-            
-            # 由于我们可能没有直接的容量数据，使用 SOC 和电压关系估计
-            capacity_data = np.array([data["soc"] / 100.0 for data in battery_data])
-            
-            # 准备序列数据
-            lstm_input, cnn_input = self._prepare_sequence_data(voltage_data, capacity_data)
-            
-            # 使用所有模型进行预测并取平均值（集成预测）
-            predictions = []
-            confidence_scores = []
+        except Exception as e:
+            logger.error(f"RUL 预测出错: {e}")
+            return self._simple_estimate(static_features)
+    
+    def predict_rul_batch(self, lstm_inputs, cnn_inputs):
+        """对多个样本 (例如多个电池会话) 一次前向计算并预测剩余寿命
+        
+        参数:
+            lstm_inputs: prepare_rul_inputs 得到的 LSTM 输入沿批量维拼接，形状 (B, T, 1)
+            cnn_inputs: 对应的 CNN 输入，形状 (B, T, C)
             
-            for i, model in enumerate(self.models):
-                # 预测
-                pred = model.predict([lstm_input, cnn_input], verbose=0)[0][0]
-                predictions.append(pred)
-                
-                # 计算简单的置信度分数 (基于预测值与均值的接近程度)
-                if len(predictions) > 1:
-                    mean_pred = np.mean(predictions[:-1])  # 不包括当前预测
-                    diff = abs(pred - mean_pred)
-                    confidence = max(0, 1 - (diff / max(0.1, mean_pred)))  # 避免除以零
-                else:
-                    confidence = 0.8  # 第一个模型的默认置信度
-                
-                confidence_scores.append(confidence)
-                logger.debug(f"模型 {i+1} 预测值: {pred:.4f}, 置信度: {confidence:.2f}")
+        返回:
+            ruls: 每个样本的剩余寿命 (循环数)，形状 (B,)
+        """
+        if self.cache is None:
+            return self._predict_rul_uncached(lstm_inputs, cnn_inputs)
+        
+        # 量化后相同的窗口只查找/计算一次 (缓存键包含推理服务的模型版本，替换模型后旧结果不再命中)
+        keys = self.cache.keys(self.inference.generation, lstm_inputs, cnn_inputs)
+        rows_by_key = {}
+        for row, key in enumerate(keys):
+            rows_by_key.setdefault(key, []).append(row)
+        self.cache_deduplicated += len(keys) - len(rows_by_key)
+        
+        ruls = np.empty(len(keys))
+        missing = []
+        for key, rows in rows_by_key.items():
+            rul = self.cache.get(key)
+            if rul is None:
+                missing.append(key)
+            else:
+                ruls[rows] = rul
+        if missing:
+            first_rows = [rows_by_key[key][0] for key in missing]
+            computed = self._predict_rul_uncached(np.asarray(lstm_inputs)[first_rows], np.asarray(cnn_inputs)[first_rows])
+            for key, rul in zip(missing, computed):
+                self.cache.put(key, rul)
+                ruls[rows_by_key[key]] = rul
+        return ruls
+    
+    def _predict_rul_uncached(self, lstm_inputs, cnn_inputs):
+        """不经缓存的批量预测"""
+        # 使用所有模型进行预测并取平均值（集成预测）
+        if self.inference.ready:
+            # 共享推理服务一次调用得到全部折模型的预测值
+            fold_predictions = self.inference.predict_folds(lstm_inputs, cnn_inputs)
+        else:
+            fold_predictions = np.hstack([model.predict([lstm_inputs, cnn_inputs], verbose=0) for model in self.models])
+        return np.array([self._rul_from_fold_predictions(row) for row in fold_predictions])
+    
+    def cache_metrics(self):
+        """导出预测缓存统计 (未启用缓存时为 None)"""
+        if self.cache is None:
+            return None
+        return dict(self.cache.metrics(), deduplicated=self.cache_deduplicated)
+    
+    def _rul_from_fold_predictions(self, fold_predictions):
+        """将一个样本的各折预测值按置信度加权平均，并转换为剩余循环数"""
+        predictions = []
+        confidence_scores = []
+        
+        for i, pred in enumerate(fold_predictions):
+            predictions.append(pred)
             
-            # 计算加权平均预测值
+            # 计算简单的置信度分数 (基于预测值与均值的接近程度)
             if len(predictions) > 1:
-                total_confidence = sum(confidence_scores)
-                if total_confidence > 0:
-                    # 加权平均
-                    avg_prediction = sum(p * c for p, c in zip(predictions, confidence_scores)) / total_confidence
-                else:
-                    # 简单平均
-                    avg_prediction = np.mean(predictions)
+                mean_pred = np.mean(predictions[:-1])  # 不包括当前预测
+                diff = abs(pred - mean_pred)
+                confidence = max(0, 1 - (diff / max(0.1, mean_pred)))  # 避免除以零
             else:
-                avg_prediction = predictions[0]
-                
-            logger.debug(f"集成模型预测值: {predictions}, 加权平均: {avg_prediction:.4f}")
-            
-            # 反向转换预测结果
-            rul_scaled = np.array([[avg_prediction]])
-            rul = self.scalers['capacity'].inverse_transform(rul_scaled)[0][0]
-            
-            # 转换为循环数 (假设满容量为 1.0)
-            max_cycles = 1000  # 假设最大寿命为 1000 循环
-            remaining_cycles = max_cycles * rul
+                confidence = 0.8  # 第一个模型的默认置信度
             
-            logger.debug(f"CNN+LSTM 模型预测 RUL: {remaining_cycles:.2f} 循环")
-            return remaining_cycles
+            confidence_scores.append(confidence)
+            logger.debug(f"模型 {i+1} 预测值: {pred:.4f}, 置信度: {confidence:.2f}")
+        
+        # 计算加权平均预测值
+        if len(predictions) > 1:
+            total_confidence = sum(confidence_scores)
+            if total_confidence > 0:
+                # 加权平均
+                avg_prediction = sum(p * c for p, c in zip(predictions, confidence_scores)) / total_confidence
+            else:
+                # 简单平均
+                avg_prediction = np.mean(predictions)
+        else:
+            avg_prediction = predictions[0]
             
-        except Exception as e:
-            logger.error(f"RUL 预测出错: {e}")
-            return self._simple_estimate(static_features)
+        logger.debug(f"集成模型预测值: {predictions}, 加权平均: {avg_prediction:.4f}")
+        
+        # 反向转换预测结果
+        rul_scaled = np.array([[avg_prediction]])
+        rul = self.scalers['capacity'].inverse_transform(rul_scaled)[0][0]
+        
+        # 转换为循环数 (假设满容量为 1.0)
+        max_cycles = 1000  # 假设最大寿命为 1000 循环
+        remaining_cycles = max_cycles * rul
+        
+        logger.debug(f"CNN+LSTM 模型预测 RUL: {remaining_cycles:.2f} 循环")
+        return remaining_cycles
     
     def _simple_estimate(self, static_features):
         """简单的 RUL 估计方法
@@ -394,6 +552,14 @@ class CNNLSTM_RULModel:
         if len(voltage_data) < self.seq_len_cnn + 1 or len(capacity_data) < self.seq_len_lstm + 1:
             raise ValueError("训练数据长度不足")
         
+        # NumPy 推理引擎只包含前向计算，训练时加载 Keras 模型
+        if self.model is None:
+            if not TF_AVAILABLE:
+                raise RuntimeError("训练模型需要 TensorFlow")
+            self.models = []
+            self.ensemble = None
+            self._load_or_create_model()
+        
         # 准备训练数据
         X_voltage = []
         X_capacity = []
@@ -425,6 +591,13 @@ class CNNLSTM_RULModel:
         
         self.is_trained = True
         
+        # 训练后的模型交给共享推理服务 (重新编译并预热)，缓存的旧预测结果作废
+        if not self.models:
+            self.models = [self.model]
+        self.inference.set_models(self.models)
+        if self.cache is not None:
+            self.cache.clear()
+        
         # 保存模型
         self._save_model()
         
@@ -595,13 +768,14 @@ class CNNLSTM_RULModel:
         
         return adjusted_params 
 
-    def evaluate_battery_health(self, battery_data, static_features, rul_percentage):
+    def evaluate_battery_health(self, battery_data, static_features, rul_percentage, cell_voltages=None):
         """评估电池健康状态并提供详细信息
         
         参数:
             battery_data: 电池历史数据
             static_features: 静态特征 [cycle_count, health, avg_temperature]
             rul_percentage: RUL百分比
+            cell_voltages: 可选的各串联单元电压数组 (V)，提供时按单体压差判断不平衡
             
         返回:
             health_info: 健康状态信息字典
@@ -615,18 +789,19 @@ class CNNLSTM_RULModel:
             health = health / 100.0
         
         # 提取最近的电压和电流数据
-        recent_data = battery_data[-20:] if len(battery_data) >= 20 else battery_data
+        # (环形缓冲区返回零拷贝视图，字典列表则提取为数组)
+        recent_count = min(len(battery_data), 20)
         
         # 计算电压波动性
-        if len(recent_data) > 5:
-            voltages = [data["voltage"] for data in recent_data]
+        if recent_count > 5:
+            voltages = history_column(battery_data, "voltage", recent_count)
             voltage_stability = np.std(voltages)
         else:
             voltage_stability = 0
         
         # 计算内阻趋势
-        if len(recent_data) > 5 and "internal_resistance" in recent_data[0]:
-            resistances = [data["internal_resistance"] for data in recent_data]
+        resistances = history_column(battery_data, "internal_resistance", recent_count) if recent_count > 5 else None
+        if resistances is not None:
             resistance_trend = np.mean(np.diff(resistances)) if len(resistances) > 1 else 0
             avg_resistance = np.mean(resistances)
         else:
@@ -634,8 +809,8 @@ class CNNLSTM_RULModel:
             avg_resistance = 0.1  # 默认值
         
         # 计算温度稳定性
-        if len(recent_data) > 5:
-            temperatures = [data["temperature"] for data in recent_data]
+        if recent_count > 5:
+            temperatures = history_column(battery_data, "temperature", recent_count)
             temp_stability = np.std(temperatures)
             max_temp = np.max(temperatures)
             avg_temp = np.mean(temperatures)
@@ -645,13 +820,14 @@ class CNNLSTM_RULModel:
         
         # 计算充放电效率 (如果数据中有充放电电流)
         charge_efficiency = 0
-        if len(recent_data) > 10:
+        if recent_count > 10:
             try:
                 # 简化的充放电效率计算
-                charge_currents = [abs(data["current"]) for data in recent_data if data["current"] > 0]
-                discharge_currents = [abs(data["current"]) for data in recent_data if data["current"] < 0]
+                currents = history_column(battery_data, "current", recent_count)
+                charge_currents = currents[currents > 0]
+                discharge_currents = -currents[currents < 0]
                 
-                if charge_currents and discharge_currents:
+                if charge_currents.size and discharge_currents.size:
                     avg_charge = np.mean(charge_currents)
                     avg_discharge = np.mean(discharge_currents)
                     # 理想情况下比率接近1
@@ -731,8 +907,13 @@ class CNNLSTM_RULModel:
         if max_temp > 40:
             recommendations.append("电池最高温度过高，建议改善散热条件")
         
-        # 根据电压稳定性添加额外建议
-        if voltage_stability > 0.1:
+        # 根据单体压差 (有单体数据时) 或整包电压稳定性添加额外建议
+        cell_voltage_spread = None
+        if cell_voltages is not None and len(cell_voltages) > 1:
+            cell_voltage_spread = float(np.max(cell_voltages) - np.min(cell_voltages))
+            if cell_voltage_spread > BATTERY_CONFIG.get("cell_imbalance_threshold", 0.05):
+                recommendations.append(f"单体压差 {cell_voltage_spread * 1000:.0f}mV，电池单体不平衡，建议进行均衡维护")
+        elif voltage_stability > 0.1:
             recommendations.append("电压波动较大，可能表明电池单体不平衡")
         
         # 估计剩余循环次数和使用寿命
@@ -763,6 +944,7 @@ class CNNLSTM_RULModel:
             "cycle_count": cycle_count,
             "health_percentage": round(health * 100, 2),  # 确保是百分比形式
             "voltage_stability": voltage_stability,
+            "cell_voltage_spread": cell_voltage_spread,
             "internal_resistance": avg_resistance,
             "internal_resistance_trend": resistance_trend,
             "temperature_stability": temp_stability,
@@ -1,9 +1,11 @@
 import sqlite3
 import logging
 import json
+import threading
 from datetime import datetime
 import os
 import sys
+import numpy as np
 
 # 获取项目根目录
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -13,22 +15,256 @@ from config import DATABASE_CONFIG
 
 logger = logging.getLogger("battery-simulator.database")
 
-def get_db_connection():
-    """获取数据库连接"""
-    # 使用绝对路径确保数据库文件位置正确
-    db_path = os.path.join(backend_dir, "db", "battery_data.db")
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)  # 确保db目录存在
-    conn = sqlite3.connect(db_path, check_same_thread=DATABASE_CONFIG["connect_args"].get("check_same_thread", True))
+# 数据库文件 (使用绝对路径确保数据库文件位置正确)
+DB_PATH = os.path.join(backend_dir, "db", "battery_data.db")
+
+
+def _connect(path, factory=sqlite3.Connection):
+    """创建数据库连接并按 DATABASE_CONFIG 设置 SQLite 参数"""
+    conn = sqlite3.connect(path, timeout=DATABASE_CONFIG.get("busy_timeout", 5.0),
+                           check_same_thread=DATABASE_CONFIG["connect_args"].get("check_same_thread", True),
+                           factory=factory)
     conn.row_factory = sqlite3.Row
+    for pragma in ("journal_mode", "synchronous", "mmap_size", "cache_size"):
+        if DATABASE_CONFIG.get(pragma) is not None:
+            conn.execute(f"PRAGMA {pragma} = {DATABASE_CONFIG[pragma]}")
     return conn
 
+
+class PooledConnection(sqlite3.Connection):
+    """连接池中的连接
+
+    close() 把连接交还连接池而不是真正关闭: 读连接保留给所属线程继续使用，
+    写连接释放写锁 (未提交的事务先回滚，例如出错时)。
+    """
+
+    pool = None
+    writer = False
+
+    def close(self):
+        if self.pool is None:
+            sqlite3.Connection.close(self)
+        elif self.writer:
+            self.pool._release_writer()
+        elif self.in_transaction:
+            self.rollback()
+
+
+class ConnectionPool:
+    """SQLite 连接池: 每个线程一个读连接，全部写操作串行使用一个写连接
+
+    WAL 模式下读连接不会被写入阻塞；写连接由可重入锁保护，同一线程内嵌套获取不会死锁。
+    """
+
+    def __init__(self, path):
+        """初始化连接池 (连接在第一次使用时创建)
+
+        参数:
+            path: 数据库文件路径
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)  # 确保db目录存在
+        self._local = threading.local()
+        self._readers = []
+        self._writer = None
+        self._writer_lock = threading.RLock()
+        self._writer_depth = 0
+        self._lock = threading.Lock()
+
+    def _new_connection(self, writer):
+        conn = _connect(self.path, PooledConnection)
+        conn.pool = self
+        conn.writer = writer
+        return conn
+
+    def reader(self):
+        """返回当前线程的读连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._new_connection(writer=False)
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    def writer(self):
+        """获取写连接 (持有写锁直到调用连接的 close())"""
+        self._writer_lock.acquire()
+        try:
+            if self._writer is None:
+                self._writer = self._new_connection(writer=True)
+        except Exception:
+            self._writer_lock.release()
+            raise
+        self._writer_depth += 1
+        return self._writer
+
+    def _release_writer(self):
+        self._writer_depth -= 1
+        if self._writer_depth == 0 and self._writer.in_transaction:
+            self._writer.rollback()
+        self._writer_lock.release()
+
+    def close(self):
+        """关闭连接池中的全部连接"""
+        with self._writer_lock, self._lock:
+            connections = self._readers + ([self._writer] if self._writer is not None else [])
+            self._readers = []
+            self._writer = None
+            self._local = threading.local()
+        for conn in connections:
+            conn.pool = None
+            conn.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """返回当前数据库文件的连接池 (DB_PATH 改变时重新创建)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.path != DB_PATH:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(DB_PATH)
+        return _pool
+
+
+def close_pool():
+    """关闭连接池 (服务器关闭时调用)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def get_db_connection(write=False):
+    """获取数据库连接，使用完毕后调用 close() (启用连接池时交还连接池)
+
+    参数:
+        write: 是否用于写操作 (写操作串行使用同一个写连接)
+    """
+    if not DATABASE_CONFIG.get("pool_connections", True):
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)  # 确保db目录存在
+        return _connect(DB_PATH)
+    pool = get_pool()
+    return pool.writer() if write else pool.reader()
+
+# 遥测数据列 (除主键 record_id、t 以外)
+TELEMETRY_COLUMNS = ("soc", "voltage", "current", "temperature")
+
+# 充电过程遥测表: 每个仿真周期一行，主键 (record_id, t) 即聚簇索引 (WITHOUT ROWID)，
+# 数据行按充电记录和时间顺序存放在主键 B 树中，按记录和时间范围查询只扫描连续的页，
+# 索引本身包含全部列，不需要另外的覆盖索引或回表
+CREATE_TELEMETRY_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS charging_telemetry (
+        record_id INTEGER NOT NULL,
+        t REAL NOT NULL,
+        soc REAL,
+        voltage REAL,
+        current REAL,
+        temperature REAL,
+        PRIMARY KEY (record_id, t)
+    ) WITHOUT ROWID
+"""
+
+INSERT_TELEMETRY_SQL = """
+    INSERT OR REPLACE INTO charging_telemetry (record_id, t, soc, voltage, current, temperature)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# 后台写入使用: 只为仍然存在的充电记录写入遥测样本 (排队期间记录可能已被删除)
+INSERT_EXISTING_TELEMETRY_SQL = """
+    INSERT OR REPLACE INTO charging_telemetry (record_id, t, soc, voltage, current, temperature)
+    SELECT ?1, ?2, ?3, ?4, ?5, ?6 WHERE EXISTS (SELECT 1 FROM charging_records WHERE id = ?1)
+"""
+
+# 充电阶段表: charging_records.charging_phases JSON 列的规范化副本，每个阶段一行，
+# 开始/结束时间为 epoch 秒，阶段统计直接在 SQL 中按阶段分组汇总，不再逐条解析 JSON
+CREATE_CHARGING_PHASES_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS charging_phases (
+        record_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        phase TEXT NOT NULL,
+        start_ts REAL,
+        end_ts REAL,
+        duration REAL,
+        PRIMARY KEY (record_id, seq)
+    ) WITHOUT ROWID
+"""
+
+# 阶段统计使用的覆盖索引 (按阶段分组汇总时长只扫描索引)
+CREATE_CHARGING_PHASES_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_charging_phases_phase_duration ON charging_phases (phase, duration)
+"""
+
+INSERT_CHARGING_PHASE_SQL = """
+    INSERT INTO charging_phases (record_id, seq, phase, start_ts, end_ts, duration)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# 只为仍然存在的充电记录写入阶段行 (更新排队期间记录可能已被删除)
+INSERT_EXISTING_CHARGING_PHASE_SQL = """
+    INSERT INTO charging_phases (record_id, seq, phase, start_ts, end_ts, duration)
+    SELECT ?1, ?2, ?3, ?4, ?5, ?6 WHERE EXISTS (SELECT 1 FROM charging_records WHERE id = ?1)
+"""
+
+# 各阶段的汇总 (阶段数、总时长)，由触发器在写入/删除阶段行的同一个事务中维护，
+# 阶段统计只读取这几行，不再扫描全部阶段
+CREATE_CHARGING_PHASE_TOTALS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS charging_phase_totals (
+        phase TEXT PRIMARY KEY,
+        count INTEGER NOT NULL,
+        total_duration REAL NOT NULL
+    )
+"""
+
+# 只汇总开始和结束时间都有效 (duration 非空) 的阶段；阶段数归零时总时长置零，避免浮点误差累积
+CREATE_CHARGING_PHASE_TOTALS_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS charging_phases_totals_insert
+    AFTER INSERT ON charging_phases WHEN NEW.duration IS NOT NULL
+    BEGIN
+        INSERT INTO charging_phase_totals (phase, count, total_duration) VALUES (NEW.phase, 1, NEW.duration)
+        ON CONFLICT (phase) DO UPDATE SET count = count + 1, total_duration = total_duration + excluded.total_duration;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS charging_phases_totals_delete
+    AFTER DELETE ON charging_phases WHEN OLD.duration IS NOT NULL
+    BEGIN
+        UPDATE charging_phase_totals
+        SET total_duration = CASE WHEN count <= 1 THEN 0 ELSE total_duration - OLD.duration END,
+            count = count - 1
+        WHERE phase = OLD.phase;
+    END
+    """,
+)
+
+# 由阶段行重新汇总 (迁移和一致性检查使用，只扫描覆盖索引)
+CHARGING_PHASE_TOTALS_GROUP_BY_SQL = """
+    SELECT phase, COUNT(duration) AS count, SUM(duration) AS total_duration
+    FROM charging_phases
+    WHERE duration IS NOT NULL
+    GROUP BY phase
+"""
+
+# 数据库结构版本 (PRAGMA user_version)，1: charging_phases 已从 JSON 列迁移，2: charging_phase_totals 已建立
+SCHEMA_VERSION = 2
+
 def init_db():
     """初始化数据库，创建表"""
     logger.info("正在初始化数据库...")
+    conn = get_db_connection(write=True)
     try:
-        conn = get_db_connection()
         cursor = conn.cursor()
         
+        # 充电过程遥测表 (与 charging_records 的结构检查无关，始终确保存在)
+        cursor.execute(CREATE_TELEMETRY_TABLE_SQL)
+        conn.commit()
+        
         # 检查 charging_records 表是否存在
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='charging_records'")
         table_exists = cursor.fetchone()
@@ -46,11 +282,13 @@ def init_db():
             
             if all(col in columns for col in required_columns):
                 logger.info("数据库表 'charging_records' 已存在并且结构正确。")
-                conn.close()
+                migrate_charging_phases(conn)
                 return
 
         logger.info("数据库表 'charging_records' 不存在或结构不正确，正在创建/重建...")
         cursor.execute("DROP TABLE IF EXISTS charging_records")
+        cursor.execute("DROP TABLE IF EXISTS charging_phases")
+        cursor.execute("DROP TABLE IF EXISTS charging_phase_totals")
         
         # 创建 charging_records 表
         cursor.execute("""
@@ -70,32 +308,210 @@ def init_db():
         """)
         conn.commit()
         logger.info("数据库表 'charging_records' 创建成功。")
-        conn.close()
+        migrate_charging_phases(conn)
     except sqlite3.Error as e:
         logger.error(f"数据库初始化失败: {e}", exc_info=True)
+    finally:
+        conn.close()
+
+def _epoch_seconds(value):
+    """ISO 格式时间字符串转换为 epoch 秒 (无法解析时为 None)"""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+def charging_phase_rows(record_id, phases):
+    """把充电记录的阶段列表转换为 INSERT_CHARGING_PHASE_SQL 的参数
+    
+    参数:
+        record_id: 充电记录ID
+        phases: 充电阶段字典列表 (charging_phases)
+        
+    返回:
+        list: 每个阶段一行 (record_id, seq, phase, start_ts, end_ts, duration)，
+            开始和结束时间都有效时才有 duration
+    """
+    rows = []
+    if not isinstance(phases, list):
+        return rows
+    for seq, phase in enumerate(phases):
+        if not isinstance(phase, dict) or not phase.get('phase'):
+            continue
+        start_ts = _epoch_seconds(phase.get('start_time'))
+        end_ts = _epoch_seconds(phase.get('end_time'))
+        duration = end_ts - start_ts if start_ts is not None and end_ts is not None else None
+        rows.append((record_id, seq, str(phase['phase']), start_ts, end_ts, duration))
+    return rows
+
+def replace_charging_phases(conn, record_phases):
+    """在调用方的事务中替换充电记录的阶段行 (与 charging_phases JSON 列同步写入)
+    
+    已删除的记录不会重新写入阶段行。
+    
+    参数:
+        conn: 写连接
+        record_phases: (record_id, phases) 列表
+    """
+    record_phases = list(record_phases)
+    if not record_phases:
+        return
+    conn.executemany("DELETE FROM charging_phases WHERE record_id = ?",
+                     [(record_id,) for record_id, _ in record_phases])
+    conn.executemany(INSERT_EXISTING_CHARGING_PHASE_SQL,
+                     [row for record_id, phases in record_phases for row in charging_phase_rows(record_id, phases)])
+
+def rebuild_charging_phase_totals(conn):
+    """由 charging_phases 表重新汇总 charging_phase_totals (在调用方的事务中执行)"""
+    conn.execute("DELETE FROM charging_phase_totals")
+    conn.execute("INSERT INTO charging_phase_totals (phase, count, total_duration) " + CHARGING_PHASE_TOTALS_GROUP_BY_SQL)
+
+def migrate_charging_phases(conn):
+    """创建 charging_phases 和 charging_phase_totals 表，并从 charging_records.charging_phases JSON 列迁移已有的阶段
+    
+    通过 PRAGMA user_version 记录迁移状态，每个数据库只迁移一次。
+    
+    参数:
+        conn: 写连接
+        
+    返回:
+        int: 迁移的阶段数 (已迁移过时为 0)
+    """
+    conn.execute(CREATE_CHARGING_PHASES_TABLE_SQL)
+    conn.execute(CREATE_CHARGING_PHASES_INDEX_SQL)
+    conn.execute(CREATE_CHARGING_PHASE_TOTALS_TABLE_SQL)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    count = 0
+    if version < 1:
+        logger.info("正在把充电阶段从 JSON 列迁移到 charging_phases 表...")
+        # 批量迁移时不逐行维护汇总，迁移后一次重新汇总
+        conn.execute("DROP TRIGGER IF EXISTS charging_phases_totals_insert")
+        conn.execute("DROP TRIGGER IF EXISTS charging_phases_totals_delete")
+        conn.execute("DELETE FROM charging_phases")
+        records = conn.execute(
+            "SELECT id, charging_phases FROM charging_records WHERE charging_phases IS NOT NULL AND charging_phases != '[]'")
+        while True:
+            batch = records.fetchmany(10000)
+            if not batch:
+                break
+            rows = []
+            for record in batch:
+                try:
+                    rows.extend(charging_phase_rows(record['id'], json.loads(record['charging_phases'])))
+                except (json.JSONDecodeError, TypeError):
+                    continue
+            conn.executemany(INSERT_CHARGING_PHASE_SQL, rows)
+            count += len(rows)
+        logger.info(f"充电阶段迁移完成，共 {count} 个阶段")
+    for sql in CREATE_CHARGING_PHASE_TOTALS_TRIGGERS_SQL:
+        conn.execute(sql)
+    if version < SCHEMA_VERSION:
+        rebuild_charging_phase_totals(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+    return count
+
+# 插入/更新充电记录的语句 (后台写入线程以 executemany 批量执行)
+INSERT_CHARGING_RECORD_SQL = """
+    INSERT INTO charging_records (
+        id, start_time, initial_soc, initial_temperature, 
+        initial_internal_resistance, initial_polarization_resistance,
+        charging_phases
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPDATE_CHARGING_RECORD_SQL = """
+    UPDATE charging_records 
+    SET end_time = ?, final_soc = ?, final_temperature = ?, duration_seconds = ?, charging_phases = ?
+    WHERE id = ?
+"""
+
+_record_id_lock = threading.Lock()
+_next_record_id = {}  # 数据库文件 -> 下一个可分配的充电记录ID
+
+def reserve_charging_record_id():
+    """分配新充电记录的ID
+    
+    写入之前即可确定ID，后台写入线程排队中的记录也已占用ID。与 AUTOINCREMENT 一致，
+    不复用已删除记录的ID。所有插入充电记录的路径都通过这里分配ID，不会冲突。
+    
+    返回:
+        record_id: 新记录的ID
+    """
+    with _record_id_lock:
+        record_id = _next_record_id.get(DB_PATH)
+        if record_id is None:
+            conn = get_db_connection()
+            try:
+                row = conn.execute("""
+                    SELECT MAX(
+                        COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'charging_records'), 0),
+                        COALESCE((SELECT MAX(id) FROM charging_records), 0)
+                    ) AS max_id
+                """).fetchone()
+            finally:
+                conn.close()
+            record_id = row['max_id'] + 1
+        _next_record_id[DB_PATH] = record_id + 1
+        return record_id
+
+def charging_record_insert_params(record_id, record):
+    """INSERT_CHARGING_RECORD_SQL 的参数"""
+    return (
+        record_id,
+        record['start_time'],
+        record['initial_soc'],
+        record['initial_temperature'],
+        record['initial_internal_resistance'],
+        record['initial_polarization_resistance'],
+        json.dumps(record.get('charging_phases', []))
+    )
+
+def charging_record_update_params(record_id, updates, start_time_str=None):
+    """UPDATE_CHARGING_RECORD_SQL 的参数 (根据开始和结束时间计算充电时长)
+    
+    参数:
+        record_id: 充电记录ID
+        updates: 更新内容，包含 start_time 时使用它计算时长
+        start_time_str: 数据库中记录的开始时间 (updates 不包含 start_time 时使用)
+    """
+    if 'start_time' in updates and updates['start_time']:
+        start_time_str = updates['start_time']
+    end_time_str = updates.get('end_time')
+    duration = None
+    
+    # 计算时长
+    if start_time_str and end_time_str:
+        try:
+            start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
+            end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
+            duration = int((end_time - start_time).total_seconds())
+            logger.info(f"计算充电记录 ID: {record_id} 的时长: {duration}秒")
+        except Exception as e:
+            logger.error(f"计算充电时长失败: {e}", exc_info=True)
+    
+    return (
+        updates.get('end_time'),
+        updates.get('final_soc'),
+        updates.get('final_temperature'),
+        duration,
+        json.dumps(updates.get('charging_phases', [])),
+        record_id
+    )
 
 def add_charging_record(record):
     """添加一条新的充电记录"""
     logger.info(f"添加新的充电记录: {record}")
-    conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO charging_records (
-                start_time, initial_soc, initial_temperature, 
-                initial_internal_resistance, initial_polarization_resistance,
-                charging_phases
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            record['start_time'],
-            record['initial_soc'],
-            record['initial_temperature'],
-            record['initial_internal_resistance'],
-            record['initial_polarization_resistance'],
-            json.dumps(record.get('charging_phases', []))
-        ))
+        record_id = reserve_charging_record_id()
+    except sqlite3.Error as e:
+        logger.error(f"添加充电记录失败: {e}", exc_info=True)
+        return None
+    conn = get_db_connection(write=True)
+    try:
+        conn.execute(INSERT_CHARGING_RECORD_SQL, charging_record_insert_params(record_id, record))
+        conn.executemany(INSERT_CHARGING_PHASE_SQL, charging_phase_rows(record_id, record.get('charging_phases', [])))
         conn.commit()
-        record_id = cursor.lastrowid
         logger.info(f"成功添加充电记录，ID: {record_id}")
         return record_id
     except sqlite3.Error as e:
@@ -105,48 +521,22 @@ def add_charging_record(record):
         conn.close()
 
 def update_charging_record(record_id, updates):
-    """更新一条充电记录"""
+    """更新一条充电记录 (按主键，updates 包含 start_time 时不再读取数据库中的开始时间)"""
     logger.info(f"更新充电记录 ID: {record_id} with updates: {updates}")
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     try:
-        # 计算充电时长
-        start_time_str = None
-        end_time_str = updates.get('end_time')
-        duration = None
-        
-        # 获取当前记录的开始时间
         cursor = conn.cursor()
-        cursor.execute("SELECT start_time FROM charging_records WHERE id = ?", (record_id,))
-        record = cursor.fetchone()
-        if record:
-            start_time_str = record['start_time']
         
-        # 如果更新中包含开始时间，则使用更新中的开始时间
-        if 'start_time' in updates and updates['start_time']:
-            start_time_str = updates['start_time']
+        # 如果更新中不包含开始时间，读取当前记录的开始时间
+        start_time_str = None
+        if not updates.get('start_time'):
+            cursor.execute("SELECT start_time FROM charging_records WHERE id = ?", (record_id,))
+            record = cursor.fetchone()
+            if record:
+                start_time_str = record['start_time']
         
-        # 计算时长
-        if start_time_str and end_time_str:
-            try:
-                start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-                end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
-                duration = int((end_time - start_time).total_seconds())
-                logger.info(f"计算充电记录 ID: {record_id} 的时长: {duration}秒")
-            except Exception as e:
-                logger.error(f"计算充电时长失败: {e}", exc_info=True)
-
-        cursor.execute("""
-            UPDATE charging_records 
-            SET end_time = ?, final_soc = ?, final_temperature = ?, duration_seconds = ?, charging_phases = ?
-            WHERE id = ?
-        """, (
-            updates.get('end_time'),
-            updates.get('final_soc'),
-            updates.get('final_temperature'),
-            duration,
-            json.dumps(updates.get('charging_phases', [])),
-            record_id
-        ))
+        cursor.execute(UPDATE_CHARGING_RECORD_SQL, charging_record_update_params(record_id, updates, start_time_str))
+        replace_charging_phases(conn, [(record_id, updates.get('charging_phases', []))])
         conn.commit()
         logger.info(f"成功更新充电记录 ID: {record_id}")
     except (sqlite3.Error, KeyError, TypeError) as e:
@@ -154,6 +544,21 @@ def update_charging_record(record_id, updates):
     finally:
         conn.close()
 
+# 读取/删除充电记录前需要等待提交的后台写入 (flush 函数列表，由 db_writer 注册)
+_pending_write_flushers = []
+
+def register_pending_writes(flush):
+    """注册一个 flush(timeout) 函数，读取或删除充电记录前调用
+    
+    读取能看到此前排队的写入，排队中的写入也不会在删除之后提交。
+    没有待写入项目时 flush 应立即返回。
+    """
+    _pending_write_flushers.append(flush)
+
+def _flush_pending_writes(timeout=5.0):
+    for flush in _pending_write_flushers:
+        flush(timeout)
+
 def delete_charging_record(record_id):
     """删除一条充电记录
     
@@ -164,8 +569,11 @@ def delete_charging_record(record_id):
         bool: 删除是否成功
     """
     logger.info(f"删除充电记录 ID: {record_id}")
-    conn = get_db_connection()
+    _flush_pending_writes()
+    conn = get_db_connection(write=True)
     try:
+        conn.execute("DELETE FROM charging_telemetry WHERE record_id = ?", (record_id,))
+        conn.execute("DELETE FROM charging_phases WHERE record_id = ?", (record_id,))
         cursor = conn.cursor()
         cursor.execute("DELETE FROM charging_records WHERE id = ?", (record_id,))
         conn.commit()
@@ -181,6 +589,79 @@ def delete_charging_record(record_id):
     finally:
         conn.close()
 
+def telemetry_rows(record_id, samples):
+    """把遥测样本转换为 INSERT_TELEMETRY_SQL (或 INSERT_EXISTING_TELEMETRY_SQL) 的参数
+    
+    参数:
+        record_id: 充电记录ID
+        samples: 形状为 (N, 5) 的数组或行序列，每行为 (t, soc, voltage, current, temperature)
+    """
+    samples = np.asarray(samples, dtype=np.float64).reshape(-1, len(TELEMETRY_COLUMNS) + 1)
+    record_id = int(record_id)
+    return [(record_id, *row) for row in samples.tolist()]
+
+def append_telemetry(record_id, samples):
+    """批量追加一条充电记录的遥测样本 (同一时间的样本覆盖旧值)
+    
+    参数:
+        record_id: 充电记录ID
+        samples: 形状为 (N, 5) 的数组或行序列，每行为 (t, soc, voltage, current, temperature)
+        
+    返回:
+        int: 写入的样本数
+    """
+    rows = telemetry_rows(record_id, samples)
+    if not rows:
+        return 0
+    conn = get_db_connection(write=True)
+    try:
+        conn.executemany(INSERT_TELEMETRY_SQL, rows)
+        conn.commit()
+        return len(rows)
+    except sqlite3.Error as e:
+        logger.error(f"写入遥测数据失败: {e}", exc_info=True)
+        return 0
+    finally:
+        conn.close()
+
+def get_telemetry(record_id, start=None, end=None, columns=TELEMETRY_COLUMNS):
+    """查询一条充电记录在时间范围内的遥测数据
+    
+    参数:
+        record_id: 充电记录ID
+        start: 起始时间 (包含)，None 表示不限
+        end: 结束时间 (不包含)，None 表示不限
+        columns: 返回的数据列 (TELEMETRY_COLUMNS 的子集)
+        
+    返回:
+        dict: {"t": 时间数组, 列名: 数组, ...}，均为按时间排序的 float64 NumPy 数组
+    """
+    _flush_pending_writes()
+    columns = tuple(columns)
+    unknown = set(columns) - set(TELEMETRY_COLUMNS)
+    if unknown:
+        raise ValueError(f"未知的遥测数据列: {sorted(unknown)}")
+    sql = f"SELECT t, {', '.join(columns)} FROM charging_telemetry WHERE record_id = ?" if columns else \
+        "SELECT t FROM charging_telemetry WHERE record_id = ?"
+    params = [record_id]
+    if start is not None:
+        sql += " AND t >= ?"
+        params.append(start)
+    if end is not None:
+        sql += " AND t < ?"
+        params.append(end)
+    sql += " ORDER BY t"
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.row_factory = None  # 直接取元组，不构造 sqlite3.Row
+        rows = cursor.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    # None (缺失值) 转换为 NaN
+    data = np.array(rows, dtype=np.float64).reshape(-1, len(columns) + 1).T.copy()
+    return dict(zip(("t",) + columns, data))
+
 def get_charging_record_by_id(record_id):
     """根据ID获取单条充电记录
     
@@ -191,6 +672,7 @@ def get_charging_record_by_id(record_id):
         dict: 充电记录字典，如果未找到则返回None
     """
     logger.info(f"获取充电记录 ID: {record_id}")
+    _flush_pending_writes()
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
@@ -220,6 +702,7 @@ def get_charging_record_by_id(record_id):
 def get_all_charging_records():
     """获取所有充电记录"""
     logger.info("正在从数据库获取所有充电记录...")
+    _flush_pending_writes()
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
@@ -255,6 +738,7 @@ def get_charging_records_by_date_range(start_date, end_date):
         list: 充电记录列表
     """
     logger.info(f"获取日期范围内的充电记录: {start_date} 至 {end_date}")
+    _flush_pending_writes()
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
@@ -295,6 +779,7 @@ def get_recent_charging_records(limit=10):
         list: 充电记录列表
     """
     logger.info(f"获取最近 {limit} 条充电记录")
+    _flush_pending_writes()
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
@@ -331,8 +816,11 @@ def delete_all_charging_records():
         bool: 删除是否成功
     """
     logger.info("删除所有充电记录")
-    conn = get_db_connection()
+    _flush_pending_writes()
+    conn = get_db_connection(write=True)
     try:
+        conn.execute("DELETE FROM charging_telemetry")
+        conn.execute("DELETE FROM charging_phases")
         cursor = conn.cursor()
         cursor.execute("DELETE FROM charging_records")
         conn.commit()
@@ -358,11 +846,14 @@ def delete_charging_records_by_ids(record_ids):
         return 0
         
     logger.info(f"批量删除充电记录: {record_ids}")
-    conn = get_db_connection()
+    _flush_pending_writes()
+    conn = get_db_connection(write=True)
     try:
-        cursor = conn.cursor()
         # 构建参数占位符
         placeholders = ','.join(['?'] * len(record_ids))
+        conn.execute(f"DELETE FROM charging_telemetry WHERE record_id IN ({placeholders})", record_ids)
+        conn.execute(f"DELETE FROM charging_phases WHERE record_id IN ({placeholders})", record_ids)
+        cursor = conn.cursor()
         cursor.execute(f"DELETE FROM charging_records WHERE id IN ({placeholders})", record_ids)
         conn.commit()
         count = cursor.rowcount
@@ -381,6 +872,7 @@ def get_charging_statistics():
         dict: 包含统计信息的字典
     """
     logger.info("获取充电统计信息")
+    _flush_pending_writes()
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
@@ -458,63 +950,34 @@ def get_charging_statistics():
         conn.close()
 
 def get_charging_phases_statistics():
-    """获取充电阶段统计信息
+    """获取充电阶段统计信息 (读取 charging_phase_totals 中每个阶段一行的汇总)
     
     返回:
         dict: 包含各充电阶段统计信息的字典
     """
     logger.info("获取充电阶段统计信息")
+    _flush_pending_writes()
+    phases_stats = {
+        "cc": {"count": 0, "total_duration": 0, "avg_duration": 0},
+        "cv": {"count": 0, "total_duration": 0, "avg_duration": 0},
+        "trickle": {"count": 0, "total_duration": 0, "avg_duration": 0}
+    }
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
-        cursor.execute("SELECT charging_phases FROM charging_records")
-        records = cursor.fetchall()
-        
-        # 统计各阶段信息
-        phases_stats = {
-            "cc": {"count": 0, "total_duration": 0, "avg_duration": 0},
-            "cv": {"count": 0, "total_duration": 0, "avg_duration": 0},
-            "trickle": {"count": 0, "total_duration": 0, "avg_duration": 0}
-        }
-        
-        for record in records:
-            if not record['charging_phases']:
-                continue
-                
-            try:
-                phases = json.loads(record['charging_phases'])
-                for phase in phases:
-                    phase_type = phase.get('phase')
-                    if phase_type not in phases_stats:
-                        continue
-                        
-                    # 计算阶段持续时间
-                    if phase.get('start_time') and phase.get('end_time'):
-                        start_time = datetime.fromisoformat(phase['start_time'])
-                        end_time = datetime.fromisoformat(phase['end_time'])
-                        duration = (end_time - start_time).total_seconds()
-                        
-                        phases_stats[phase_type]["count"] += 1
-                        phases_stats[phase_type]["total_duration"] += duration
-            except (json.JSONDecodeError, KeyError, TypeError):
-                continue
-        
-        # 计算平均持续时间
-        for phase_type in phases_stats:
-            if phases_stats[phase_type]["count"] > 0:
-                phases_stats[phase_type]["avg_duration"] = (
-                    phases_stats[phase_type]["total_duration"] / 
-                    phases_stats[phase_type]["count"]
-                )
-        
+        # 只统计开始和结束时间都有效的阶段 (由触发器维护)
+        cursor.execute("SELECT phase, count, total_duration FROM charging_phase_totals WHERE count > 0")
+        for row in cursor.fetchall():
+            if row['phase'] in phases_stats:
+                phases_stats[row['phase']] = {
+                    "count": row['count'],
+                    "total_duration": row['total_duration'],
+                    "avg_duration": row['total_duration'] / row['count']
+                }
         return phases_stats
     except sqlite3.Error as e:
         logger.error(f"获取充电阶段统计信息失败: {e}", exc_info=True)
-        return {
-            "cc": {"count": 0, "total_duration": 0, "avg_duration": 0},
-            "cv": {"count": 0, "total_duration": 0, "avg_duration": 0},
-            "trickle": {"count": 0, "total_duration": 0, "avg_duration": 0}
-        }
+        return phases_stats
     finally:
         conn.close()
 
@@ -538,6 +1001,7 @@ def search_charging_records(search_params):
         dict: 包含搜索结果和总记录数的字典
     """
     logger.info(f"搜索充电记录: {search_params}")
+    _flush_pending_writes()
     conn = get_db_connection()
     try:
         # 构建查询条件
@@ -640,6 +1104,7 @@ def export_charging_records_to_json(file_path, record_ids=None):
         bool: 导出是否成功
     """
     logger.info(f"导出充电记录到JSON文件: {file_path}")
+    _flush_pending_writes()
     try:
         # 获取记录
         if record_ids:
@@ -702,50 +1167,55 @@ def import_charging_records_from_json(file_path):
             return {"success": False, "message": "JSON文件格式不正确", "imported_count": 0}
         
         # 导入记录
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        imported_count = 0
-        
-        for record in records:
-            try:
-                # 检查必要字段
-                required_fields = ['start_time', 'initial_soc', 'initial_temperature', 
-                                  'initial_internal_resistance', 'initial_polarization_resistance']
-                if not all(field in record for field in required_fields):
-                    logger.warning(f"跳过记录：缺少必要字段 - {record}")
-                    continue
-                
-                # 处理充电阶段
-                charging_phases = record.get('charging_phases', [])
-                if not isinstance(charging_phases, list):
-                    charging_phases = []
-                
-                # 插入记录
-                cursor.execute("""
-                    INSERT INTO charging_records (
-                        start_time, end_time, initial_soc, final_soc,
-                        initial_temperature, final_temperature,
-                        initial_internal_resistance, initial_polarization_resistance,
-                        duration_seconds, charging_phases
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    record['start_time'],
-                    record.get('end_time'),
-                    record['initial_soc'],
-                    record.get('final_soc'),
-                    record['initial_temperature'],
-                    record.get('final_temperature'),
-                    record['initial_internal_resistance'],
-                    record['initial_polarization_resistance'],
-                    record.get('duration_seconds'),
-                    json.dumps(charging_phases)
-                ))
-                imported_count += 1
-            except (KeyError, TypeError, ValueError) as e:
-                logger.warning(f"导入记录失败: {e} - {record}")
-        
-        conn.commit()
-        conn.close()
+        conn = get_db_connection(write=True)
+        try:
+            cursor = conn.cursor()
+            imported_count = 0
+            
+            for record in records:
+                try:
+                    # 检查必要字段
+                    required_fields = ['start_time', 'initial_soc', 'initial_temperature', 
+                                      'initial_internal_resistance', 'initial_polarization_resistance']
+                    if not all(field in record for field in required_fields):
+                        logger.warning(f"跳过记录：缺少必要字段 - {record}")
+                        continue
+                    
+                    # 处理充电阶段
+                    charging_phases = record.get('charging_phases', [])
+                    if not isinstance(charging_phases, list):
+                        charging_phases = []
+                    
+                    # 插入记录 (ID 与其他插入路径统一分配)
+                    record_id = reserve_charging_record_id()
+                    cursor.execute("""
+                        INSERT INTO charging_records (
+                            id, start_time, end_time, initial_soc, final_soc,
+                            initial_temperature, final_temperature,
+                            initial_internal_resistance, initial_polarization_resistance,
+                            duration_seconds, charging_phases
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        record_id,
+                        record['start_time'],
+                        record.get('end_time'),
+                        record['initial_soc'],
+                        record.get('final_soc'),
+                        record['initial_temperature'],
+                        record.get('final_temperature'),
+                        record['initial_internal_resistance'],
+                        record['initial_polarization_resistance'],
+                        record.get('duration_seconds'),
+                        json.dumps(charging_phases)
+                    ))
+                    cursor.executemany(INSERT_CHARGING_PHASE_SQL, charging_phase_rows(record_id, charging_phases))
+                    imported_count += 1
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.warning(f"导入记录失败: {e} - {record}")
+            
+            conn.commit()
+        finally:
+            conn.close()
         
         logger.info(f"成功导入 {imported_count} 条充电记录")
         return {
@@ -768,7 +1238,7 @@ def update_all_charging_record_durations():
         int: 更新的记录数量
     """
     logger.info("开始更新所有充电记录的时长...")
-    conn = get_db_connection()
+    conn = get_db_connection(write=True)
     try:
         cursor = conn.cursor()
         
@@ -0,0 +1,354 @@
+import copy
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+import sys
+import os
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DATABASE_CONFIG
+from models import database
+
+logger = logging.getLogger("battery-simulator.database")
+
+# 通知写入线程处理完队列后退出的标记
+_STOP = object()
+
+
+class _FlushMarker:
+    """flush() 放入队列的标记，写入线程提交此前的全部写入后设置事件"""
+
+    def __init__(self):
+        self.event = threading.Event()
+
+
+class DatabaseWriter:
+    """后台数据库写入线程 (write-behind)
+
+    调用方把充电记录的插入/更新以及遥测样本放入有界队列后立即返回，写入线程把一批写入
+    (最多 flush_size 项，或第一项入队后最多等待 flush_interval 秒) 以 executemany 在同一个
+    事务中提交，仿真周期不再承担每次写入的提交和磁盘同步。
+
+    - 同一条记录尚未写入的多次更新合并为一次 (后面的字段覆盖前面的)
+    - 队列已满时调用方阻塞等待 (背压)，不会丢弃写入，也不会无限占用内存
+    - 插入充电记录时预先分配ID，调用方立即得到记录ID
+    - 一批写入提交失败时逐项重试，只有无法写入的项目计入 failed
+    - stop() 写完队列中的全部写入后退出；停止后提交的写入在调用线程同步执行
+    """
+
+    def __init__(self, max_queue=10000, flush_size=500, flush_interval=0.5, name="db-writer"):
+        """初始化写入线程 (第一次提交写入时启动)
+
+        参数:
+            max_queue: 队列中等待写入的项目数上限
+            flush_size: 每个事务最多包含的项目数
+            flush_interval: 第一项入队后最多等待多少秒提交
+            name: 线程名
+        """
+        if max_queue < 1 or flush_size < 1:
+            raise ValueError("max_queue 和 flush_size 必须为正数")
+        self.max_queue = max_queue
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.name = name
+        self.accepting = True
+        self.submitted = 0
+        self.coalesced = 0
+        self.blocked_puts = 0
+        self.batches = 0
+        self.rows_written = 0
+        self.failed = 0
+        self.retried_batches = 0
+        self.last_batch_seconds = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._pending_updates = {}  # 记录ID -> 合并后尚未写入的更新
+        self._pending_lock = threading.Lock()
+        self._submit_lock = threading.Lock()  # 入队期间持有，保证 stop() 之后不再有项目入队
+        self._thread = None
+        self._unwritten = 0  # 已入队但尚未写入 (或写入失败) 的项目数
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def insert_charging_record(self, record):
+        """插入一条充电记录
+
+        返回:
+            record_id: 新记录的ID (分配ID失败时为 None)
+        """
+        try:
+            record_id = database.reserve_charging_record_id()
+        except sqlite3.Error as e:
+            logger.error(f"添加充电记录失败: {e}", exc_info=True)
+            return None
+        # 记录和它的阶段行作为一项入队，在同一个事务中写入
+        self._insert({
+            database.INSERT_CHARGING_RECORD_SQL: [database.charging_record_insert_params(record_id, record)],
+            database.INSERT_CHARGING_PHASE_SQL: database.charging_phase_rows(record_id, record.get('charging_phases', [])),
+        })
+        return record_id
+
+    def update_charging_record(self, record_id, updates):
+        """更新一条充电记录 (与尚未写入的同一记录的更新合并)"""
+        # 复制一份: 调用方之后继续修改的充电阶段列表不影响排队中的更新
+        updates = copy.deepcopy(updates)
+        with self._submit_lock:
+            self.submitted += 1
+            if not self.accepting:
+                self._write_now({}, [(record_id, updates)])
+                return
+            with self._pending_lock:
+                pending = self._pending_updates.get(record_id)
+                if pending is not None:
+                    pending.update(updates)
+                    self.coalesced += 1
+                    return
+                self._pending_updates[record_id] = updates
+            self._put(("update", record_id))
+
+    def append_telemetry(self, record_id, samples):
+        """追加一条充电记录的遥测样本 (参见 database.append_telemetry，记录已被删除时丢弃)"""
+        self.insert_rows(database.INSERT_EXISTING_TELEMETRY_SQL, database.telemetry_rows(record_id, samples))
+
+    def insert_rows(self, sql, rows):
+        """追加数据行 (同一语句的行在同一批次中以一次 executemany 写入)
+
+        参数:
+            sql: 带参数占位符的 INSERT 语句
+            rows: 参数元组列表
+        """
+        self._insert({sql: list(rows)})
+
+    def _insert(self, inserts):
+        """提交一项插入 (语句 -> 参数列表)"""
+        inserts = {sql: rows for sql, rows in inserts.items() if rows}
+        if not inserts:
+            return
+        with self._submit_lock:
+            self.submitted += 1
+            if not self.accepting:
+                self._write_now(inserts, [])
+                return
+            self._put(("rows", inserts))
+
+    def flush(self, timeout=None):
+        """等待此前提交的全部写入提交到数据库
+
+        返回:
+            flushed: 是否在 timeout 秒内完成
+        """
+        # 没有待写入项目时立即返回 (读取函数每次调用 flush)；写入线程自身调用时不等待自己
+        if self._unwritten == 0 or threading.current_thread() is self._thread:
+            return True
+        with self._submit_lock:
+            if not self.running:
+                return True
+            marker = _FlushMarker()
+            self._put(marker)
+        return marker.event.wait(timeout)
+
+    def stop(self, timeout=None):
+        """写完队列中的全部写入后退出写入线程
+
+        参数:
+            timeout: 等待线程退出的最长秒数
+
+        返回:
+            stopped: 写入线程是否已退出
+        """
+        with self._submit_lock:
+            self.accepting = False
+            thread = self._thread
+            if thread is not None and thread.is_alive():
+                self._put(_STOP)
+        if thread is None:
+            return True
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning(f"{self.name} 线程未在 {timeout} 秒内写完队列")
+            return False
+        return True
+
+    def _put(self, item):
+        """放入队列 (调用方持有 _submit_lock)，队列已满时阻塞等待写入线程腾出空间"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        if not isinstance(item, _FlushMarker) and item is not _STOP:
+            with self._pending_lock:
+                self._unwritten += 1
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.blocked_puts += 1
+            self._queue.put(item)
+
+    def _write_now(self, inserts, updates):
+        """停止后在调用线程同步写入 (先等待写入线程写完队列，保持写入顺序)"""
+        if self._thread is not None:
+            self._thread.join()
+        if not self._commit(inserts, updates):
+            self.failed += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while (len(batch) < self.flush_size and batch[-1] is not _STOP
+                   and not isinstance(batch[-1], _FlushMarker)):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+            if batch[-1] is _STOP:
+                return
+
+    def _write_batch(self, batch):
+        units = []  # 每个提交的项目: (语句 -> 参数列表, [(记录ID, 更新)])
+        markers = []
+        with self._pending_lock:
+            for item in batch:
+                if item is _STOP:
+                    continue
+                if isinstance(item, _FlushMarker):
+                    markers.append(item)
+                elif item[0] == "rows":
+                    units.append((item[1], []))
+                else:
+                    units.append(({}, [(item[1], self._pending_updates.pop(item[1]))]))
+        if units and not self._commit(*self._merge(units)):
+            if len(units) == 1:
+                self.failed += 1
+            else:
+                # 整批失败时逐项重试，一项无法写入不影响同一批次中其他记录的数据
+                logger.warning(f"{self.name} 批量写入失败，逐项重试 {len(units)} 项")
+                self.retried_batches += 1
+                for inserts, updates in units:
+                    if not self._commit(inserts, updates):
+                        self.failed += 1
+        if units:
+            with self._pending_lock:
+                self._unwritten -= len(units)
+        for marker in markers:
+            marker.event.set()
+
+    @staticmethod
+    def _merge(units):
+        """把多个项目合并为一个事务的写入 (同一语句的参数按提交顺序合并)"""
+        inserts = {}
+        updates = []
+        for unit_inserts, unit_updates in units:
+            for sql, rows in unit_inserts.items():
+                inserts.setdefault(sql, []).extend(rows)
+            updates.extend(unit_updates)
+        return inserts, updates
+
+    def _commit(self, inserts, updates):
+        """在一个事务中写入一批插入和更新 (插入在前，更新可能针对同一批次插入的记录)
+
+        返回:
+            committed: 是否提交成功 (失败时回滚整个事务)
+        """
+        start = time.perf_counter()
+        conn = database.get_db_connection(write=True)
+        try:
+            # 充电记录先于其他行写入: 遥测样本只写入已存在的记录，同一批次中可能先提交了其他记录的遥测
+            for sql in sorted(inserts, key=lambda sql: sql != database.INSERT_CHARGING_RECORD_SQL):
+                conn.executemany(sql, inserts[sql])
+            start_times = {}
+            for record_id, record_updates in updates:
+                if not record_updates.get('start_time'):
+                    row = conn.execute("SELECT start_time FROM charging_records WHERE id = ?",
+                                       (record_id,)).fetchone()
+                    if row:
+                        start_times[record_id] = row['start_time']
+            if updates:
+                conn.executemany(database.UPDATE_CHARGING_RECORD_SQL, [
+                    database.charging_record_update_params(record_id, record_updates, start_times.get(record_id))
+                    for record_id, record_updates in updates
+                ])
+                database.replace_charging_phases(conn, [
+                    (record_id, record_updates.get('charging_phases', [])) for record_id, record_updates in updates
+                ])
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"{self.name} 批量写入失败: {e}", exc_info=True)
+            return False
+        finally:
+            conn.close()
+        self.batches += 1
+        self.rows_written += sum(len(rows) for rows in inserts.values()) + len(updates)
+        self.last_batch_seconds = time.perf_counter() - start
+        return True
+
+    def metrics(self):
+        """导出写入线程统计"""
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "pending_updates": len(self._pending_updates),
+            "submitted": self.submitted,
+            "coalesced_updates": self.coalesced,
+            "blocked_puts": self.blocked_puts,
+            "batches": self.batches,
+            "rows_written": self.rows_written,
+            "failed": self.failed,
+            "retried_batches": self.retried_batches,
+            "last_batch_ms": self.last_batch_seconds * 1000 if self.last_batch_seconds is not None else None,
+        }
+
+
+_shared_writer = None
+_shared_lock = threading.Lock()
+
+
+def get_db_writer():
+    """返回进程内共享的后台写入线程 (参数来自 DATABASE_CONFIG["write_behind"])"""
+    global _shared_writer
+    with _shared_lock:
+        if _shared_writer is None:
+            config = DATABASE_CONFIG.get("write_behind", {})
+            _shared_writer = DatabaseWriter(
+                max_queue=config.get("max_queue", 10000),
+                flush_size=config.get("flush_size", 500),
+                flush_interval=config.get("flush_interval", 0.5),
+            )
+            database.register_pending_writes(_shared_writer.flush)
+        return _shared_writer
+
+
+def write_behind_enabled():
+    return DATABASE_CONFIG.get("write_behind", {}).get("enabled", False)
+
+
+def add_charging_record(record):
+    """添加充电记录 (启用后台写入时由写入线程提交，立即返回记录ID)"""
+    if write_behind_enabled():
+        return get_db_writer().insert_charging_record(record)
+    return database.add_charging_record(record)
+
+
+def update_charging_record(record_id, updates):
+    """更新充电记录 (启用后台写入时由写入线程合并后批量提交)"""
+    if write_behind_enabled():
+        get_db_writer().update_charging_record(record_id, updates)
+    else:
+        database.update_charging_record(record_id, updates)
+
+
+def append_telemetry(record_id, samples):
+    """追加遥测样本 (启用后台写入时由写入线程批量提交)"""
+    if write_behind_enabled():
+        get_db_writer().append_telemetry(record_id, samples)
+    else:
+        database.append_telemetry(record_id, samples)
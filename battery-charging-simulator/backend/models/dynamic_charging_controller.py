@@ -2,33 +2,25 @@ import os
 import numpy as np
 import logging
 
-# 添加TensorFlow导入的异常处理
-try:
-    import tensorflow as tf
-    from tensorflow.keras.models import load_model
-    TF_AVAILABLE = True
-except ImportError as e:
-    logging.getLogger("battery-simulator").warning(f"TensorFlow 导入失败: {e}，将使用简单估计方法")
-    TF_AVAILABLE = False
-
-import pandas as pd
+import sys
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.rul_inference_service import get_inference_service
 
 logger = logging.getLogger("battery-simulator")
 
 class DynamicChargingController:
     """动态充电控制器，基于CNN+LSTM模型的学习结果调整充电参数"""
     
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, inference_service=None):
         """初始化动态充电控制器
         
         参数:
-            model_path: 预训练模型路径
+            model_path: 预训练模型路径，共享推理服务尚未加载模型时用它加载
+            inference_service: RUL 推理服务，默认使用进程内共享的服务 (与 CNNLSTM_RULModel 共用同一组模型)
         """
-        self.model = None
-        self.model_path = model_path or os.path.join("C:", "Projects", "Battery_LSTM", 
-                                                    "RUL_prediction", "saved", "fusion", 
-                                                    "new_prep", "V_CNN+C_LSTM_5_B05_k1", 
-                                                    "saved_model_and_weight.keras")
+        self.inference = inference_service or get_inference_service()
+        self.model_path = model_path
         
         # 特征缩放器
         self.scalers = {
@@ -42,25 +34,24 @@ class DynamicChargingController:
         self.seq_len = 5
         
         # 加载模型
-        if TF_AVAILABLE:
-            self._load_model()
-        else:
-            logger.warning("TensorFlow不可用，将使用简单估计方法进行充电控制")
+        self._load_model()
+    
+    @property
+    def model_available(self):
+        """推理服务是否已加载模型 (服务在控制器创建之后加载模型时同样生效)"""
+        return self.inference.ready
     
     def _load_model(self):
-        """加载预训练模型"""
-        if not TF_AVAILABLE:
-            logger.warning("TensorFlow不可用，无法加载模型")
+        """共享推理服务尚未加载模型时，从 model_path 加载"""
+        if self.inference.ready or self.model_path is None:
             return
-            
-        try:
-            if os.path.exists(self.model_path):
-                self.model = load_model(self.model_path)
-                logger.info(f"成功加载动态充电控制模型: {self.model_path}")
-            else:
-                logger.warning(f"模型文件不存在: {self.model_path}")
-        except Exception as e:
-            logger.error(f"加载动态充电控制模型失败: {e}")
+        if not os.path.exists(self.model_path):
+            logger.warning(f"模型文件不存在: {self.model_path}")
+            return
+        if self.inference.load([self.model_path]):
+            logger.info(f"成功加载动态充电控制模型: {self.model_path}")
+        else:
+            logger.error(f"加载动态充电控制模型失败: {self.model_path}")
     
     def adjust_cc_parameters(self, battery_state, battery_history):
         """调整恒流充电参数
@@ -78,7 +69,7 @@ class DynamicChargingController:
         }
         
         # 如果没有足够的历史数据或模型未加载，返回默认参数
-        if len(battery_history) < self.seq_len or self.model is None:
+        if len(battery_history) < self.seq_len or not self.model_available:
             return default_params
         
         try:
@@ -133,7 +124,7 @@ class DynamicChargingController:
         }
         
         # 如果没有足够的历史数据或模型未加载，返回默认参数
-        if len(battery_history) < self.seq_len or self.model is None:
+        if len(battery_history) < self.seq_len or not self.model_available:
             return default_params
         
         try:
@@ -175,7 +166,7 @@ class DynamicChargingController:
         }
         
         # 如果没有足够的历史数据或模型未加载，返回默认参数
-        if len(battery_history) < self.seq_len or self.model is None:
+        if len(battery_history) < self.seq_len or not self.model_available:
             return default_params
         
         try:
@@ -0,0 +1,118 @@
+import math
+import logging
+import numpy as np
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 导入配置和模型
+from config import BATTERY_CONFIG
+from models.battery_model import BatteryModel
+from models.battery_fleet import CHARGING_MODES
+from models.sim_clock import SimulatedClock
+from models.adaptive_integrator import AdaptiveChargeIntegrator, DEFAULT_MAX_DURATION
+
+logger = logging.getLogger("battery-simulator")
+
+# 充电模式名称到 int8 编码的映射 (与 BatteryFleet 一致)
+MODE_CODES = {mode: code for code, mode in enumerate(CHARGING_MODES)}
+
+
+class HeadlessChargeSimulator:
+    """离线快进充电仿真器
+
+    使用注入的 SimulatedClock 驱动 BatteryModel，不调用 sleep、不写数据库，
+    以 CPU 允许的最快速度积分一次完整的 CC→CV→涓流 充电过程。
+    相同输入总是得到相同输出，适合批量回放充电策略。
+
+    同一个仿真器实例可以重复调用 run()，避免为每次会话重新创建电池模型。
+    """
+
+    def __init__(self, dt=1.0, max_duration=DEFAULT_MAX_DURATION):
+        """初始化离线仿真器
+
+        参数:
+            dt: 仿真时间步长 (秒)
+            max_duration: 单次充电会话的最长仿真时间 (秒)
+        """
+        self.dt = float(dt)
+        self.max_duration = float(max_duration)
+        self.clock = SimulatedClock()
+        self.model = BatteryModel(clock=self.clock, persist_records=False)
+
+    def run(self, initial_soc=20.0, initial_temperature=None, ambient_temperature=None):
+        """从给定初始状态仿真一次完整的充电会话
+
+        参数:
+            initial_soc: 初始SOC (%)
+            initial_temperature: 初始电池温度 (°C)，默认等于环境温度
+            ambient_temperature: 环境温度 (°C)，默认取 BATTERY_CONFIG
+
+        返回:
+            result: 字典，包含以下 NumPy 数组 (第0个样本为初始状态)
+                time, soc, voltage, current, temperature, charging_mode (int8编码)
+                以及 completed (是否在最长时间内充满) 和 charge_time (秒)
+        """
+        model = self.model
+        self.clock.reset()
+        model.reset()
+        model.ambient_temperature = BATTERY_CONFIG["ambient_temperature"] if ambient_temperature is None \
+            else ambient_temperature
+        model.temperature = model.ambient_temperature if initial_temperature is None else initial_temperature
+        model.soc = initial_soc
+        model.start_charging()
+
+        max_steps = int(math.ceil(self.max_duration / self.dt))
+        time_s = np.empty(max_steps + 1)
+        soc = np.empty(max_steps + 1)
+        voltage = np.empty(max_steps + 1)
+        current = np.empty(max_steps + 1)
+        temperature = np.empty(max_steps + 1)
+        charging_mode = np.empty(max_steps + 1, dtype=np.int8)
+
+        n = 0
+        while True:
+            time_s[n] = self.clock.now
+            soc[n] = model.soc
+            voltage[n] = model.voltage
+            current[n] = model.current
+            temperature[n] = model.temperature
+            charging_mode[n] = MODE_CODES[model.charging_mode]
+            n += 1
+            if not model.is_charging or n > max_steps:
+                break
+            self.clock.advance(self.dt)
+            model.update()
+
+        completed = not model.is_charging
+        if not completed:
+            logger.warning(f"离线充电仿真在 {self.max_duration:.0f} 秒内未完成，初始SOC={initial_soc}%")
+            model.stop_charging()
+
+        return {
+            "time": time_s[:n].copy(),
+            "soc": soc[:n].copy(),
+            "voltage": voltage[:n].copy(),
+            "current": current[:n].copy(),
+            "temperature": temperature[:n].copy(),
+            "charging_mode": charging_mode[:n].copy(),
+            "completed": completed,
+            "charge_time": float(time_s[n - 1]),
+        }
+
+
+def run_charge_session(initial_soc=20.0, initial_temperature=None, ambient_temperature=None,
+                       dt=1.0, max_duration=DEFAULT_MAX_DURATION, adaptive=False):
+    """离线仿真一次完整充电会话的便捷函数
+
+    批量回放时请复用 HeadlessChargeSimulator 实例以避免重复创建模型。
+    参数和返回值见 HeadlessChargeSimulator.run。
+    adaptive=True 时改用事件驱动的 AdaptiveChargeIntegrator (忽略 dt)，
+    只在模式切换和状态变化较快处取小步长。
+    """
+    if adaptive:
+        integrator = AdaptiveChargeIntegrator(max_duration=max_duration)
+        return integrator.run(initial_soc, initial_temperature, ambient_temperature)
+    simulator = HeadlessChargeSimulator(dt=dt, max_duration=max_duration)
+    return simulator.run(initial_soc, initial_temperature, ambient_temperature)
@@ -0,0 +1,122 @@
+import copy
+import numpy as np
+
+# 默认记录的信号
+HISTORY_FIELDS = ("timestamp", "soc", "voltage", "current", "temperature", "internal_resistance")
+
+
+class HistoryRingBuffer:
+    """固定容量的列式环形缓冲区，用于保存电池历史数据
+
+    所有信号保存在一个预分配的 (2 × capacity, 信号数) float64 数组中，每条记录同时写入
+    位置 i 和 i + capacity。这样最近 n 条记录总是位于一段连续的行中，
+    window()/column() 返回的都是零拷贝视图，追加为 O(1)，不需要列表切片或 pop(0)。
+
+    返回的视图在后续追加时会被覆盖，需要长期保存时请调用 .copy()。
+    """
+
+    def __init__(self, capacity, fields=HISTORY_FIELDS):
+        """初始化环形缓冲区
+
+        参数:
+            capacity: 最多保存的记录数
+            fields: 信号名称序列
+        """
+        self.capacity = int(capacity)
+        self.fields = tuple(fields)
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        self._data = np.zeros((2 * self.capacity, len(self.fields)))
+        self._next = 0  # 下一条记录的写入位置 [0, capacity)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, values, timestamp=None):
+        """追加一条记录
+
+        参数:
+            values: 可按信号名称取值的对象 (字典或 BatteryState)
+            timestamp: 时间戳 (秒)，为None时从 values 中读取
+        """
+        row = [values[name] for name in self.fields] if timestamp is None else \
+            [timestamp if name == "timestamp" else values[name] for name in self.fields]
+        self.append_row(row)
+
+    def append_row(self, row):
+        """按 fields 的顺序追加一条记录"""
+        data = self._data
+        data[self._next] = row
+        data[self._next + self.capacity] = data[self._next]
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def extend(self, rows):
+        """按时间顺序追加多条记录 (每行按 fields 的顺序)"""
+        for row in rows:
+            self.append_row(row)
+
+    def copy(self):
+        """复制缓冲区 (存储独立)"""
+        buffer = copy.copy(self)
+        buffer._data = self._data.copy()
+        return buffer
+
+    def clear(self):
+        """清空缓冲区 (不释放内存)"""
+        self._next = 0
+        self._count = 0
+
+    def window(self, n=None):
+        """最近 n 条记录的二维视图 (按时间顺序，形状为 (n, 信号数))
+
+        参数:
+            n: 记录数，默认为全部已保存的记录
+        """
+        n = self._count if n is None else min(int(n), self._count)
+        end = self._next + self.capacity
+        return self._data[end - n:end]
+
+    def column(self, name, n=None):
+        """单个信号最近 n 条记录的一维视图 (零拷贝)
+
+        参数:
+            name: 信号名称
+            n: 记录数，默认为全部已保存的记录
+        """
+        return self.window(n)[:, self._index[name]]
+
+    def latest(self, name):
+        """单个信号的最新值"""
+        if self._count == 0:
+            raise IndexError("历史数据为空")
+        return float(self._data[self._next + self.capacity - 1, self._index[name]])
+
+    def records(self, n=None):
+        """最近 n 条记录的字典列表 (复制，用于序列化或兼容旧接口)"""
+        return [dict(zip(self.fields, row)) for row in self.window(n).tolist()]
+
+
+def history_column(history, name, n=None, default=None):
+    """从历史数据中取出单个信号最近 n 条记录的数组
+
+    同时支持 HistoryRingBuffer (返回零拷贝视图) 和字典列表 (返回新数组)。
+
+    参数:
+        history: HistoryRingBuffer 或字典列表
+        name: 信号名称
+        n: 记录数，默认为全部
+        default: 信号不存在时返回的值
+
+    返回:
+        values: 一维 NumPy 数组，信号不存在时返回 default
+    """
+    if isinstance(history, HistoryRingBuffer):
+        if name not in history.fields:
+            return default
+        return history.column(name, n)
+    records = history if n is None else history[-n:]
+    if not records or name not in records[0]:
+        return default
+    return np.array([record[name] for record in records], dtype=np.float64)
@@ -0,0 +1,233 @@
+import bisect
+import logging
+import numpy as np
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 导入配置
+from config import BATTERY_CONFIG
+
+logger = logging.getLogger("battery-simulator")
+
+# 默认电阻温度表的温度轴 (°C)，温度系数为线性关系，两端点即可精确表示
+DEFAULT_TEMPERATURE_AXIS = (-40.0, 120.0)
+
+# 进程内共享的查找表缓存 (只加载一次)
+_battery_tables = None
+_ocv_table_from_file = None
+
+
+class LookupTable2D:
+    """二维查找表 f(SOC, T)，加载一次后以 float64 数组保存
+
+    - 标量查询 (lookup): 使用 bisect 和预先计算的分段斜率，避免创建 NumPy 数组
+    - 批量查询 (interp): 使用 np.searchsorted 向量化双线性插值，输入可为任意形状并按广播规则组合
+    - 超出坐标轴范围时取端点值 (与 np.interp 一致)
+
+    只有一个温度点 (或一个SOC点) 的表退化为一维表，查询时忽略对应的坐标。
+    """
+
+    def __init__(self, soc_axis, temperature_axis, values, name="table"):
+        """初始化查找表
+
+        参数:
+            soc_axis: 单调递增的SOC坐标 (%)，长度 n
+            temperature_axis: 单调递增的温度坐标 (°C)，长度 m
+            values: 形状为 (n, m) 的表值
+            name: 表名称，用于日志
+        """
+        soc_axis = np.asarray(soc_axis, dtype=np.float64)
+        temperature_axis = np.asarray(temperature_axis, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64).reshape(len(soc_axis), len(temperature_axis))
+        for axis_name, axis in (("SOC", soc_axis), ("温度", temperature_axis)):
+            if len(axis) > 1 and np.any(np.diff(axis) <= 0):
+                raise ValueError(f"查找表 {name} 的{axis_name}坐标必须严格递增")
+
+        self.name = name
+        self.soc_axis = soc_axis
+        self.temperature_axis = temperature_axis
+        self.values = values
+        self.soc_dependent = len(soc_axis) > 1
+        self.temperature_dependent = len(temperature_axis) > 1
+
+        # 标量查询函数: 按表的维度生成专用闭包，数据绑定为局部变量 (比 NumPy 标量运算快一个数量级)
+        self.lookup = self._build_scalar_lookup()
+
+    def _build_scalar_lookup(self):
+        """生成标量查询函数 lookup(soc, temperature=25.0) -> float
+
+        一维表使用 bisect 和预先计算的分段斜率/截距 (首尾各增加一段常数段用于端点外推)，
+        二维表使用双线性插值。
+        """
+        bisect_right = bisect.bisect_right
+        if not self.soc_dependent and not self.temperature_dependent:
+            constant = float(self.values[0, 0])
+            return lambda soc, temperature=25.0: constant
+
+        if self.soc_dependent != self.temperature_dependent:
+            axis = self.soc_axis if self.soc_dependent else self.temperature_axis
+            column = self.values[:, 0] if self.soc_dependent else self.values[0, :]
+            if len(axis) == 2:
+                return self._build_linear_lookup(axis, column)
+            slopes = np.diff(column) / np.diff(axis)
+            intercepts = column[:-1] - slopes * axis[:-1]
+            axis = axis.tolist()
+            slopes = [0.0] + slopes.tolist() + [0.0]
+            intercepts = [float(column[0])] + intercepts.tolist() + [float(column[-1])]
+            if self.soc_dependent:
+                def lookup(soc, temperature=25.0):
+                    i = bisect_right(axis, soc)
+                    return intercepts[i] + slopes[i] * soc
+            else:
+                def lookup(soc, temperature=25.0):
+                    i = bisect_right(axis, temperature)
+                    return intercepts[i] + slopes[i] * temperature
+            return lookup
+
+        soc_axis = self.soc_axis.tolist()
+        temperature_axis = self.temperature_axis.tolist()
+        rows = self.values.tolist()
+        last_soc = len(soc_axis) - 2
+        last_temperature = len(temperature_axis) - 2
+
+        def lookup(soc, temperature=25.0):
+            i = min(max(bisect_right(soc_axis, soc) - 1, 0), last_soc)
+            j = min(max(bisect_right(temperature_axis, temperature) - 1, 0), last_temperature)
+            fs = min(max((soc - soc_axis[i]) / (soc_axis[i + 1] - soc_axis[i]), 0.0), 1.0)
+            ft = min(max((temperature - temperature_axis[j]) / (temperature_axis[j + 1] - temperature_axis[j]), 0.0), 1.0)
+            row0 = rows[i]
+            row1 = rows[i + 1]
+            low = row0[j] + (row0[j + 1] - row0[j]) * ft
+            high = row1[j] + (row1[j + 1] - row1[j]) * ft
+            return low + (high - low) * fs
+        return lookup
+
+    def _build_linear_lookup(self, axis, column):
+        """只有一段的一维表 (例如默认的电阻温度表): 范围内直接计算 a + b*x，不调用 bisect"""
+        low, high = float(axis[0]), float(axis[1])
+        low_value, high_value = float(column[0]), float(column[1])
+        slope = (high_value - low_value) / (high - low)
+        intercept = low_value - slope * low
+        if self.soc_dependent:
+            def lookup(soc, temperature=25.0):
+                if soc <= low:
+                    return low_value
+                if soc >= high:
+                    return high_value
+                return intercept + slope * soc
+        else:
+            def lookup(soc, temperature=25.0):
+                if temperature <= low:
+                    return low_value
+                if temperature >= high:
+                    return high_value
+                return intercept + slope * temperature
+        return lookup
+
+    @classmethod
+    def from_csv(cls, path, name=None):
+        """从CSV文件加载查找表
+
+        文件格式: 第一行为表头 "soc,<T1>,<T2>,..."，其后每行为 "<SOC>,<值@T1>,<值@T2>,..."
+
+        参数:
+            path: CSV文件路径
+            name: 表名称，默认使用文件名
+
+        返回:
+            table: LookupTable2D 实例
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            header = f.readline().strip().split(",")
+        data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+        temperature_axis = [float(t) for t in header[1:]]
+        table = cls(data[:, 0], temperature_axis, data[:, 1:], name=name or os.path.basename(path))
+        logger.info(f"已加载查找表 {table.name}: {len(table.soc_axis)} 个SOC点 × {len(temperature_axis)} 个温度点")
+        return table
+
+    def __call__(self, soc, temperature=25.0):
+        """标量查询，等价于 lookup(soc, temperature)；热路径中请直接保存并调用 lookup"""
+        return self.lookup(soc, temperature)
+
+    def interp(self, soc, temperature=25.0):
+        """批量查询 (向量化)
+
+        参数:
+            soc: SOC数组 (%)
+            temperature: 温度数组或标量 (°C)，与 soc 按广播规则组合
+
+        返回:
+            values: 插值结果数组
+        """
+        if not self.temperature_dependent:
+            if not self.soc_dependent:
+                return np.full(np.shape(soc), self.values[0, 0])
+            return np.interp(soc, self.soc_axis, self.values[:, 0])
+        if not self.soc_dependent:
+            return np.interp(temperature, self.temperature_axis, self.values[0, :])
+
+        i, fs = self._locate_array(self.soc_axis, soc)
+        j, ft = self._locate_array(self.temperature_axis, temperature)
+        v = self.values
+        low = v[i, j] + (v[i, j + 1] - v[i, j]) * ft
+        high = v[i + 1, j] + (v[i + 1, j + 1] - v[i + 1, j]) * ft
+        return low + (high - low) * fs
+
+    @staticmethod
+    def _locate_array(axis, x):
+        """返回 x 所在区间的下标数组和区间内的相对位置 (超出范围时钳位)"""
+        x = np.clip(x, axis[0], axis[-1])
+        i = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+        return i, (x - axis[i]) / (axis[i + 1] - axis[i])
+
+
+def build_ocv_table(min_voltage, nominal_voltage, cc_to_cv_voltage, max_voltage):
+    """由电压参数构造默认的分段线性 OCV 表 (与温度无关)
+
+    断点为 (0%, 最小电压)、(10%, 标称电压)、(90%, CC-CV切换电压)、(100%, 最大电压)。
+    """
+    return LookupTable2D([0.0, 10.0, 90.0, 100.0], [25.0],
+                         [[min_voltage], [nominal_voltage], [cc_to_cv_voltage], [max_voltage]], name="ocv")
+
+
+def build_resistance_table(resistance, name="resistance"):
+    """由25°C电阻值和温度系数构造默认的电阻温度表 (与SOC无关)
+
+    R(T) = R25 × (1 + k × (T - 25))，在 DEFAULT_TEMPERATURE_AXIS 范围内精确表示。
+    """
+    k = BATTERY_CONFIG["temperature_coefficient"]
+    values = [[resistance * (1 + k * (t - 25)) for t in DEFAULT_TEMPERATURE_AXIS]]
+    return LookupTable2D([50.0], DEFAULT_TEMPERATURE_AXIS, values, name=name)
+
+
+def load_battery_tables():
+    """加载整包的 R0/R1 查找表
+
+    BATTERY_CONFIG 中配置了 CSV 路径时从文件加载，否则按默认参数构造。
+    R0/R1 表在所有模型实例之间共享，只加载一次。
+
+    返回:
+        tables: 字典 {"internal_resistance": 表, "polarization_resistance": 表}
+    """
+    global _battery_tables
+    if _battery_tables is None:
+        tables = {}
+        for key, config_key, path_key in (("internal_resistance", "default_internal_resistance", "r0_table_path"),
+                                          ("polarization_resistance", "polarization_resistance", "r1_table_path")):
+            path = BATTERY_CONFIG.get(path_key)
+            tables[key] = LookupTable2D.from_csv(path) if path else \
+                build_resistance_table(BATTERY_CONFIG[config_key], name=key)
+        _battery_tables = tables
+    return _battery_tables
+
+
+def load_ocv_table():
+    """加载 CSV 中配置的 OCV(SOC, T) 表，未配置时返回 None (由模型按自身电压参数构造)"""
+    global _ocv_table_from_file
+    path = BATTERY_CONFIG.get("ocv_table_path")
+    if path and _ocv_table_from_file is None:
+        _ocv_table_from_file = LookupTable2D.from_csv(path)
+    return _ocv_table_from_file if path else None
+
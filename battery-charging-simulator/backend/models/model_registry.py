@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+import numpy as np
+
+logger = logging.getLogger("battery-simulator")
+
+
+def estimate_model_bytes(model):
+    """估算模型占用的内存 (字节)
+
+    NumpyRULModel 统计实例上全部 NumPy 数组 (原始权重和加载时变换后的矩阵)，
+    Keras 模型统计全部权重变量。
+    """
+    if isinstance(getattr(model, "weights", None), dict):
+        return _array_bytes(vars(model))
+    try:
+        return int(sum(np.asarray(weight).nbytes for weight in model.weights))
+    except Exception:
+        return 0
+
+
+def _array_bytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_array_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_array_bytes(item) for item in value)
+    return 0
+
+
+class _RegistryEntry:
+    """注册表中的一个已加载模型"""
+
+    def __init__(self, key):
+        self.key = key
+        self.model = None
+        self.refcount = 0
+        self.memory_bytes = 0
+        self.load_seconds = 0.0
+        self.thread_safe = True
+        self.lock = threading.Lock()  # 加载期间以及非线程安全模型的推理期间持有
+
+
+class ModelHandle:
+    """注册表发放的共享模型句柄
+
+    多个持有者共享同一个模型对象；不是线程安全的模型 (例如 Keras Model.predict) 通过
+    predict() 调用时按模型串行执行。持有者不再使用模型时调用 release()，最后一个句柄释放后模型被卸载。
+    """
+
+    def __init__(self, registry, entry):
+        self._registry = registry
+        self._entry = entry
+        self.released = False
+
+    @property
+    def key(self):
+        return self._entry.key
+
+    @property
+    def model(self):
+        return self._entry.model
+
+    @property
+    def memory_bytes(self):
+        return self._entry.memory_bytes
+
+    @property
+    def load_seconds(self):
+        return self._entry.load_seconds
+
+    def predict(self, *args, **kwargs):
+        """调用模型的 predict (非线程安全的模型按模型加锁)"""
+        if self._entry.thread_safe:
+            return self._entry.model.predict(*args, **kwargs)
+        with self._entry.lock:
+            return self._entry.model.predict(*args, **kwargs)
+
+    def release(self):
+        """释放句柄 (重复调用无效)"""
+        if not self.released:
+            self.released = True
+            self._registry._release(self._entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class ModelRegistry:
+    """进程内的模型注册表
+
+    每个模型文件 (以键区分，例如 (后端, 路径, 量化方式)) 只加载一次，所有调用方通过引用计数的
+    ModelHandle 共享同一个模型对象，创建多少个电池/控制器都不会增加模型副本。
+    引用计数归零时卸载模型；记录每个模型的内存占用和加载耗时。
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.loads = 0  # 实际加载模型文件的次数
+        self.unloads = 0
+
+    def acquire(self, key, loader, thread_safe=True):
+        """获取模型句柄，模型尚未加载时调用 loader 加载
+
+        同一个键被多个线程同时请求时只加载一次，其余线程等待加载完成后共享结果。
+
+        参数:
+            key: 模型的唯一键 (可哈希)
+            loader: 无参数函数，返回加载的模型
+            thread_safe: 模型的 predict 是否可以被多个线程同时调用
+
+        返回:
+            handle: ModelHandle
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _RegistryEntry(key)
+            entry.refcount += 1
+        with entry.lock:
+            if entry.model is None:
+                start = time.perf_counter()
+                try:
+                    model = loader()
+                except Exception:
+                    self._release(entry)
+                    raise
+                entry.load_seconds = time.perf_counter() - start
+                entry.memory_bytes = estimate_model_bytes(model)
+                entry.thread_safe = thread_safe
+                entry.model = model
+                self.loads += 1
+                logger.info(f"模型注册表已加载 {key} ({entry.memory_bytes / 1024:.1f} KB，"
+                            f"{entry.load_seconds:.2f} 秒)")
+        return ModelHandle(self, entry)
+
+    def _release(self, entry):
+        with self._lock:
+            entry.refcount -= 1
+            if entry.refcount > 0 or self._entries.get(entry.key) is not entry:
+                return
+            del self._entries[entry.key]
+            if entry.model is not None:
+                self.unloads += 1
+                logger.info(f"模型注册表已卸载 {entry.key}")
+        entry.model = None
+
+    def refcount(self, key):
+        """键对应模型的引用计数 (未加载时为 0)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.refcount if entry is not None else 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def metrics(self):
+        """导出注册表统计 (每个模型的引用计数、内存占用和加载耗时)"""
+        with self._lock:
+            entries = list(self._entries.values())
+        models = [{
+            "key": [str(part) for part in entry.key] if isinstance(entry.key, tuple) else str(entry.key),
+            "refcount": entry.refcount,
+            "memory_bytes": entry.memory_bytes,
+            "load_seconds": entry.load_seconds,
+        } for entry in entries if entry.model is not None]
+        return {
+            "models": models,
+            "total_memory_bytes": sum(model["memory_bytes"] for model in models),
+            "loads": self.loads,
+            "unloads": self.unloads,
+        }
+
+
+_shared_registry = None
+_shared_lock = threading.Lock()
+
+
+def get_model_registry():
+    """返回进程内共享的模型注册表"""
+    global _shared_registry
+    with _shared_lock:
+        if _shared_registry is None:
+            _shared_registry = ModelRegistry()
+        return _shared_registry
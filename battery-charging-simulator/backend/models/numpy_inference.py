@@ -0,0 +1,450 @@
+import os
+import io
+import json
+import logging
+import zipfile
+import numpy as np
+
+try:
+    import h5py
+    H5PY_AVAILABLE = True
+except ImportError:
+    H5PY_AVAILABLE = False
+
+logger = logging.getLogger("battery-simulator")
+
+# 导出文件中保存的权重数组
+WEIGHT_NAMES = (
+    "lstm_kernel", "lstm_recurrent_kernel", "lstm_bias",
+    "conv_kernel", "conv_bias",
+    "hidden_kernel", "hidden_bias",
+    "output_kernel", "output_bias",
+)
+
+# 支持的网络结构: [LSTM_Input, CNN_Input] -> LSTM / Conv1D -> Concatenate -> Flatten -> Dense(relu) -> Dense
+SUPPORTED_LAYERS = ("InputLayer", "InputLayer", "LSTM", "Conv1D", "Concatenate", "Flatten", "Dense", "Dense")
+
+# 量化变体 (None 为原始 float32 权重)
+QUANTIZATION_MODES = ("int8", "float16")
+
+# int8 量化时按输出通道 (最后一维) 计算缩放系数的权重矩阵，偏置保持 float32
+QUANTIZED_KERNELS = ("lstm_kernel", "lstm_recurrent_kernel", "conv_kernel", "hidden_kernel", "output_kernel")
+
+
+def _weights_group_name(class_name, counts):
+    """Keras 3 权重文件中按层类型自动编号的分组名 (lstm, conv1d, dense, dense_1, ...)"""
+    base = {"LSTM": "lstm", "Conv1D": "conv1d", "Dense": "dense"}[class_name]
+    index = counts.get(base, 0)
+    counts[base] = index + 1
+    return base if index == 0 else f"{base}_{index}"
+
+
+def export_keras_weights(keras_path, npz_path=None):
+    """将 CNN+LSTM 融合模型 (.keras) 的权重导出为 .npz，不需要 TensorFlow
+
+    直接读取 .keras 压缩包中的 config.json 和 model.weights.h5，
+    校验网络结构与 CNNLSTM_RULModel._create_model 一致后保存权重和结构参数。
+
+    参数:
+        keras_path: .keras 模型文件路径
+        npz_path: 输出路径，默认与模型文件同名，扩展名为 .npz
+
+    返回:
+        npz_path: 导出的 .npz 文件路径
+    """
+    if not H5PY_AVAILABLE:
+        raise ImportError("导出 .keras 权重需要 h5py")
+    npz_path = npz_path or os.path.splitext(keras_path)[0] + ".npz"
+
+    with zipfile.ZipFile(keras_path) as archive:
+        config = json.loads(archive.read("config.json"))["config"]
+        weights_file = io.BytesIO(archive.read("model.weights.h5"))
+
+    layers = config["layers"]
+    if tuple(layer["class_name"] for layer in layers) != SUPPORTED_LAYERS:
+        raise ValueError(f"不支持的网络结构: {[layer['class_name'] for layer in layers]}")
+    by_class = {}
+    for layer in layers:
+        by_class.setdefault(layer["class_name"], []).append(layer["config"])
+    inputs = {layer["config"]["name"]: layer["config"]["batch_shape"] for layer in layers[:2]}
+    input_order = [name for name, _, _ in config["input_layers"]]
+    lstm, conv = by_class["LSTM"][0], by_class["Conv1D"][0]
+    hidden, output = by_class["Dense"]
+    if (lstm["activation"], lstm["recurrent_activation"], lstm["return_sequences"]) != ("tanh", "sigmoid", True) \
+            or conv["padding"] != "same" or tuple(conv["strides"]) != (1,) or tuple(conv["dilation_rate"]) != (1,) \
+            or conv["activation"] != "relu" or hidden["activation"] != "relu" or output["activation"] != "linear":
+        raise ValueError("网络层参数与 NumPy 推理引擎不一致")
+
+    counts = {}
+    arrays = {}
+    with h5py.File(weights_file, "r") as f:
+        def read(class_name, sub=""):
+            group = f[f"layers/{_weights_group_name(class_name, counts)}{sub}/vars"]
+            return [np.array(group[str(i)]) for i in range(len(group))]
+        arrays["lstm_kernel"], arrays["lstm_recurrent_kernel"], arrays["lstm_bias"] = read("LSTM", "/cell")
+        arrays["conv_kernel"], arrays["conv_bias"] = read("Conv1D")
+        arrays["hidden_kernel"], arrays["hidden_bias"] = read("Dense")
+        arrays["output_kernel"], arrays["output_bias"] = read("Dense")
+
+    meta = {
+        "input_order": input_order,
+        "lstm_input_shape": inputs["LSTM_Input"][1:],
+        "cnn_input_shape": inputs["CNN_Input"][1:],
+        "source": os.path.basename(keras_path),
+    }
+    np.savez(npz_path, __meta__=np.array(json.dumps(meta)), **arrays)
+    logger.info(f"已导出模型权重: {keras_path} -> {npz_path}")
+    return npz_path
+
+
+def quantize_weights(weights, mode):
+    """训练后量化权重
+
+    参数:
+        weights: 字典，包含 WEIGHT_NAMES 中的全部权重数组
+        mode: "int8" (卷积/LSTM/全连接层的核按输出通道对称量化，附带 <名称>_scale 缩放系数)
+            或 "float16" (全部权重转换为半精度)
+
+    返回:
+        arrays: 可直接保存到 .npz 的数组字典
+    """
+    if mode == "float16":
+        return {name: np.asarray(weights[name], dtype=np.float16) for name in WEIGHT_NAMES}
+    if mode != "int8":
+        raise ValueError(f"未知的量化方式: {mode}")
+    arrays = {}
+    for name in WEIGHT_NAMES:
+        weight = np.asarray(weights[name], dtype=np.float32)
+        if name not in QUANTIZED_KERNELS:
+            arrays[name] = weight
+            continue
+        # 每个输出通道的缩放系数 = 该通道最大绝对值 / 127 (全零通道取 1)
+        max_abs = np.abs(weight).reshape(-1, weight.shape[-1]).max(axis=0)
+        scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        arrays[name] = np.clip(np.rint(weight / scale), -127, 127).astype(np.int8)
+        arrays[name + "_scale"] = scale
+    return arrays
+
+
+def dequantize_weights(arrays, mode):
+    """将量化后的数组还原为 float64 权重 (mode 为 None 时原样转换)"""
+    if mode == "int8":
+        return {name: arrays[name].astype(np.float64) * arrays[name + "_scale"] if name + "_scale" in arrays
+                else arrays[name].astype(np.float64) for name in WEIGHT_NAMES}
+    if mode not in (None, "float16"):
+        raise ValueError(f"未知的量化方式: {mode}")
+    return {name: np.asarray(arrays[name], dtype=np.float64) for name in WEIGHT_NAMES}
+
+
+def quantized_path(path, mode):
+    """量化变体的文件路径，例如 model_k1.keras -> model_k1.int8.npz (mode 为 None 时为 model_k1.npz)"""
+    base = os.path.splitext(path)[0]
+    return f"{base}.{mode}.npz" if mode else base + ".npz"
+
+
+def export_quantized_weights(keras_path, mode, npz_path=None):
+    """导出 .keras 模型的量化变体 (.int8.npz / .float16.npz)
+
+    参数:
+        keras_path: .keras 模型文件路径
+        mode: 量化方式，见 QUANTIZATION_MODES
+        npz_path: 输出路径，默认为 quantized_path(keras_path, mode)
+
+    返回:
+        npz_path: 导出的文件路径
+    """
+    npz_path = npz_path or quantized_path(keras_path, mode)
+    float_path = quantized_path(keras_path, None)
+    if not os.path.exists(float_path) or os.path.getmtime(float_path) < os.path.getmtime(keras_path):
+        export_keras_weights(keras_path, float_path)
+    with np.load(float_path, allow_pickle=False) as data:
+        meta = json.loads(str(data["__meta__"]))
+        weights = {name: data[name] for name in WEIGHT_NAMES}
+    meta["quantization"] = mode
+    np.savez(npz_path, __meta__=np.array(json.dumps(meta)), **quantize_weights(weights, mode))
+    logger.info(f"已导出 {mode} 量化模型: {keras_path} -> {npz_path}")
+    return npz_path
+
+
+class NumpyRULModel:
+    """CNN+LSTM 融合模型的纯 NumPy 前向推理实现
+
+    与 Keras 模型的计算完全相同 (默认与 TensorFlow 一样使用 float32，结果相差 < 1e-5)，
+    predict([lstm_input, cnn_input]) 的调用方式与 keras.Model.predict 一致，可直接放入
+    CNNLSTM_RULModel.models 参与集成预测。
+
+    加载时做了几处等价变换，减少每次推理的 NumPy 调用次数 (小矩阵下耗时主要是调用开销):
+    - 序列长度固定，"same" 填充的 Conv1D 展开为一次 (T·C_in, T·F) 矩阵乘法
+    - Concatenate + Flatten 的交错顺序折叠进隐藏层权重，LSTM 和 CNN 分支各做一次矩阵乘法后相加
+    - 利用 σ(x) = 0.5·tanh(x/2) + 0.5，将 i、f、o 门的权重预先乘以 0.5，每个时间步只需一次 tanh 计算全部门
+
+    量化变体在内存中保持量化后的权重并直接参与计算:
+    - float16: 权重、激活和临时数组都是半精度 (计算精度固定为 float16)
+    - int8: 各层的核保持 int8，矩阵乘法的结果乘以按输出通道的缩放系数 (i、f、o 门的 0.5 并入缩放系数)
+    """
+
+    def __init__(self, weights, meta=None, dtype=np.float32):
+        """初始化推理引擎
+
+        参数:
+            weights: 字典，包含 WEIGHT_NAMES 中的全部权重数组 (int8 变体另含 <名称>_scale 缩放系数)
+            meta: 导出时记录的结构参数 (quantization 为量化方式)
+            dtype: 计算精度，float32 (默认) 的运算和临时数组都比 float64 小一半；float16 变体固定为 float16
+        """
+        self.meta = meta or {}
+        self.quantization = self.meta.get("quantization")
+        if self.quantization == "float16":
+            dtype = np.float16
+        elif self.quantization not in (None, "int8"):
+            raise ValueError(f"未知的量化方式: {self.quantization}")
+        self.dtype = dtype
+        int8 = self.quantization == "int8"
+        if self.quantization:
+            # 原始 (Keras 布局) 权重保持量化后的类型 (int8 附带缩放系数)，不在内存中保留 float64 副本
+            weights = {name: np.asarray(value) for name, value in weights.items()}
+        else:
+            weights = {name: np.asarray(value, dtype=np.float64) for name, value in weights.items()}
+        self.weights = weights  # 原始 (Keras 布局) 权重，用于合并集成模型
+        self.units = units = weights["lstm_recurrent_kernel"].shape[0]
+        # i、f、o 门 (sigmoid) 的列乘以 0.5，候选记忆 c 门 (tanh) 的列保持不变
+        gate_scale = np.full(4 * units, 0.5)
+        gate_scale[2 * units:3 * units] = 1.0
+        if int8:
+            self.lstm_kernel = weights["lstm_kernel"]
+            self.lstm_recurrent_kernel = weights["lstm_recurrent_kernel"]
+            self.lstm_kernel_scale = weights["lstm_kernel_scale"] * gate_scale
+            self.lstm_recurrent_kernel_scale = weights["lstm_recurrent_kernel_scale"] * gate_scale
+        else:
+            self.lstm_kernel = weights["lstm_kernel"] * gate_scale
+            self.lstm_recurrent_kernel = weights["lstm_recurrent_kernel"] * gate_scale
+            self.lstm_kernel_scale = self.lstm_recurrent_kernel_scale = None
+        self.lstm_bias = weights["lstm_bias"] * gate_scale
+
+        conv_kernel = weights["conv_kernel"]  # (K, C_in, F)
+        kernel_size, channels, filters = conv_kernel.shape
+        steps = self.meta.get("cnn_input_shape", [self.meta.get("lstm_input_shape", [5])[0]])[0]
+        self.steps = steps
+        self.cnn_channels = channels
+
+        # Conv1D (same) 展开为矩阵: out[t] = Σ_k x[t + k - pad] · W[k]
+        pad = (kernel_size - 1) // 2
+        conv_matrix = np.zeros((steps, channels, steps, filters), dtype=conv_kernel.dtype)
+        for t in range(steps):
+            for k in range(kernel_size):
+                source = t + k - pad
+                if 0 <= source < steps:
+                    conv_matrix[source, :, t, :] = conv_kernel[k]
+        self.conv_matrix = conv_matrix.reshape(steps * channels, steps * filters)
+        self.conv_bias = np.tile(weights["conv_bias"], steps)
+
+        # Flatten 后的第 t·(U+F) + j 个特征对应第 t 步拼接向量 [h_t (U), conv_t (F)] 的第 j 个分量
+        hidden_kernel = weights["hidden_kernel"].reshape(steps, self.units + filters, -1)
+        self.hidden_kernel_lstm = hidden_kernel[:, :self.units, :].reshape(steps * self.units, -1)
+        self.hidden_kernel_cnn = hidden_kernel[:, self.units:, :].reshape(steps * filters, -1)
+        self.hidden_bias = weights["hidden_bias"]
+        self.output_kernel = weights["output_kernel"]
+        self.output_bias = weights["output_bias"]
+
+        # 变换在 float64 (量化变体为量化后的类型) 下完成后再转换为计算精度
+        kernels = ("lstm_kernel", "lstm_recurrent_kernel", "conv_matrix", "hidden_kernel_lstm", "hidden_kernel_cnn",
+                   "output_kernel")
+        for name in kernels + ("lstm_bias", "conv_bias", "hidden_bias", "output_bias"):
+            kernel_dtype = np.int8 if int8 and name in kernels else dtype
+            setattr(self, name, np.ascontiguousarray(getattr(self, name), dtype=kernel_dtype))
+        # int8 核的输出通道缩放系数 (浮点权重为 None)
+        self.conv_matrix_scale = np.tile(weights["conv_kernel_scale"], steps) if int8 else None
+        self.hidden_kernel_scale = weights["hidden_kernel_scale"] if int8 else None
+        self.output_kernel_scale = weights["output_kernel_scale"] if int8 else None
+        for name in ("lstm_kernel_scale", "lstm_recurrent_kernel_scale", "conv_matrix_scale",
+                     "hidden_kernel_scale", "output_kernel_scale"):
+            if getattr(self, name) is not None:
+                setattr(self, name, np.ascontiguousarray(getattr(self, name), dtype=dtype))
+
+    @classmethod
+    def from_npz(cls, path, dtype=np.float32):
+        """从 export_keras_weights / export_quantized_weights 导出的 .npz 文件加载
+
+        量化变体不反量化: float16 变体以半精度计算，int8 变体的核保持 int8 (dtype 为缩放后的计算精度)。
+        """
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["__meta__"])) if "__meta__" in data.files else {}
+            weights = {name: data[name] for name in data.files if name != "__meta__"}
+        return cls(weights, meta, dtype)
+
+    @classmethod
+    def from_keras(cls, keras_path, dtype=np.float32, quantization=None):
+        """导出 (或复用已导出的) .keras 权重并加载
+
+        同名 .npz (量化变体为 .int8.npz / .float16.npz) 已存在且不早于模型文件时直接加载，否则重新导出。
+
+        参数:
+            keras_path: .keras 模型文件路径
+            dtype: 计算精度
+            quantization: None、"int8" 或 "float16"
+        """
+        npz_path = quantized_path(keras_path, quantization)
+        if not os.path.exists(npz_path) or os.path.getmtime(npz_path) < os.path.getmtime(keras_path):
+            if quantization:
+                export_quantized_weights(keras_path, quantization, npz_path)
+            else:
+                export_keras_weights(keras_path, npz_path)
+        return cls.from_npz(npz_path, dtype)
+
+    def forward(self, lstm_input, cnn_input):
+        """批量前向计算
+
+        参数:
+            lstm_input: 形状为 (B, T, 1) 的容量序列
+            cnn_input: 形状为 (B, T, C) 的电压特征序列
+
+        返回:
+            output: 形状为 (B, 1) 的预测值
+        """
+        dtype = self.dtype
+        lstm_input = np.asarray(lstm_input, dtype=dtype)
+        batch = lstm_input.shape[0]
+        units = self.units
+
+        # CNN 分支 (展开的 Conv1D + relu) 直接乘以隐藏层权重中对应的部分
+        # (int8 核的矩阵乘法结果乘以输出通道缩放系数后再加偏置)
+        conv = np.asarray(cnn_input, dtype=dtype).reshape(batch, -1) @ self.conv_matrix
+        if self.conv_matrix_scale is not None:
+            conv *= self.conv_matrix_scale
+        conv += self.conv_bias
+        np.maximum(conv, 0, out=conv)
+        hidden = conv @ self.hidden_kernel_cnn
+
+        # LSTM (门顺序 i, f, c, o)，所有时间步的输入投影一次算完
+        # (单特征输入时用广播乘法代替秩1矩阵乘法，后者在 BLAS 中很慢)
+        if self.lstm_kernel.shape[0] == 1:
+            projected = lstm_input * self.lstm_kernel[0]  # (B, T, 4U)
+        else:
+            projected = lstm_input @ self.lstm_kernel
+        if self.lstm_kernel_scale is not None:
+            projected *= self.lstm_kernel_scale
+        projected += self.lstm_bias
+        sequence = np.empty((batch, self.steps, units), dtype=dtype)  # 各时间步的 h，对应 Flatten 后的 LSTM 部分
+        recurrent = self.lstm_recurrent_kernel
+        recurrent_scale = self.lstm_recurrent_kernel_scale
+        h = np.zeros((batch, units), dtype=dtype)
+        c = np.zeros((batch, units), dtype=dtype)
+        for t in range(self.steps):
+            if recurrent_scale is None:
+                gates = np.tanh(projected[:, t] + h @ recurrent)
+            else:
+                gates = np.tanh(projected[:, t] + (h @ recurrent) * recurrent_scale)
+            sigmoid = gates * 0.5
+            sigmoid += 0.5
+            c = sigmoid[:, units:2 * units] * c + sigmoid[:, :units] * gates[:, 2 * units:3 * units]
+            h = sequence[:, t] = sigmoid[:, 3 * units:] * np.tanh(c)
+        hidden += sequence.reshape(batch, -1) @ self.hidden_kernel_lstm
+        # 两个分支共用隐藏层的输出通道缩放系数
+        if self.hidden_kernel_scale is not None:
+            hidden *= self.hidden_kernel_scale
+        hidden += self.hidden_bias
+        np.maximum(hidden, 0, out=hidden)
+        output = hidden @ self.output_kernel
+        if self.output_kernel_scale is not None:
+            output *= self.output_kernel_scale
+        return output + self.output_bias
+
+    def predict(self, inputs, verbose=0):
+        """与 keras.Model.predict 相同的调用方式: predict([lstm_input, cnn_input])"""
+        lstm_input, cnn_input = inputs
+        return self.forward(lstm_input, cnn_input)
+
+    __call__ = predict
+
+
+class FusedEnsembleModel(NumpyRULModel):
+    """将 K 个结构相同的折模型合并为一个网络，一次前向计算得到全部 K 个预测值
+
+    各折共享同一组输入，合并方式:
+    - LSTM 单元数变为 K·U，各门的列按 [i_1..i_K, f_1..f_K, c_1..c_K, o_1..o_K] 排列，
+      递归权重为块对角矩阵，因此各折的隐藏状态互不影响
+    - Conv1D 的卷积核沿输出通道拼接
+    - 隐藏层和输出层为块对角矩阵，输出形状为 (B, K)，第 k 列即第 k 个折模型的预测值
+
+    块对角矩阵中的零块使乘法量约为逐个计算的 K 倍，但每个时间步只需一次 NumPy 调用，
+    对这种小模型而言调用开销远大于计算量。
+
+    量化变体直接合并量化后的权重 (int8 核保持 int8，缩放系数随列一起重排)，各折的量化方式必须相同。
+    """
+
+    def __init__(self, models, dtype=None):
+        """合并折模型
+
+        参数:
+            models: NumpyRULModel 列表 (结构和量化方式必须相同)
+            dtype: 计算精度，默认与折模型相同
+        """
+        folds = len(models)
+        if folds == 0:
+            raise ValueError("至少需要一个折模型")
+        first = models[0].weights
+        units = first["lstm_recurrent_kernel"].shape[0]
+        kernel_size, channels, filters = first["conv_kernel"].shape
+        hidden_units = first["hidden_kernel"].shape[1]
+        steps = models[0].steps
+        quantization = models[0].quantization
+        for model in models[1:]:
+            if any(model.weights[name].shape != first[name].shape for name in WEIGHT_NAMES):
+                raise ValueError("折模型的结构不一致，无法合并")
+            if model.quantization != quantization:
+                raise ValueError("折模型的量化方式不一致，无法合并")
+        int8 = quantization == "int8"
+        kernel_dtype = {"int8": np.int8, "float16": np.float16}.get(quantization, np.float64)
+
+        stacked_units, stacked_filters, stacked_hidden = folds * units, folds * filters, folds * hidden_units
+        lstm_kernel = np.zeros((first["lstm_kernel"].shape[0], 4 * stacked_units), dtype=kernel_dtype)
+        recurrent_kernel = np.zeros((stacked_units, 4 * stacked_units), dtype=kernel_dtype)
+        lstm_bias = np.zeros(4 * stacked_units)
+        hidden_kernel = np.zeros((steps, stacked_units + stacked_filters, stacked_hidden), dtype=kernel_dtype)
+        output_kernel = np.zeros((stacked_hidden, folds), dtype=kernel_dtype)
+        # int8 核的输出通道缩放系数，与核的列一起重排
+        scales = {"lstm_kernel": np.ones(4 * stacked_units), "lstm_recurrent_kernel": np.ones(4 * stacked_units),
+                  "hidden_kernel": np.ones(stacked_hidden), "output_kernel": np.ones(folds)}
+        for k, model in enumerate(models):
+            w = model.weights
+            rows = slice(k * units, (k + 1) * units)
+            for gate in range(4):
+                source = slice(gate * units, (gate + 1) * units)
+                target = slice(gate * stacked_units + k * units, gate * stacked_units + (k + 1) * units)
+                lstm_kernel[:, target] = w["lstm_kernel"][:, source]
+                recurrent_kernel[rows, target] = w["lstm_recurrent_kernel"][:, source]
+                lstm_bias[target] = w["lstm_bias"][source]
+                if int8:
+                    scales["lstm_kernel"][target] = w["lstm_kernel_scale"][source]
+                    scales["lstm_recurrent_kernel"][target] = w["lstm_recurrent_kernel_scale"][source]
+            # 原隐藏层权重按 Flatten 顺序拆成每步的 [h_t, conv_t] 两部分，放入合并后的对应位置
+            fold_hidden = w["hidden_kernel"].reshape(steps, units + filters, hidden_units)
+            columns = slice(k * hidden_units, (k + 1) * hidden_units)
+            hidden_kernel[:, rows, columns] = fold_hidden[:, :units]
+            hidden_kernel[:, stacked_units + k * filters:stacked_units + (k + 1) * filters, columns] = \
+                fold_hidden[:, units:]
+            output_kernel[columns, k] = w["output_kernel"][:, 0]
+            if int8:
+                scales["hidden_kernel"][columns] = w["hidden_kernel_scale"]
+                scales["output_kernel"][k] = w["output_kernel_scale"][0]
+
+        weights = {
+            "lstm_kernel": lstm_kernel,
+            "lstm_recurrent_kernel": recurrent_kernel,
+            "lstm_bias": lstm_bias,
+            "conv_kernel": np.concatenate([m.weights["conv_kernel"] for m in models], axis=2),
+            "conv_bias": np.concatenate([m.weights["conv_bias"] for m in models]),
+            "hidden_kernel": hidden_kernel.reshape(-1, stacked_hidden),
+            "hidden_bias": np.concatenate([m.weights["hidden_bias"] for m in models]),
+            "output_kernel": output_kernel,
+            "output_bias": np.concatenate([m.weights["output_bias"] for m in models]),
+        }
+        if int8:
+            weights.update({name + "_scale": scale for name, scale in scales.items()})
+            weights["conv_kernel_scale"] = np.concatenate([m.weights["conv_kernel_scale"] for m in models])
+        super().__init__(weights, dict(models[0].meta, folds=folds), dtype or models[0].dtype)
+        self.folds = folds
+
+    def predict_folds(self, lstm_input, cnn_input):
+        """返回每个折模型的预测值，形状为 (B, K)"""
+        return self.forward(lstm_input, cnn_input)
+
@@ -0,0 +1,170 @@
+import os
+import math
+import time
+import logging
+import itertools
+import numpy as np
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 导入配置和模型
+from config import BATTERY_CONFIG
+from models.battery_fleet import BatteryFleet
+from models.adaptive_integrator import DEFAULT_MAX_DURATION
+
+logger = logging.getLogger("battery-simulator")
+
+# 扫描参数 (与 BatteryModel.update_charging_params 的含义一致)
+SWEEP_PARAMETERS = ("cc_current", "cv_voltage", "ambient_temperature", "initial_soc")
+
+# 结果表的列
+RESULT_COLUMNS = SWEEP_PARAMETERS + ("charge_time", "peak_temperature", "energy_kwh", "completed")
+
+# 自动分块时每块的最小组合数
+MIN_CHUNK_SIZE = 256
+
+
+def build_sweep_grid(cc_currents, cv_voltages, ambient_temperatures, initial_socs):
+    """构造参数网格 (笛卡尔积)
+
+    参数:
+        cc_currents: 恒流充电电流列表 (C-rate)
+        cv_voltages: 恒压充电电压列表 (V，整包)
+        ambient_temperatures: 环境温度列表 (°C)
+        initial_socs: 初始SOC列表 (%)
+
+    返回:
+        grid: 字典，每个扫描参数对应一个长度为组合数的数组
+    """
+    combinations = np.array(list(itertools.product(cc_currents, cv_voltages, ambient_temperatures, initial_socs)),
+                            dtype=np.float64).reshape(-1, len(SWEEP_PARAMETERS))
+    return {name: combinations[:, i].copy() for i, name in enumerate(SWEEP_PARAMETERS)}
+
+
+def simulate_sweep_chunk(chunk, dt=1.0, max_duration=DEFAULT_MAX_DURATION):
+    """在当前进程中用 BatteryFleet 批量仿真一组参数组合 (进程池工作函数)
+
+    参数映射与 BatteryModel.update_charging_params 相同:
+        最大充电电流 = cc_current × 容量，最大电压 = cv_voltage，CC→CV 切换电压 = cv_voltage × 0.98
+
+    参数:
+        chunk: 字典，每个扫描参数对应一个数组
+        dt: 仿真时间步长 (秒)
+        max_duration: 最长仿真时间 (秒)
+
+    返回:
+        result: 字典，包含 charge_time、peak_temperature、energy_kwh、completed 数组，
+                以及 pid (工作进程号) 和 elapsed (计算耗时，秒)
+    """
+    start = time.perf_counter()
+    capacity = BATTERY_CONFIG["capacity"]
+    fleet = BatteryFleet(
+        len(chunk["initial_soc"]),
+        soc=chunk["initial_soc"],
+        temperature=chunk["ambient_temperature"],
+        ambient_temperature=chunk["ambient_temperature"],
+        max_charging_current=chunk["cc_current"] * capacity,
+        max_voltage=chunk["cv_voltage"],
+        cc_to_cv_voltage=chunk["cv_voltage"] * 0.98,
+    )
+    fleet.start_charging()
+
+    charge_time = np.full(fleet.size, np.nan)
+    peak_temperature = fleet.temperature.copy()
+    energy = np.zeros(fleet.size)  # 焦耳
+
+    max_steps = int(math.ceil(max_duration / dt))
+    for step in range(1, max_steps + 1):
+        charging = fleet.is_charging.copy()
+        fleet.step(dt)
+        energy += np.where(charging, fleet.voltage * fleet.current * dt, 0.0)
+        np.maximum(peak_temperature, np.where(charging, fleet.temperature, -np.inf), out=peak_temperature)
+        charge_time[charging & ~fleet.is_charging] = step * dt
+        if not fleet.is_charging.any():
+            break
+
+    return {
+        "charge_time": charge_time,
+        "peak_temperature": peak_temperature,
+        "energy_kwh": energy / 3.6e6,
+        "completed": ~fleet.is_charging,
+        "pid": os.getpid(),
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def run_parameter_sweep(cc_currents, cv_voltages, ambient_temperatures, initial_socs, dt=1.0,
+                        max_workers=None, chunk_size=None, max_duration=DEFAULT_MAX_DURATION):
+    """在进程池中并行扫描充电策略参数网格
+
+    网格被切分为若干块，每块在一个工作进程中作为一个 BatteryFleet 批量仿真。
+    块数约为工作进程数的4倍，使充电时长不同的块能够均衡分配到各进程；
+    但每块不少于 MIN_CHUNK_SIZE 个组合 (组合数较少时除外)，以摊薄每步数组运算的固定开销。
+
+    参数:
+        cc_currents, cv_voltages, ambient_temperatures, initial_socs: 各扫描参数的取值列表
+        dt: 仿真时间步长 (秒)
+        max_workers: 工作进程数，默认使用全部CPU核心
+        chunk_size: 每块的组合数，默认自动计算
+        max_duration: 单次充电的最长仿真时间 (秒)
+
+    返回:
+        result: 字典，包含 RESULT_COLUMNS 中各列的数组 (每行对应一个参数组合)，
+                以及 worker_stats (每个工作进程的仿真次数、计算耗时和吞吐量) 和 elapsed (总耗时，秒)
+    """
+    grid = build_sweep_grid(cc_currents, cv_voltages, ambient_temperatures, initial_socs)
+    total = len(grid["initial_soc"])
+    max_workers = max_workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(math.ceil(total / (max_workers * 4)), min(MIN_CHUNK_SIZE, math.ceil(total / max_workers)), 1)
+
+    result = dict(grid)
+    result["charge_time"] = np.full(total, np.nan)
+    result["peak_temperature"] = np.full(total, np.nan)
+    result["energy_kwh"] = np.full(total, np.nan)
+    result["completed"] = np.zeros(total, dtype=bool)
+    worker_stats = {}
+
+    logger.info(f"开始参数扫描: {total} 个组合, {max_workers} 个工作进程, 每块 {chunk_size} 个组合")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for begin in range(0, total, chunk_size):
+            chunk = {name: values[begin:begin + chunk_size] for name, values in grid.items()}
+            futures[executor.submit(simulate_sweep_chunk, chunk, dt, max_duration)] = begin
+
+        for future in as_completed(futures):
+            begin = futures[future]
+            chunk_result = future.result()
+            end = begin + len(chunk_result["charge_time"])
+            for name in ("charge_time", "peak_temperature", "energy_kwh", "completed"):
+                result[name][begin:end] = chunk_result[name]
+            stats = worker_stats.setdefault(chunk_result["pid"], {"pid": chunk_result["pid"], "sessions": 0,
+                                                                   "busy_time": 0.0})
+            stats["sessions"] += end - begin
+            stats["busy_time"] += chunk_result["elapsed"]
+    elapsed = time.perf_counter() - start
+
+    for stats in worker_stats.values():
+        stats["throughput"] = stats["sessions"] / stats["busy_time"] if stats["busy_time"] > 0 else 0.0
+        logger.info(f"  工作进程 {stats['pid']}: {stats['sessions']} 次仿真, 计算 {stats['busy_time']:.2f} 秒, "
+                    f"{stats['throughput']:.1f} 次/秒")
+    logger.info(f"参数扫描完成: {total} 个组合, 耗时 {elapsed:.2f} 秒, 总吞吐量 {total / elapsed:.1f} 次/秒")
+
+    result["worker_stats"] = sorted(worker_stats.values(), key=lambda s: s["pid"])
+    result["elapsed"] = elapsed
+    return result
+
+
+def save_sweep_results(result, path):
+    """将扫描结果保存为CSV文件 (列为 RESULT_COLUMNS)
+
+    参数:
+        result: run_parameter_sweep 的返回值
+        path: CSV文件路径
+    """
+    table = np.column_stack([np.asarray(result[name], dtype=np.float64) for name in RESULT_COLUMNS])
+    np.savetxt(path, table, delimiter=",", header=",".join(RESULT_COLUMNS), comments="", fmt="%.6g")
+    logger.info(f"参数扫描结果已保存: {path} ({len(table)} 行)")
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+
+class QuantizedLRUCache:
+    """以量化后的输入窗口为键的 LRU 缓存
+
+    每个样本的输入数组按 tolerance 取整 (round(x / tolerance)) 后拼接为键，差异小于量化步长的
+    窗口 (空闲、涓流阶段几乎不变的电压/SOC) 命中同一条目。条目数超过 max_size 时淘汰最久未使用的，
+    存在超过 ttl 秒的条目视为过期。线程安全，可在多个推理线程间共享。
+    """
+
+    def __init__(self, max_size=4096, tolerance=1e-3, ttl=60.0, clock=time.monotonic):
+        """初始化缓存
+
+        参数:
+            max_size: 最多保存的条目数
+            tolerance: 量化步长 (与缩放后的输入同单位)
+            ttl: 条目有效期 (秒)，None 表示不过期
+            clock: 计时函数 (测试时可替换)
+        """
+        if max_size < 1 or tolerance <= 0:
+            raise ValueError("max_size 和 tolerance 必须为正数")
+        self.max_size = int(max_size)
+        self.tolerance = float(tolerance)
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()  # key -> (value, 写入时间)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keys(self, prefix, *arrays):
+        """为批量中的每个样本生成缓存键
+
+        参数:
+            prefix: 键前缀 (例如模型版本)，前缀不同的键互不命中
+            *arrays: 形状为 (B, ...) 的输入数组
+
+        返回:
+            keys: 长度为 B 的键列表
+        """
+        batch = len(arrays[0])
+        quantized = np.hstack([np.rint(np.asarray(array, dtype=np.float64).reshape(batch, -1) / self.tolerance)
+                               .astype(np.int64) for array in arrays])
+        return [(prefix, row.tobytes()) for row in quantized]
+
+    def get(self, key):
+        """查找条目，未命中或已过期时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and self.clock() - entry[1] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """写入条目，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._entries[key] = (value, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """清空全部条目 (保留统计)"""
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        """导出缓存统计"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "tolerance": self.tolerance,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,86 @@
+import sys
+import os
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SIMULATOR_CONFIG
+
+# 变化量触发重新计算的状态字段及对应的配置键
+DELTA_FIELDS = (
+    ("soc", "soc_delta"),
+    ("temperature", "temperature_delta"),
+    ("internal_resistance", "internal_resistance_delta"),
+)
+
+# 发生变化即触发重新计算的状态字段 (充电阶段切换、开始/停止充放电)
+PHASE_FIELDS = ("charging_mode", "is_charging", "is_discharging")
+
+
+class RecomputeScheduler:
+    """决定何时重新计算 RUL 和健康评估
+
+    RUL 变化缓慢，满足以下任一条件时才重新计算，其余周期继续发布上一次的结果:
+    - 距上次计算已超过 interval 仿真秒
+    - SOC、温度或内阻相对上次计算时的变化超过配置的阈值
+    - 充电阶段切换 (charging_mode) 或开始/停止充放电
+    """
+
+    def __init__(self, interval=None, soc_delta=None, temperature_delta=None, internal_resistance_delta=None):
+        """初始化调度器
+
+        参数:
+            interval: 最长重新计算间隔 (仿真秒)，默认取 SIMULATOR_CONFIG["rul_schedule"]
+            soc_delta: SOC 变化阈值 (%)
+            temperature_delta: 温度变化阈值 (°C)
+            internal_resistance_delta: 内阻变化阈值 (Ω)
+        """
+        config = dict(SIMULATOR_CONFIG["rul_schedule"])
+        overrides = {"interval": interval, "soc_delta": soc_delta, "temperature_delta": temperature_delta,
+                     "internal_resistance_delta": internal_resistance_delta}
+        config.update({key: value for key, value in overrides.items() if value is not None})
+        self.interval = config["interval"]
+        self.thresholds = {field: config[key] for field, key in DELTA_FIELDS}
+        self.last_state = None
+        self.last_time = None
+        self.reasons = {}  # 各触发原因的计数
+
+    def due(self, state, now):
+        """判断是否需要重新计算
+
+        参数:
+            state: 当前电池状态 (支持按键读取)
+            now: 当前仿真时间 (秒)
+
+        返回:
+            reason: 需要重新计算时为触发原因 ("initial"、"interval"、"phase"、字段名)，否则为 None
+        """
+        if self.last_state is None:
+            return "initial"
+        for field in PHASE_FIELDS:
+            if state[field] != self.last_state[field]:
+                return "phase"
+        for field, threshold in self.thresholds.items():
+            if abs(state[field] - self.last_state[field]) >= threshold:
+                return field
+        if now - self.last_time >= self.interval:
+            return "interval"
+        return None
+
+    def mark(self, state, now, reason):
+        """记录一次重新计算，之后的变化量和间隔都相对于该状态计算"""
+        self.last_state = {field: state[field] for field in PHASE_FIELDS + tuple(self.thresholds)}
+        self.last_time = now
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def reset(self):
+        """下一次调用 due() 时必定重新计算 (例如恢复检查点或重置电池后)"""
+        self.last_state = None
+
+    def metrics(self):
+        """导出调度统计"""
+        return {
+            "interval": self.interval,
+            "thresholds": dict(self.thresholds),
+            "recomputations": sum(self.reasons.values()),
+            "reasons": dict(self.reasons),
+            "last_time": self.last_time,
+        }
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+import sys
+import os
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SIMULATOR_CONFIG
+
+logger = logging.getLogger("battery-simulator")
+
+# 队列深度和批量大小直方图的桶上界
+HISTOGRAM_BOUNDS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+# 通知收集协程退出的队列标记
+_STOP = object()
+
+
+class Histogram:
+    """固定桶的计数直方图 (与 Prometheus 相同的累计计数格式)"""
+
+    def __init__(self, bounds=HISTOGRAM_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # 最后一个桶为 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """记录一个观测值"""
+        index = next((i for i, bound in enumerate(self.bounds) if value <= bound), len(self.bounds))
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        """导出为字典: buckets 为 [(上界, 不超过该上界的累计次数), ...]"""
+        cumulative = np.cumsum(self.counts).tolist()
+        return {
+            "buckets": list(zip(list(self.bounds) + ["+Inf"], cumulative)),
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+        }
+
+
+class RULMicroBatcher:
+    """跨会话的 RUL 推理微批处理队列 (asyncio)
+
+    各电池会话 await predict_rul(...) 提交请求，收集协程在第一个请求到达后最多等待
+    max_wait_ms 毫秒或凑满 max_batch_size 个请求，然后在工作线程上执行一次批量前向计算
+    (CNNLSTM_RULModel.predict_rul_batch)，再逐个完成各请求的 future。事件循环在推理期间不被阻塞，
+    推理进行时到达的请求自然累积成下一批。
+
+    输入窗口的提取和缩放 (prepare_rul_inputs) 在提交时于事件循环线程上完成，
+    之后历史数据继续更新不会影响已提交的请求。模型不可用或历史不足时直接返回简单估计值。
+    """
+
+    def __init__(self, rul_model, max_batch_size=None, max_wait_ms=None):
+        """初始化微批处理队列
+
+        参数:
+            rul_model: CNNLSTM_RULModel 实例
+            max_batch_size: 每批最多请求数，默认取 SIMULATOR_CONFIG["rul_batching"]
+            max_wait_ms: 第一个请求到达后最多等待的毫秒数，默认取 SIMULATOR_CONFIG["rul_batching"]
+        """
+        config = SIMULATOR_CONFIG["rul_batching"]
+        self.rul_model = rul_model
+        self.max_batch_size = int(max_batch_size or config["max_batch_size"])
+        self.max_wait_ms = float(config["max_wait_ms"] if max_wait_ms is None else max_wait_ms)
+        if self.max_batch_size < 1 or self.max_wait_ms < 0:
+            raise ValueError("max_batch_size 必须为正数，max_wait_ms 不能为负数")
+        self.queue_depth = Histogram()  # 每批开始时队列中等待的请求数
+        self.batch_size = Histogram()
+        self.batches = 0
+        self.requests = 0
+        self._queue = None
+        self._task = None
+        self._executor = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """在当前事件循环中启动收集协程和推理工作线程"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rul-batcher")
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+        logger.info(f"RUL 微批处理已启动 (max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait_ms})")
+
+    async def stop(self):
+        """停止收集协程，队列中剩余的请求处理完后关闭工作线程"""
+        if self._task is None:
+            return
+        self._queue.put_nowait(_STOP)
+        await self._task
+        # 停止标记之后到达的请求
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait() for _ in range(min(self._queue.qsize(), self.max_batch_size))]
+            await self._run_batch(batch)
+        self._executor.shutdown(wait=True)
+        self._task = None
+        logger.info("RUL 微批处理已停止")
+
+    async def predict_rul(self, battery_data, static_features):
+        """提交一个 RUL 预测请求并等待批量推理的结果
+
+        参数:
+            battery_data: 电池历史数据
+            static_features: 静态特征 [cycle_count, health, avg_temperature]
+
+        返回:
+            rul: 预测的剩余寿命 (循环数)
+        """
+        try:
+            inputs = self.rul_model.prepare_rul_inputs(battery_data)
+        except Exception as e:
+            logger.error(f"RUL 预测输入准备失败: {e}")
+            inputs = None
+        if inputs is None:
+            return self.rul_model._simple_estimate(static_features)
+        if not self.running:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((inputs, static_features, future))
+        return await future
+
+    async def _collect(self):
+        """收集请求: 第一个请求到达后，凑满一批或等待超时即提交推理"""
+        loop = asyncio.get_running_loop()
+        max_wait = self.max_wait_ms / 1000.0
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            self.queue_depth.observe(self._queue.qsize() + 1)
+            deadline = loop.time() + max_wait
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    item = self._queue.get_nowait()
+                else:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._run_batch(batch)
+
+    async def _run_batch(self, batch):
+        """在工作线程上执行一次批量推理并完成各请求的 future"""
+        # 调用方已取消的请求不参与推理
+        batch = [item for item in batch if not item[2].done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.requests += len(batch)
+        self.batch_size.observe(len(batch))
+        lstm_inputs = np.concatenate([inputs[0] for inputs, _, _ in batch])
+        cnn_inputs = np.concatenate([inputs[1] for inputs, _, _ in batch])
+        try:
+            ruls = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.rul_model.predict_rul_batch, lstm_inputs, cnn_inputs)
+        except Exception as e:
+            logger.error(f"批量 RUL 预测出错: {e}")
+            ruls = [self.rul_model._simple_estimate(static_features) for _, static_features, _ in batch]
+        for (_, _, future), rul in zip(batch, ruls):
+            if not future.done():
+                future.set_result(float(rul))
+
+    def metrics(self):
+        """导出批处理统计 (队列深度和批量大小直方图)"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "requests": self.requests,
+            "queue_depth": self.queue_depth.to_dict(),
+            "batch_size": self.batch_size.to_dict(),
+        }
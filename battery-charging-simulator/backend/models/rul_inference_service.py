@@ -0,0 +1,202 @@
+import importlib.util
+import logging
+import threading
+import numpy as np
+
+# TensorFlow 只在加载 Keras 模型 (tensorflow 后端) 时才导入，numpy 后端不需要 TensorFlow
+TF_AVAILABLE = importlib.util.find_spec("tensorflow") is not None
+
+import sys
+import os
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.numpy_inference import NumpyRULModel, FusedEnsembleModel
+from models.model_registry import get_model_registry
+
+logger = logging.getLogger("battery-simulator")
+
+# 加载模型时预热的批量大小
+WARMUP_BATCH_SIZES = (1, 8, 64)
+
+
+class RULInferenceService:
+    """RUL 模型的共享推理服务
+
+    进程内所有 RUL 预测 (CNNLSTM_RULModel、DynamicChargingController) 都通过同一个服务实例
+    调用同一组折模型，不再各自加载模型副本。每次调用返回全部折模型的预测值 (B, K)。
+
+    两种后端:
+    - numpy: 折模型合并为 FusedEnsembleModel，一次前向计算得到全部预测值
+    - tensorflow: Keras 模型 (例如训练后的模型) 包装为固定输入签名的 tf.function，
+      直接调用 model(x, training=False)，避免 Model.predict 每次调用都重新构建数据适配器和迭代器。
+      单样本 (批量固定为1) 和小批量 (批量维度为 None) 各一个计算图，不会因批量大小变化而重新追踪
+
+    加载或替换模型后立即按 WARMUP_BATCH_SIZES 预热，第一次实际预测不承担追踪/初始化的开销。
+    模型文件通过模型注册表加载，多个服务实例加载同一文件时共享同一个模型对象。
+    """
+
+    def __init__(self, warmup_batch_sizes=WARMUP_BATCH_SIZES, registry=None):
+        """初始化推理服务 (尚未加载模型)
+
+        参数:
+            warmup_batch_sizes: 加载模型后预热的批量大小
+            registry: 模型注册表，默认使用进程内共享的注册表
+        """
+        self.warmup_batch_sizes = tuple(warmup_batch_sizes)
+        self.registry = registry if registry is not None else get_model_registry()
+        self.models = []
+        self.handles = []  # 从注册表获取的模型句柄，替换模型时释放
+        self.ensemble = None  # numpy 后端的合并集成模型
+        self.backend = None
+        self.lstm_input_shape = None
+        self.cnn_input_shape = None
+        self._functions = None  # (单样本函数, 小批量函数)，替换模型时整体切换
+        self.generation = 0  # 每次替换模型加一，用于使依赖旧模型的缓存结果失效
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        """是否已加载模型"""
+        return self._functions is not None
+
+    @property
+    def folds(self):
+        """折模型数量"""
+        return len(self.models)
+
+    def load(self, model_paths, backend="numpy", quantization=None):
+        """从 .keras 文件加载折模型
+
+        参数:
+            model_paths: .keras 模型路径列表
+            backend: "numpy" (导出权重，纯 NumPy 推理) 或 "tensorflow"
+            quantization: numpy 后端使用的权重量化变体 (None、"int8" 或 "float16")
+
+        返回:
+            loaded: 是否成功加载了全部模型
+        """
+        if not model_paths:
+            return False
+        handles = []
+        try:
+            if backend == "numpy":
+                def loader(path):
+                    return lambda: NumpyRULModel.from_keras(path, quantization=quantization)
+            elif backend == "tensorflow":
+                if quantization:
+                    raise ValueError("量化变体只能由 numpy 后端加载")
+                if not TF_AVAILABLE:
+                    raise RuntimeError("TensorFlow 不可用")
+                from tensorflow.keras.models import load_model
+
+                def loader(path):
+                    return lambda: load_model(path)
+            else:
+                raise ValueError(f"未知的推理后端: {backend}")
+            for path in model_paths:
+                # 修改时间作为键的一部分: 训练任务覆盖模型文件后加载新模型，而不是注册表中的旧模型
+                key = (backend, os.path.abspath(path), quantization, os.path.getmtime(path))
+                handles.append(self.registry.acquire(key, loader(path)))
+        except Exception as e:
+            for handle in handles:
+                handle.release()
+            logger.error(f"RUL 推理服务加载模型失败: {e}")
+            return False
+        self.set_models([handle.model for handle in handles], handles)
+        return True
+
+    def set_models(self, models, handles=()):
+        """替换服务使用的折模型并预热
+
+        参数:
+            models: NumpyRULModel 列表，或结构相同的 Keras 模型列表
+            handles: models 对应的注册表句柄 (由服务持有，替换模型时释放)；
+                直接传入的模型 (例如训练后的 Keras 模型) 不经过注册表
+        """
+        models = list(models)
+        if not models:
+            raise ValueError("至少需要一个折模型")
+        if all(isinstance(model, NumpyRULModel) for model in models):
+            ensemble = FusedEnsembleModel(models)
+            lstm_shape = tuple(ensemble.meta.get("lstm_input_shape", (ensemble.steps, 1)))
+            cnn_shape = tuple(ensemble.meta.get("cnn_input_shape", (ensemble.steps, ensemble.cnn_channels)))
+            functions = (ensemble.forward, ensemble.forward)
+            backend = "numpy"
+        else:
+            if not TF_AVAILABLE:
+                raise RuntimeError("Keras 模型推理需要 TensorFlow")
+            ensemble = None
+            lstm_shape, cnn_shape = (tuple(tensor.shape[1:]) for tensor in models[0].inputs)
+            functions = self._compile(models, lstm_shape, cnn_shape)
+            backend = "tensorflow"
+
+        with self._lock:
+            previous_handles = self.handles
+            self.handles = list(handles)
+            self.models = models
+            self.ensemble = ensemble
+            self.backend = backend
+            self.lstm_input_shape = lstm_shape
+            self.cnn_input_shape = cnn_shape
+            self._functions = functions
+            self.generation += 1
+        for handle in previous_handles:
+            handle.release()
+        self.warm_up()
+        logger.info(f"RUL 推理服务已加载 {len(models)} 个折模型 ({backend} 后端)")
+
+    @staticmethod
+    def _compile(models, lstm_shape, cnn_shape):
+        """把 Keras 折模型包装为固定输入签名的 tf.function，输出拼接为 (B, K)"""
+        import tensorflow as tf
+
+        def forward(lstm_input, cnn_input):
+            return tf.concat([model([lstm_input, cnn_input], training=False) for model in models], axis=1)
+
+        def signature(batch):
+            return [tf.TensorSpec((batch,) + lstm_shape, tf.float32, name="lstm_input"),
+                    tf.TensorSpec((batch,) + cnn_shape, tf.float32, name="cnn_input")]
+
+        return (tf.function(forward, input_signature=signature(1)),
+                tf.function(forward, input_signature=signature(None)))
+
+    def warm_up(self):
+        """按预热批量大小各执行一次推理 (tf.function 追踪、BLAS 初始化等)"""
+        for batch in self.warmup_batch_sizes:
+            self.predict_folds(np.zeros((batch,) + self.lstm_input_shape, dtype=np.float32),
+                               np.zeros((batch,) + self.cnn_input_shape, dtype=np.float32))
+
+    def predict_folds(self, lstm_input, cnn_input):
+        """批量预测，返回每个折模型的预测值
+
+        参数:
+            lstm_input: 形状为 (B, T, 1) 的容量序列
+            cnn_input: 形状为 (B, T, C) 的电压特征序列
+
+        返回:
+            predictions: 形状为 (B, K) 的数组
+        """
+        functions = self._functions
+        if functions is None:
+            raise RuntimeError("RUL 推理服务尚未加载模型")
+        lstm_input = np.asarray(lstm_input, dtype=np.float32)
+        cnn_input = np.asarray(cnn_input, dtype=np.float32)
+        function = functions[0] if lstm_input.shape[0] == 1 else functions[1]
+        return np.asarray(function(lstm_input, cnn_input))
+
+    def predict_one(self, lstm_input, cnn_input):
+        """单样本预测，返回 K 个折模型的预测值 (K,)"""
+        return self.predict_folds(lstm_input, cnn_input)[0]
+
+
+_shared_service = None
+_shared_lock = threading.Lock()
+
+
+def get_inference_service():
+    """返回进程内共享的 RUL 推理服务"""
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = RULInferenceService()
+        return _shared_service
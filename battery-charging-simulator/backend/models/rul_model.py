@@ -1,20 +1,25 @@
 import numpy as np
 import os
 import logging
-try:
-    import tensorflow as tf
-except ImportError:
-    # 如果无法导入 TensorFlow，创建一个模拟的 RUL 预测功能
-    logging.warning("TensorFlow 导入失败，将使用模拟的 RUL 预测")
-    tf = None
+
+import sys
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.model_registry import get_model_registry
 
 logger = logging.getLogger("battery-simulator")
 
 class BatteryRULModel:
     """电池剩余寿命预测模型"""
     
-    def __init__(self):
-        """初始化 RUL 模型"""
+    def __init__(self, registry=None):
+        """初始化 RUL 模型
+        
+        参数:
+            registry: 模型注册表，默认使用进程内共享的注册表 (多个实例共享同一个模型)
+        """
+        self.registry = registry if registry is not None else get_model_registry()
+        self.handle = None
         self.model = None
         try:
             self._load_model()
@@ -26,9 +31,16 @@ class BatteryRULModel:
         """加载预训练的 RUL 预测模型"""
         model_path = os.path.join("models", "rul_model")
         
-        if tf is not None and os.path.exists(model_path):
+        if os.path.exists(model_path):
+            # 只有模型文件存在时才导入 TensorFlow (导入需要数秒)
+            def load():
+                import tensorflow as tf
+                return tf.keras.models.load_model(model_path)
+            
             try:
-                self.model = tf.keras.models.load_model(model_path)
+                # Keras Model.predict 不是线程安全的，经句柄调用时按模型串行执行
+                self.handle = self.registry.acquire(("keras", os.path.abspath(model_path)), load, thread_safe=False)
+                self.model = self.handle.model
                 logger.info("已加载 RUL 预测模型")
             except Exception as e:
                 logger.error(f"模型加载失败: {e}")
@@ -47,7 +59,7 @@ class BatteryRULModel:
         返回:
             estimated_rul: 估计的剩余寿命（循环数）
         """
-        if self.model is not None and tf is not None:
+        if self.model is not None:
             try:
                 # 使用模型进行预测
                 # 这里应该有数据预处理和模型推理代码
@@ -63,6 +75,13 @@ class BatteryRULModel:
             # 使用简单估计方法
             return self._simple_estimate(static_features)
     
+    def close(self):
+        """释放共享模型 (最后一个持有者释放后模型从注册表卸载)"""
+        if self.handle is not None:
+            self.handle.release()
+            self.handle = None
+        self.model = None
+    
     def _simple_estimate(self, static_features):
         """简单的 RUL 估计方法
         
@@ -0,0 +1,230 @@
+import copy
+import numpy as np
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 导入配置
+from config import BATTERY_CONFIG, SIMULATOR_CONFIG
+from models.checkpoint import SimulationCheckpoint
+
+# 单体 OCV 分段线性模型的 SOC 断点 (%)，与 BatteryModel._calculate_ocv_from_soc 一致
+OCV_SOC_KNOTS = np.array([0.0, 10.0, 90.0, 100.0])
+
+# 检查点中保存的单体参数和状态数组
+PACK_ARRAYS = (
+    "capacity", "default_internal_resistance",
+    "soc", "temperature", "polarization_voltage", "current",
+    "internal_resistance", "polarization_resistance", "balancing", "group_voltages",
+)
+
+
+class SeriesPackModel:
+    """多单体串并联电池包模型 (S 串 × P 并)
+
+    每个单体的 SOC、容量、欧姆内阻、极化电压和温度保存在形状为 (S, P) 的数组中，
+    每步的计算全部为数组运算，耗时随单体数线性增长，100S×4P 每步约 100 微秒。
+
+    - 并联单体按端电压相等精确分流: V = (I + Σe/r) / Σ(1/r)，i = (V - e) / r
+    - 整包电压为各串联单元端电压之和
+    - 被动均衡: 端电压高出最低单元 balancing_threshold 以上的单元以 balancing_current 放电
+
+    所有单体参数一致时 (spread=0)，整包行为与 BatteryModel 的集总模型相同。
+    """
+
+    def __init__(self, series=None, parallel=None, soc=100.0, temperature=None,
+                 capacity_spread=None, resistance_spread=None, soc_spread=0.0, seed=None):
+        """初始化电池包
+
+        参数:
+            series: 串联单元数，默认取 BATTERY_CONFIG["cell_count_series"]
+            parallel: 每个串联单元的并联单体数，默认取 BATTERY_CONFIG["cell_count_parallel"]
+            soc: 初始SOC (%)
+            temperature: 初始温度 (°C)，默认等于环境温度
+            capacity_spread: 单体容量的相对标准差
+            resistance_spread: 单体内阻的相对标准差
+            soc_spread: 初始SOC的标准差 (%)
+            seed: 随机数种子，用于复现单体参数分布
+        """
+        self.series = int(series or BATTERY_CONFIG["cell_count_series"])
+        self.parallel = int(parallel or BATTERY_CONFIG["cell_count_parallel"])
+        if capacity_spread is None:
+            capacity_spread = BATTERY_CONFIG["cell_capacity_spread"]
+        if resistance_spread is None:
+            resistance_spread = BATTERY_CONFIG["cell_resistance_spread"]
+        shape = (self.series, self.parallel)
+        rng = np.random.default_rng(seed)
+
+        # 单体参数: 由整包参数按串并联关系折算，再叠加制造偏差
+        cell_count = self.series * self.parallel
+        self.capacity = BATTERY_CONFIG["capacity"] / self.parallel * \
+            np.maximum(0.5, 1 + capacity_spread * rng.standard_normal(shape))
+        self.default_internal_resistance = BATTERY_CONFIG["default_internal_resistance"] * self.parallel / self.series * \
+            np.maximum(0.5, 1 + resistance_spread * rng.standard_normal(shape))
+        self.default_polarization_resistance = BATTERY_CONFIG["polarization_resistance"] * self.parallel / self.series
+        self.polarization_capacitance = BATTERY_CONFIG["polarization_capacitance"] * self.series / self.parallel
+        self.thermal_capacity = BATTERY_CONFIG["thermal_capacity"] / cell_count
+        self.thermal_resistance = BATTERY_CONFIG["thermal_resistance"] * cell_count
+        self.temperature_coefficient = BATTERY_CONFIG["temperature_coefficient"]
+        self.ambient_temperature = BATTERY_CONFIG["ambient_temperature"]
+        self.charging_efficiency = SIMULATOR_CONFIG["charging_efficiency"]
+        self.discharging_efficiency = SIMULATOR_CONFIG["discharging_efficiency"]
+        self.ocv_knots = np.array([
+            BATTERY_CONFIG["cell_min_voltage"],
+            BATTERY_CONFIG["cell_nominal_voltage"],
+            BATTERY_CONFIG["cell_cc_to_cv_voltage"],
+            BATTERY_CONFIG["cell_max_voltage"],
+        ])
+
+        # 被动均衡参数
+        self.balancing_enabled = True
+        self.balancing_current = BATTERY_CONFIG["balancing_current"]
+        self.balancing_threshold = BATTERY_CONFIG["balancing_threshold"]
+
+        self.reset(soc, temperature, soc_spread, rng)
+
+    def reset(self, soc=100.0, temperature=None, soc_spread=0.0, rng=None):
+        """重置单体状态 (保留单体参数)
+
+        参数:
+            soc: 初始SOC (%)
+            temperature: 初始温度 (°C)，默认等于环境温度
+            soc_spread: 初始SOC的标准差 (%)
+            rng: 随机数生成器
+        """
+        shape = (self.series, self.parallel)
+        self.soc = np.full(shape, float(soc))
+        if soc_spread:
+            rng = rng or np.random.default_rng()
+            self.soc = np.clip(self.soc + soc_spread * rng.standard_normal(shape), 0, 100)
+        self.temperature = np.full(shape, self.ambient_temperature if temperature is None else float(temperature))
+        self.polarization_voltage = np.zeros(shape)
+        self.current = np.zeros(shape)
+        self.balancing = np.zeros(self.series, dtype=bool)
+        self._update_resistances()
+        self.group_voltages = self._ocv(self.soc).mean(axis=1)
+
+    def _ocv(self, soc):
+        """单体开路电压 (分段线性，np.interp 在 0-100% 以外自动取端点值)"""
+        return np.interp(soc, OCV_SOC_KNOTS, self.ocv_knots)
+
+    def _update_resistances(self):
+        """根据单体温度修正内阻"""
+        temp_factor = 1 + self.temperature_coefficient * (self.temperature - 25)
+        self.internal_resistance = self.default_internal_resistance * temp_factor
+        self.polarization_resistance = self.default_polarization_resistance * temp_factor
+
+    def step(self, current, dt):
+        """按整包电流推进 dt 秒
+
+        参数:
+            current: 整包电流 (A)，正为充电，负为放电
+            dt: 仿真时间步长 (秒)
+
+        返回:
+            pack_voltage: 整包端电压 (V)
+        """
+        # 并联单体按端电压相等分流
+        conductance = 1 / self.internal_resistance
+        emf = self._ocv(self.soc) + self.polarization_voltage
+        group_conductance = conductance.sum(axis=1)
+        group_emf = (emf * conductance).sum(axis=1)
+
+        # 被动均衡: 端电压高于最低单元的串联单元通过均衡电阻放电
+        group_current = np.full(self.series, float(current))
+        if self.balancing_enabled:
+            self.balancing = self.group_voltages - self.group_voltages.min() > self.balancing_threshold
+            group_current = group_current - self.balancing * self.balancing_current
+
+        group_terminal = (group_current + group_emf) / group_conductance
+        self.current = (group_terminal[:, None] - emf) * conductance
+
+        # SOC 更新 (充电乘以充电效率，放电除以放电效率；dt / 36 即 dt / 3600 * 100)
+        charge = np.where(self.current > 0, self.current * self.charging_efficiency,
+                          self.current / self.discharging_efficiency)
+        self.soc = np.minimum(np.maximum(self.soc + charge * (dt / 36) / self.capacity, 0), 100)
+
+        # 电压 (戴维南 RC 模型)
+        exp_factor = np.exp(-dt / (self.polarization_resistance * self.polarization_capacitance))
+        self.polarization_voltage = self.polarization_voltage * exp_factor + \
+            self.current * self.polarization_resistance * (1 - exp_factor)
+        cell_voltage = self._ocv(self.soc) + self.current * self.internal_resistance + self.polarization_voltage
+        self.group_voltages = (cell_voltage * conductance).sum(axis=1) / group_conductance
+
+        # 温度
+        joule_heat = self.current ** 2 * (self.internal_resistance + self.polarization_resistance * 0.5) * dt
+        heat_dissipation = (self.temperature - self.ambient_temperature) / self.thermal_resistance * dt
+        self.temperature = self.temperature + (joule_heat - heat_dissipation) / self.thermal_capacity
+        self._update_resistances()
+
+        return self.pack_voltage
+
+    @property
+    def cell_voltages(self):
+        """各串联单元的端电压 (V)，即 BMS 采集的单体电压"""
+        return self.group_voltages
+
+    @property
+    def pack_voltage(self):
+        """整包端电压 (V)"""
+        return float(self.group_voltages.sum())
+
+    def get_statistics(self):
+        """获取单体统计信息
+
+        返回:
+            stats: 字典，包含单体电压极值/均值/压差、最高最低单元序号、SOC极值、最高温度和均衡单元数
+        """
+        voltages = self.group_voltages
+        group_soc = self.soc.mean(axis=1)
+        return {
+            "pack_voltage": self.pack_voltage,
+            "cell_voltage_max": float(voltages.max()),
+            "cell_voltage_min": float(voltages.min()),
+            "cell_voltage_mean": float(voltages.mean()),
+            "cell_voltage_spread": float(voltages.max() - voltages.min()),
+            "max_voltage_cell": int(voltages.argmax()),
+            "min_voltage_cell": int(voltages.argmin()),
+            "cell_soc_max": float(group_soc.max()),
+            "cell_soc_min": float(group_soc.min()),
+            "cell_temperature_max": float(self.temperature.max()),
+            "balancing_cells": int(self.balancing.sum()),
+        }
+
+    # ---- 检查点 ----
+
+    def checkpoint(self):
+        """生成包含单体参数 (含制造偏差) 和单体状态的检查点 (数组为副本)"""
+        return SimulationCheckpoint(
+            "series_pack",
+            {name: np.array(getattr(self, name), copy=True) for name in PACK_ARRAYS},
+            {"series": self.series, "parallel": self.parallel, "balancing_enabled": self.balancing_enabled},
+        )
+
+    def restore(self, checkpoint):
+        """从检查点恢复单体参数和状态
+
+        参数:
+            checkpoint: SeriesPackModel.checkpoint() 生成的 SimulationCheckpoint
+        """
+        checkpoint.expect("series_pack")
+        self.series = int(checkpoint.meta["series"])
+        self.parallel = int(checkpoint.meta["parallel"])
+        self.balancing_enabled = bool(checkpoint.meta["balancing_enabled"])
+        for name in PACK_ARRAYS:
+            setattr(self, name, checkpoint.arrays[name].copy())
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint):
+        """由检查点创建新的 SeriesPackModel"""
+        pack = cls(checkpoint.meta["series"], checkpoint.meta["parallel"])
+        pack.restore(checkpoint)
+        return pack
+
+    def fork(self):
+        """在内存中复制当前电池包 (单体数组独立)"""
+        forked = copy.copy(self)
+        for name in PACK_ARRAYS:
+            setattr(forked, name, np.array(getattr(self, name), copy=True))
+        return forked
@@ -0,0 +1,27 @@
+class SimulatedClock:
+    """可注入的仿真时钟，用于离线/确定性仿真
+
+    与 time.time 一样以可调用对象的形式返回当前时间(秒)，
+    但时间只在调用 advance() 时前进，不依赖真实时间。
+    """
+
+    def __init__(self, start=0.0):
+        """初始化仿真时钟
+
+        参数:
+            start: 起始时间戳(秒)
+        """
+        self.now = float(start)
+
+    def __call__(self):
+        """返回当前仿真时间"""
+        return self.now
+
+    def advance(self, dt):
+        """将仿真时间向前推进 dt 秒并返回新的时间"""
+        self.now += dt
+        return self.now
+
+    def reset(self, start=0.0):
+        """将仿真时间重置为 start"""
+        self.now = float(start)
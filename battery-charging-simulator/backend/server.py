@@ -23,13 +23,20 @@ from config import SERVER_HOST, SERVER_PORT, WEBSOCKET_CONFIG, SIMULATOR_CONFIG
 from models.battery_model import BatteryModel
 from models.rul_model import BatteryRULModel
 from models.cnn_lstm_rul_model import CNNLSTM_RULModel
+from models.rul_batcher import RULMicroBatcher
+from models.background_worker import LatestResultWorker, EventLoopLagMonitor
+from models.recompute_scheduler import RecomputeScheduler
+from models.model_registry import get_model_registry
+from models.db_writer import get_db_writer
+from models.series_pack import SeriesPackModel
+from models.history_buffer import HistoryRingBuffer
 from models.database import (
     init_db, get_all_charging_records, get_charging_record_by_id,
     get_recent_charging_records, get_charging_records_by_date_range,
     search_charging_records, delete_charging_record, delete_charging_records_by_ids,
     delete_all_charging_records, get_charging_statistics, get_charging_phases_statistics,
     export_charging_records_to_json, import_charging_records_from_json,
-    update_all_charging_record_durations
+    update_all_charging_record_durations, get_telemetry, close_pool
 )
 
 # 设置更详细的日志
@@ -104,10 +111,12 @@ logger.info(f"Socket.IO服务器已配置: ping_interval={WEBSOCKET_CONFIG['ping
 # 将Socket.IO应用与FastAPI集成
 socket_app = socketio.ASGIApp(sio, app, socketio_path='ws')
 
-# 电池模型和RUL模型
-battery_model = BatteryModel()
+# RUL模型 (CNN+LSTM 模型在服务器启动后由后台线程加载，加载完成前使用简单估计方法)
 rul_model = BatteryRULModel()
-cnn_lstm_rul_model = CNNLSTM_RULModel()
+cnn_lstm_rul_model = CNNLSTM_RULModel(lazy=True)
+model_loading_task = None
+# 各会话的 RUL 预测请求合并为批量推理，推理在工作线程上执行
+rul_batcher = RULMicroBatcher(cnn_lstm_rul_model)
 logger.info("电池模型和RUL模型已初始化")
 
 # 初始化数据库
@@ -117,8 +126,9 @@ init_db()
 updated_count = update_all_charging_record_durations()
 logger.info(f"启动时更新了 {updated_count} 条充电记录的时长")
 
-# 创建电池模型实例
-battery_model = BatteryModel()
+# 创建电池模型实例 (启用单体模型时同步仿真各串联单元)
+battery_model = BatteryModel(
+    cell_pack=SeriesPackModel() if SIMULATOR_CONFIG.get("cell_model_enabled", False) else None)
 
 # 连接的客户端
 connected_clients = {}
@@ -127,9 +137,9 @@ connected_clients = {}
 simulator_running = False
 simulator_task = None
 
-# 历史数据收集
-battery_history = []
+# 历史数据收集 (固定容量环形缓冲区)
 MAX_HISTORY_LENGTH = 1000  # 最大历史数据长度
+battery_history = HistoryRingBuffer(MAX_HISTORY_LENGTH)
 logger.info(f"历史数据最大长度设置为: {MAX_HISTORY_LENGTH}")
 
 # 数据类型转换函数，解决numpy.float32等类型无法JSON序列化的问题
@@ -336,7 +346,7 @@ def _activate_latest_models(max_k: int = 3) -> int:
         except Exception as e:
             logger.error(f"复制模型失败: {mpath} -> {target}: {e}")
     try:
-        cnn_lstm_rul_model._load_or_create_model()
+        cnn_lstm_rul_model.reload_models()
     except Exception as e:
         logger.error(f"重载在线RUL模型失败: {e}")
     return count
@@ -524,6 +534,18 @@ async def api_status():
             "time_acceleration_factor": SIMULATOR_CONFIG.get("time_acceleration_factor", 1),
             "rul_model_available": model_available,
             "rul_model_count": model_count,
+            "models_ready": cnn_lstm_rul_model.models_ready,
+            "model_loading": {
+                "state": cnn_lstm_rul_model.load_state,
+                "load_times": cnn_lstm_rul_model.load_times,
+            },
+            "model_registry": get_model_registry().metrics(),
+            "db_writer": get_db_writer().metrics(),
+            "rul_batching": rul_batcher.metrics(),
+            "rul_cache": cnn_lstm_rul_model.cache_metrics(),
+            "health_pipeline": health_pipeline.metrics(),
+            "rul_schedule": rul_schedule.metrics(),
+            "event_loop_lag": event_loop_lag.metrics(),
             "simulator_running": simulator_running,
             "connected_clients_count": len(connected_clients)
         }
@@ -552,6 +574,17 @@ async def api_get_charging_record_by_id(
         raise HTTPException(status_code=404, detail=f"充电记录 ID {record_id} 不存在")
     return record
 
+@app.get("/api/charging-records/{record_id}/telemetry", response_model=Dict)
+async def api_get_charging_telemetry(
+    record_id: int = Path(..., description="充电记录ID"),
+    start: Optional[float] = Query(None, description="起始时间 (秒，包含)"),
+    end: Optional[float] = Query(None, description="结束时间 (秒，不包含)")
+):
+    """获取充电过程的遥测时间序列 (SOC、电压、电流、温度)"""
+    logger.info(f"REST API: 获取充电记录 ID={record_id} 的遥测数据，start={start}, end={end}")
+    telemetry = await asyncio.to_thread(get_telemetry, record_id, start, end)
+    return {name: values.tolist() for name, values in telemetry.items()}
+
 @app.post("/api/charging-records/search", response_model=Dict)
 async def api_search_charging_records(search_params: SearchParams):
     """搜索充电记录"""
@@ -845,7 +878,7 @@ async def message(sid, data):
             # 开始放电
             logger.info(f"客户端 {sid} 请求开始放电")
             battery_model.start_discharging()
-            logger.info(f"放电已开始: 初始SOC={battery_model.get_state()['soc']}%")
+            logger.info(f"放电已开始: 初始SOC={battery_model.soc}%")
             await broadcast_battery_state()
             
         elif action == 'stop':
@@ -898,6 +931,7 @@ async def message(sid, data):
             # 重置电池
             logger.info(f"客户端 {sid} 请求重置电池")
             battery_model.reset()
+            rul_schedule.reset()
             logger.info("电池已重置")
             await broadcast_battery_state()
             
@@ -1056,31 +1090,55 @@ async def message(sid, data):
         await sio.emit('error', {"message": str(e)}, room=sid)
         logger.info(f"已发送错误信息到客户端 {sid}")
 
-async def _generate_complete_battery_state(battery_state):
-    """生成完整的电池状态信息，包括RUL预测、健康信息和充电优化"""
-    # 更新RUL估计 - 确保提供RUL预测和健康信息
-    rul_percentage = battery_model.health  # 默认使用电池健康状态作为RUL
-    health_info = None
-    adjusted_params = None
-    
+def _default_health_info(rul_percentage, message):
+    """健康评估不可用时的默认健康信息"""
+    return {
+        "status": "无法评估",
+        "grade": "N/A", 
+        "score": battery_model.health,
+        "rul_percentage": rul_percentage,
+        "estimated_remaining_cycles": int(1000 * rul_percentage / 100),
+        "health_percentage": battery_model.health,
+        "recommendations": [message],
+        "last_evaluation_time": time.time()
+    }
+
+def _health_pipeline_job(battery_state):
+    """在事件循环上收集健康评估所需输入的快照 (之后的仿真更新不影响该作业)"""
     # 准备静态特征
     avg_temp = battery_state.get("temperature", 25)
     if len(battery_history) > 0:
         # 如果有历史数据，计算平均温度
-        temp_data = [h.get("temperature", 25) for h in battery_history[-100:]]
-        avg_temp = np.mean(temp_data) if temp_data else 25
+        avg_temp = float(np.mean(battery_history.column("temperature", 100)))
     
-    static_features = np.array([
-        battery_model.cycle_count,
-        battery_model.health,
-        avg_temp
-    ])
+    return {
+        "loop": asyncio.get_running_loop(),
+        "battery_state": dict(battery_state),
+        "history": battery_history.copy(),
+        "static_features": np.array([
+            battery_model.cycle_count,
+            battery_model.health,
+            avg_temp
+        ]),
+        "health": battery_model.health,
+        "simulated_time": battery_model.simulated_time,
+        "cell_voltages": battery_model.cell_pack.cell_voltages.copy() if battery_model.cell_pack is not None else None,
+    }
+
+def _run_health_pipeline(job):
+    """RUL预测、健康评估和充电参数计算 (在健康评估线程上执行，不占用事件循环)"""
+    battery_state = job["battery_state"]
+    history = job["history"]
+    static_features = job["static_features"]
+    # 更新RUL估计 - 确保提供RUL预测和健康信息
+    rul_percentage = job["health"]  # 默认使用电池健康状态作为RUL
     
-    if len(battery_history) >= 5:  # 需要足够的历史数据进行预测
+    if len(history) >= 5:  # 需要足够的历史数据进行预测
         # 预测RUL
         try:
-            # 使用 CNN+LSTM 模型预测 RUL
-            raw_rul = cnn_lstm_rul_model.predict_rul(battery_history, static_features)
+            # 使用 CNN+LSTM 模型预测 RUL (提交到事件循环上的微批处理队列，与其他会话合并推理)
+            raw_rul = asyncio.run_coroutine_threadsafe(
+                rul_batcher.predict_rul(history, static_features), job["loop"]).result()
             
             # 将循环数转换为百分比，假设最大寿命为 1000 循环
             max_life_cycles = 1000
@@ -1098,11 +1156,10 @@ async def _generate_complete_battery_state(battery_state):
             except Exception as e2:
                 logger.error(f"备选RUL预测也失败: {e2}")
                 # 使用电池健康状态作为RUL
-                rul_percentage = battery_model.health
+                rul_percentage = job["health"]
     else:
         # 没有足够历史数据，使用基于健康状态的简单估计
         logger.debug("历史数据不足，使用健康状态估计RUL")
-        rul_percentage = battery_model.health
     
     # 设置RUL值
     battery_state["estimated_rul"] = rul_percentage
@@ -1110,7 +1167,7 @@ async def _generate_complete_battery_state(battery_state):
     # 生成健康评估信息（无论是否有足够的历史数据）
     try:
         # 如果历史数据不足，创建最小数据集
-        history_for_eval = battery_history if len(battery_history) >= 5 else [
+        history_for_eval = history if len(history) >= 5 else [
             {
                 "voltage": battery_state.get("voltage", 3.7),
                 "current": battery_state.get("current", 0),
@@ -1121,28 +1178,70 @@ async def _generate_complete_battery_state(battery_state):
         ] * 5  # 复制当前状态作为历史数据
         
         health_info = cnn_lstm_rul_model.evaluate_battery_health(
-            history_for_eval, static_features, rul_percentage)
-        battery_state["health_info"] = health_info
+            history_for_eval, static_features, rul_percentage, cell_voltages=job["cell_voltages"])
         logger.debug(f"健康评估完成: {health_info.get('status', 'N/A')}")
         
     except Exception as e:
         logger.error(f"健康评估失败: {e}", exc_info=True)
         # 提供默认健康信息
-        battery_state["health_info"] = {
-            "status": "无法评估",
-            "grade": "N/A", 
-            "score": battery_model.health,
-            "rul_percentage": rul_percentage,
-            "estimated_remaining_cycles": int(1000 * rul_percentage / 100),
-            "health_percentage": battery_model.health,
-            "recommendations": ["系统启动中，健康评估功能暂不可用"],
-            "last_evaluation_time": time.time()
-        }
+        health_info = _default_health_info(rul_percentage, "系统启动中，健康评估功能暂不可用")
     
     # 根据 RUL 调整充电参数（总是计算，以供显示）
     try:
         adjusted_params = cnn_lstm_rul_model.adjust_charging_parameters(battery_state, rul_percentage)
-        
+    except Exception as e:
+        logger.error(f"充电参数调整失败: {e}", exc_info=True)
+        adjusted_params = None
+    
+    return {
+        "estimated_rul": rul_percentage,
+        "health_info": health_info,
+        "adjusted_params": adjusted_params,
+        "simulated_time": job["simulated_time"],
+    }
+
+# 健康评估线程: 事件循环只提交输入快照并发布最近一次完成的结果
+health_pipeline = LatestResultWorker(
+    _run_health_pipeline, max_pending=SIMULATOR_CONFIG["health_pipeline"]["max_pending"], name="health-pipeline")
+# 已应用到电池模型的健康评估结果序号 (每个结果只应用一次充电参数)
+applied_health_sequence = 0
+# RUL 重新计算调度: 只在间隔到期、状态变化超过阈值或充电阶段切换时提交新的计算
+rul_schedule = RecomputeScheduler()
+# 事件循环延迟监控
+event_loop_lag = EventLoopLagMonitor(SIMULATOR_CONFIG["health_pipeline"]["lag_probe_interval"])
+
+async def _generate_complete_battery_state(battery_state):
+    """生成完整的电池状态信息，包括RUL预测、健康信息和充电优化
+    
+    RUL预测和健康评估在健康评估线程上执行，本函数不等待其完成: 由 rul_schedule 判断需要
+    重新计算时提交本周期的输入快照，每次都发布最近一次完成的结果，rul_age 为该结果的输入快照
+    距现在的仿真秒数 (尚无结果时为 None)。
+    """
+    global applied_health_sequence
+    now = battery_model.simulated_time
+    reason = rul_schedule.due(battery_state, now)
+    if reason is not None:
+        health_pipeline.submit(_health_pipeline_job(battery_state))
+        rul_schedule.mark(battery_state, now, reason)
+        logger.debug(f"重新计算RUL和健康评估 (原因: {reason})")
+    result, sequence = health_pipeline.latest()
+    
+    if result is None:
+        # 第一次计算尚未完成，使用电池健康状态作为RUL
+        rul_percentage = battery_model.health
+        health_info = _default_health_info(rul_percentage, "健康评估计算中")
+        adjusted_params = None
+    else:
+        rul_percentage = result["estimated_rul"]
+        health_info = result["health_info"]
+        adjusted_params = result["adjusted_params"]
+    
+    # 设置RUL值
+    battery_state["estimated_rul"] = rul_percentage
+    battery_state["health_info"] = health_info
+    battery_state["rul_age"] = None if result is None else now - result["simulated_time"]
+    
+    if adjusted_params is not None:
         # 总是提供充电优化信息，enabled状态基于rul_optimized_charging设置
         battery_state["charging_optimization"] = {
             "enabled": battery_model.rul_optimized_charging,
@@ -1151,13 +1250,15 @@ async def _generate_complete_battery_state(battery_state):
             "charging_advice": adjusted_params.get("charging_advice", []) if battery_model.rul_optimized_charging else []
         }
         
-        # 如果正在充电且启用了优化，应用参数到电池模型
-        if battery_model.is_charging and battery_model.rul_optimized_charging:
-            battery_model.update_charging_params(adjusted_params)
-            logger.info(f"基于 RUL {rul_percentage:.1f}% 调整了充电参数")
-            
-    except Exception as e:
-        logger.error(f"充电参数调整失败: {e}", exc_info=True)
+        # 如果正在充电且启用了优化，应用参数到电池模型 (在事件循环线程上修改模型，每个新结果只应用一次)
+        if sequence != applied_health_sequence and battery_model.is_charging and battery_model.rul_optimized_charging:
+            try:
+                battery_model.update_charging_params(adjusted_params)
+                logger.info(f"基于 RUL {rul_percentage:.1f}% 调整了充电参数")
+            except Exception as e:
+                logger.error(f"充电参数调整失败: {e}", exc_info=True)
+            applied_health_sequence = sequence
+    else:
         # 提供默认优化信息
         battery_state["charging_optimization"] = {
             "enabled": battery_model.rul_optimized_charging,
@@ -1199,14 +1300,17 @@ async def _generate_complete_battery_state(battery_state):
     
     return battery_state
 
-async def broadcast_battery_state(target_sid=None):
+async def broadcast_battery_state(target_sid=None, state=None):
     """广播电池状态
     
     参数:
         target_sid: 目标客户端ID，如果为None则广播给所有客户端
+        state: 本周期已生成的 BatteryState 快照，为None时生成新快照
     """
-    # 获取基本电池状态
-    battery_state = battery_model.get_state()
+    # 获取基本电池状态 (在序列化边界才转换为字典)
+    if state is None:
+        state = battery_model.snapshot()
+    battery_state = state.to_dict()
     
     # 生成完整的电池状态信息（包括健康信息和充电优化）
     battery_state = await _generate_complete_battery_state(battery_state)
@@ -1260,21 +1364,11 @@ async def simulator_loop():
                 logger.info(f"电池状态更新 #{loop_count}: SOC={battery_state['soc']:.2f}%, 电压={battery_state['voltage']:.2f}V, 电流={battery_state['current']:.2f}A, 温度={battery_state['temperature']:.2f}°C")
                 logger.debug(f"状态更新耗时: {update_time*1000:.2f}ms")
             
-            # 收集历史数据
-            battery_history.append({
-                "soc": battery_state["soc"],
-                "voltage": battery_state["voltage"],
-                "current": battery_state["current"],
-                "temperature": battery_state["temperature"],
-                "internal_resistance": battery_state["internal_resistance"]
-            })
-            
-            # 限制历史数据长度
-            if len(battery_history) > MAX_HISTORY_LENGTH:
-                battery_history.pop(0)
+            # 收集历史数据 (环形缓冲区自动覆盖最旧的记录)
+            battery_history.append(battery_state, time.time())
             
-            # 广播更新后的状态
-            await broadcast_battery_state()
+            # 广播更新后的状态 (复用本周期的快照)
+            await broadcast_battery_state(state=battery_state)
             
             # 等待下一次更新
             await asyncio.sleep(update_interval)
@@ -1321,11 +1415,32 @@ async def stop_simulator():
             simulator_task = None
             logger.info("电池模拟器任务已停止")
 
+async def _load_models_in_background():
+    """在后台线程加载 CNN+LSTM RUL 模型，加载完成后下一个仿真周期立即用模型重新计算 RUL"""
+    ready = await asyncio.to_thread(cnn_lstm_rul_model.load)
+    if ready:
+        rul_schedule.reset()
+        logger.info(f"RUL 模型已就绪，加载耗时: {cnn_lstm_rul_model.load_times}")
+
 @app.on_event("startup")
 async def startup_event():
     """应用启动时执行的事件"""
+    global model_loading_task
     logger.info("电池模拟器服务器正在启动")
     init_db()
+    await event_loop_lag.start()
+    # 模型加载不阻塞启动，服务器立即开始接受连接
+    model_loading_task = asyncio.create_task(_load_models_in_background())
+    
+    # 从上次关闭时保存的检查点恢复仿真状态
+    checkpoint_path = SIMULATOR_CONFIG.get("checkpoint_path")
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        try:
+            battery_model.load_checkpoint(checkpoint_path)
+            logger.info(f"已从检查点恢复电池状态: {checkpoint_path} (SOC={battery_model.soc:.2f}%, "
+                        f"循环次数={battery_model.cycle_count:.2f})")
+        except Exception as e:
+            logger.error(f"恢复检查点失败，使用默认电池状态: {e}")
     
     # 创建模型目录
     os.makedirs("models", exist_ok=True)
@@ -1341,6 +1456,22 @@ async def shutdown_event():
     """应用关闭时执行的事件"""
     logger.info("电池模拟器服务器正在关闭")
     await stop_simulator()
+    await event_loop_lag.stop()
+    # 等待健康评估线程完成当前作业 (它可能在等待微批处理结果，因此不能阻塞事件循环)
+    await asyncio.to_thread(health_pipeline.stop, 5.0)
+    await rul_batcher.stop()
+    
+    # 保存仿真状态检查点
+    checkpoint_path = SIMULATOR_CONFIG.get("checkpoint_path")
+    if checkpoint_path:
+        try:
+            battery_model.save_checkpoint(checkpoint_path)
+            logger.info(f"电池状态检查点已保存: {checkpoint_path}")
+        except Exception as e:
+            logger.error(f"保存检查点失败: {e}")
+    # 写完后台写入队列中的记录后再关闭数据库连接池 (提交 WAL 检查点)
+    await asyncio.to_thread(get_db_writer().stop, 5.0)
+    close_pool()
     logger.info("服务器已完全关闭")
 
 # Socket.IO已集成到FastAPI应用中，无需额外挂载
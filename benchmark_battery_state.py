@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+状态快照性能基准
+对比原先每周期构造4次状态字典 (充电控制、返回值、历史记录、广播) 与
+每周期生成一个 BatteryState 快照、仅在广播边界转换一次字典的耗时和内存分配
+"""
+
+import sys
+import os
+import time
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from config import SIMULATOR_CONFIG
+from models.battery_model import BatteryModel
+from models.sim_clock import SimulatedClock
+
+TICKS = 20000
+
+
+def legacy_get_state(model):
+    """原 BatteryModel.get_state() 的字典构造 (参考)"""
+    time_acceleration_factor = SIMULATOR_CONFIG["time_acceleration_factor"]
+    display_current = model.current
+    display_voltage = model.voltage
+    if model.is_charging or model.is_discharging:
+        display_current = model.current * time_acceleration_factor
+        if not (model.is_charging and model.charging_mode == "cv"):
+            r_total = model.internal_resistance + model.polarization_resistance * 0.5
+            delta_v = (display_current - model.current) * r_total
+            display_voltage = model.voltage + delta_v
+    return {
+        "soc": model.soc,
+        "voltage": model.voltage,
+        "current": model.current,
+        "temperature": model.temperature,
+        "internal_resistance": model.internal_resistance,
+        "is_charging": model.is_charging,
+        "is_discharging": model.is_discharging,
+        "charging_mode": model.charging_mode,
+        "charging_current": max(0, model.current) if model.is_charging else 0,
+        "discharging_current": abs(min(0, model.current)) if model.is_discharging else 0,
+        "charging_voltage": model.voltage if model.is_charging else 0,
+        "cycle_count": model.cycle_count,
+        "health": model.health,
+        "estimated_rul": model.estimated_rul,
+        "ambient_temperature": model.ambient_temperature,
+        "max_charging_current": model.max_charging_current,
+        "cc_to_cv_voltage": model.cc_to_cv_voltage,
+        "max_voltage": model.max_voltage,
+        "trickle_current": model.trickle_current,
+        "trickle_voltage": model.trickle_voltage,
+        "polarization_resistance": model.polarization_resistance,
+        "polarization_capacitance": model.polarization_capacitance,
+        "polarization_voltage": model.polarization_voltage,
+        "display_current": display_current,
+        "display_voltage": display_voltage,
+        "time_acceleration_factor": time_acceleration_factor,
+        "rul_optimized_charging": model.rul_optimized_charging,
+    }
+
+
+def legacy_consumers(model, state):
+    """原先每周期的4次字典构造: _update_charging、_record_history、update() 返回值、广播"""
+    for _ in range(4):
+        legacy_get_state(model)
+
+
+def snapshot_consumers(model, state):
+    """现在: 快照已在 update() 中生成，只在广播边界转换一次字典"""
+    state.to_dict()
+
+
+def new_model():
+    clock = SimulatedClock()
+    model = BatteryModel(clock=clock, persist_records=False)
+    model.soc = 20.0
+    model.is_charging = True
+    model._switch_charging_mode("cc")
+    return clock, model
+
+
+def measure(consumers):
+    """返回 (每周期状态处理耗时 µs, 每周期状态处理分配的字节数)"""
+    clock, model = new_model()
+    elapsed = 0.0
+    for _ in range(TICKS):
+        clock.advance(1.0)
+        state = model.update()
+        start = time.perf_counter()
+        consumers(model, state)
+        elapsed += time.perf_counter() - start
+
+    # 单独测量一个周期内状态处理 (快照/字典) 的内存分配
+    clock, model = new_model()
+    tracemalloc.start()
+    total = 0
+    for _ in range(1000):
+        clock.advance(1.0)
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        if consumers is snapshot_consumers:
+            state = model.snapshot()
+            kept = [state]
+            consumers(model, state)
+        else:
+            kept = []
+            for _ in range(4):
+                kept.append(legacy_get_state(model))
+        total += tracemalloc.get_traced_memory()[1] - before
+        del kept
+    tracemalloc.stop()
+    return elapsed / TICKS * 1e6, total / 1000
+
+
+if __name__ == "__main__":
+    legacy_time, legacy_bytes = measure(legacy_consumers)
+    snapshot_time, snapshot_bytes = measure(snapshot_consumers)
+    # 快照方案还需计入 update() 中生成快照本身的耗时
+    clock, model = new_model()
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        model.snapshot()
+    snapshot_time += (time.perf_counter() - start) / TICKS * 1e6
+
+    print(f"{'':<24}{'每周期耗时 (µs)':>16}{'每周期分配 (字节)':>20}")
+    print(f"{'原方案: 4次字典':<24}{legacy_time:>16.2f}{legacy_bytes:>20.0f}")
+    print(f"{'快照 + 1次字典':<24}{snapshot_time:>16.2f}{snapshot_bytes:>20.0f}")
+    print(f"耗时减少 {(1 - snapshot_time / legacy_time) * 100:.0f}%, 分配减少 {(1 - snapshot_bytes / legacy_bytes) * 100:.0f}%")
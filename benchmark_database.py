@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+数据库连接池基准
+对比每次操作新建连接 (原实现，SQLite 默认的回滚日志和 synchronous=FULL) 与连接池
+(每个线程复用读连接 + 串行写连接，WAL、synchronous=NORMAL、mmap 和页缓存) 在
+插入、按主键查询和条件搜索三类操作下的吞吐量 (次/秒)
+"""
+
+import sys
+import os
+import time
+import random
+import logging
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from config import DATABASE_CONFIG
+from models import database
+
+STORED_RECORDS = 10_000
+OPERATIONS = {"插入": 500, "主键查询": 2000, "条件搜索": 300}
+# 原实现: 每次操作新建连接，不设置任何参数
+UNPOOLED = {"pool_connections": False, "journal_mode": None, "synchronous": None, "mmap_size": None,
+            "cache_size": None}
+
+
+def new_record(rng):
+    return {"start_time": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T08:00:00",
+            "initial_soc": rng.uniform(5, 60), "initial_temperature": rng.uniform(15, 35),
+            "initial_internal_resistance": 0.1, "initial_polarization_resistance": 0.05,
+            "charging_phases": [{"phase": "cc", "start_time": "2024-01-01T08:00:00", "end_time": None}]}
+
+
+def ops_per_second(operation, count):
+    start = time.perf_counter()
+    for i in range(count):
+        operation(i)
+    return count / (time.perf_counter() - start)
+
+
+def run(config, path):
+    """在 config 设置下依次测量三类操作的吞吐量"""
+    saved = dict(DATABASE_CONFIG)
+    DATABASE_CONFIG.update(config)
+    database.DB_PATH = path
+    try:
+        database.init_db()
+        rng = random.Random(0)
+        conn = database.get_db_connection(write=True)
+        conn.executemany(
+            "INSERT INTO charging_records (start_time, initial_soc, initial_temperature, "
+            "initial_internal_resistance, initial_polarization_resistance, charging_phases) "
+            "VALUES (?, ?, ?, 0.1, 0.05, '[]')",
+            [(new_record(rng)["start_time"], rng.uniform(5, 60), rng.uniform(15, 35)) for _ in range(STORED_RECORDS)])
+        conn.commit()
+        conn.close()
+        return {
+            "插入": ops_per_second(lambda i: database.add_charging_record(new_record(rng)), OPERATIONS["插入"]),
+            "主键查询": ops_per_second(lambda i: database.get_charging_record_by_id(rng.randint(1, STORED_RECORDS)),
+                                   OPERATIONS["主键查询"]),
+            "条件搜索": ops_per_second(lambda i: database.search_charging_records(
+                {"min_soc": 20 + i % 20, "max_soc": 40 + i % 20, "limit": 20}), OPERATIONS["条件搜索"]),
+        }
+    finally:
+        database.close_pool()
+        DATABASE_CONFIG.clear()
+        DATABASE_CONFIG.update(saved)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    original_path = database.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = run(UNPOOLED, os.path.join(tmp, "unpooled.db"))
+        pooled = run({}, os.path.join(tmp, "pooled.db"))
+    database.DB_PATH = original_path
+
+    print(f"已有 {STORED_RECORDS} 条充电记录，吞吐量单位为 次/秒")
+    print(f"{'操作':<10}{'每次新建连接':>14}{'连接池 + WAL':>14}{'提升':>10}")
+    for name in OPERATIONS:
+        print(f"{name:<10}{baseline[name]:>14.0f}{pooled[name]:>14.0f}{pooled[name] / baseline[name]:>9.1f}x")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+事件循环延迟基准
+模拟服务器每个周期的 RUL 预测 + 健康评估 + 充电参数计算，对比在事件循环中同步执行 (改动前)
+与交给健康评估线程、事件循环只发布最近结果 (改动后) 时的事件循环延迟
+"""
+
+import sys
+import os
+import time
+import asyncio
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.cnn_lstm_rul_model import CNNLSTM_RULModel, TF_AVAILABLE
+from models.rul_inference_service import RULInferenceService
+from models.background_worker import LatestResultWorker, EventLoopLagMonitor
+from models.history_buffer import HistoryRingBuffer
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "battery-charging-simulator", "backend")
+TICK_INTERVAL = 0.1  # 仿真周期 (秒)
+DURATION = 3.0       # 每种配置的运行时间 (秒)
+
+
+def load_rul_model(engine):
+    cwd = os.getcwd()
+    os.chdir(BACKEND_DIR)
+    try:
+        model = CNNLSTM_RULModel(inference_service=RULInferenceService())
+        if engine == "keras":
+            # 改动前的推理方式: 逐个调用 Keras 模型的 predict
+            from tensorflow.keras.models import load_model
+            model.models = [load_model(os.path.join("models", f"cnn_lstm_rul_model_k{i}.keras")) for i in range(1, 4)]
+            model.inference = RULInferenceService()
+    finally:
+        os.chdir(cwd)
+    return model
+
+
+def make_history():
+    rng = np.random.default_rng(0)
+    history = HistoryRingBuffer(1000)
+    for i in range(1000):
+        history.append({"soc": 20 + i * 0.05, "voltage": 360 + rng.normal(), "current": 50.0,
+                        "temperature": 25 + rng.normal(), "internal_resistance": 0.05}, float(i))
+    return history
+
+
+def pipeline(model, history, static_features):
+    state = {"soc": 60.0, "voltage": 380.0, "temperature": 30.0, "health": 95.0}
+    rul = model.predict_rul(history, static_features)
+    rul_percentage = min(100, max(0, rul / 10))
+    health_info = model.evaluate_battery_health(history, static_features, rul_percentage)
+    return health_info, model.adjust_charging_parameters(state, rul_percentage)
+
+
+async def run(model, offload):
+    history = make_history()
+    static_features = np.array([100, 95.0, 25.0])
+    worker = LatestResultWorker(lambda job: pipeline(model, *job), name="health-pipeline")
+    monitor = EventLoopLagMonitor(interval=0.01)
+    await monitor.start()
+    loop = asyncio.get_running_loop()
+    end = loop.time() + DURATION
+    ticks = 0
+    while loop.time() < end:
+        if offload:
+            worker.submit((history.copy(), static_features))
+            worker.latest()
+        else:
+            pipeline(model, history, static_features)
+        ticks += 1
+        await asyncio.sleep(TICK_INTERVAL)
+    await monitor.stop()
+    await asyncio.to_thread(worker.stop, 10.0)
+    return ticks, worker.sequence, monitor.metrics()
+
+
+if __name__ == "__main__":
+    engines = ["numpy"] + (["keras"] if TF_AVAILABLE else [])
+    print(f"{'推理方式':<14}{'执行位置':<12}{'周期数':>8}{'完成计算':>10}{'延迟p50 (ms)':>14}{'延迟p99 (ms)':>14}{'最大 (ms)':>12}")
+    for engine in engines:
+        model = load_rul_model(engine)
+        for offload in (False, True):
+            ticks, completed, lag = asyncio.run(run(model, offload))
+            place = "健康评估线程" if offload else "事件循环"
+            completed = completed if offload else ticks
+            print(f"{engine:<14}{place:<12}{ticks:>8}{completed:>10}{lag['p50_ms']:>14.2f}{lag['p99_ms']:>14.2f}{lag['max_ms']:>12.2f}")
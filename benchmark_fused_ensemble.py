@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+K折集成推理性能基准
+对比每个周期逐个调用三个折模型 (Keras predict / NumPy 推理) 与合并后一次前向计算的耗时
+"""
+
+import sys
+import os
+import time
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.numpy_inference import NumpyRULModel, FusedEnsembleModel
+from models.cnn_lstm_rul_model import TF_AVAILABLE
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "battery-charging-simulator", "backend", "models")
+KERAS_MODELS = [os.path.join(MODEL_DIR, f"cnn_lstm_rul_model_k{i}.keras") for i in range(1, 4)]
+
+
+def measure(predict, repeats):
+    """返回每次调用的耗时中位数 (µs)"""
+    predict()  # 预热
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1e6
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    lstm_input, cnn_input = rng.uniform(0, 1, (1, 5, 1)), rng.uniform(0, 1, (1, 5, 10))
+
+    folds = [NumpyRULModel.from_keras(path) for path in KERAS_MODELS]
+    ensemble = FusedEnsembleModel(folds)
+    results = []
+    if TF_AVAILABLE:
+        from tensorflow.keras.models import load_model
+        keras_folds = [load_model(path) for path in KERAS_MODELS]
+        results.append(("Keras 逐个 predict", measure(
+            lambda: [m.predict([lstm_input, cnn_input], verbose=0)[0][0] for m in keras_folds], 30)))
+    results.append(("NumPy 逐个推理", measure(
+        lambda: [m.predict([lstm_input, cnn_input])[0][0] for m in folds], 5000)))
+    results.append(("NumPy 合并集成", measure(lambda: ensemble.predict_folds(lstm_input, cnn_input)[0], 5000)))
+
+    fused_time = results[-1][1]
+    print(f"{'三个折模型单样本预测':<20}{'耗时 (µs)':>12}{'相对合并集成':>14}")
+    for name, elapsed in results:
+        print(f"{name:<20}{elapsed:>12.1f}{elapsed / fused_time:>13.1f}x")
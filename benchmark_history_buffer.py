@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+历史数据环形缓冲区性能基准
+对比原先的字典列表 (append + pop(0) / 切片) 与环形缓冲区在服务器每个评估周期内的耗时:
+追加一条记录、计算最近100条平均温度、提取RUL预测输入、计算最近20条的电压波动
+"""
+
+import sys
+import os
+import time
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.history_buffer import HistoryRingBuffer
+
+CAPACITY = 1000
+TICKS = 20000
+WINDOW = 20
+TEMPERATURE_WINDOW = 100
+
+
+def make_record(i):
+    return {"timestamp": float(i), "soc": 50.0, "voltage": 360.0 + i % 7, "current": 50.0,
+            "temperature": 25.0, "internal_resistance": 0.05}
+
+
+def bench_list():
+    history = []
+    start = time.perf_counter()
+    for i in range(TICKS):
+        history.append(make_record(i))
+        if len(history) > CAPACITY:
+            history.pop(0)
+        np.mean([h.get("temperature", 25) for h in history[-TEMPERATURE_WINDOW:]])
+        np.array([data["voltage"] for data in history])
+        np.array([data["soc"] / 100.0 for data in history])
+        np.std([data["voltage"] for data in history[-WINDOW:]])
+    return (time.perf_counter() - start) / TICKS * 1e6
+
+
+def bench_buffer():
+    history = HistoryRingBuffer(CAPACITY)
+    start = time.perf_counter()
+    for i in range(TICKS):
+        history.append(make_record(i))
+        np.mean(history.column("temperature", TEMPERATURE_WINDOW))
+        history.column("voltage", 5)
+        history.column("soc", 5) / 100.0
+        np.std(history.column("voltage", WINDOW))
+    return (time.perf_counter() - start) / TICKS * 1e6
+
+
+if __name__ == "__main__":
+    list_time = bench_list()
+    buffer_time = bench_buffer()
+    print(f"容量 {CAPACITY}, 窗口 {WINDOW}, {TICKS} 个周期")
+    print(f"字典列表:   {list_time:.2f} µs/周期")
+    print(f"环形缓冲区: {buffer_time:.2f} µs/周期")
+    print(f"加速比: {list_time / buffer_time:.2f}x")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+查找表性能基准
+对比查找表与原分段分支代码在标量和批量查询上的耗时，并校验结果一致
+"""
+
+import sys
+import os
+import timeit
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+import numpy as np
+
+from config import BATTERY_CONFIG
+from models.lookup_tables import build_ocv_table, load_battery_tables
+
+MIN_V = BATTERY_CONFIG["min_voltage"]
+NOMINAL_V = BATTERY_CONFIG["nominal_voltage"]
+CC_TO_CV_V = BATTERY_CONFIG["cc_to_cv_voltage"]
+MAX_V = BATTERY_CONFIG["max_voltage"]
+
+
+def branchy_ocv(soc):
+    """原 BatteryModel._calculate_ocv_from_soc 的分支实现 (参考)"""
+    soc = max(0, min(soc, 100))
+    if soc <= 10:
+        return MIN_V + (NOMINAL_V - MIN_V) * soc / 10
+    elif soc <= 90:
+        return NOMINAL_V + (CC_TO_CV_V - NOMINAL_V) * (soc - 10) / 80
+    else:
+        return CC_TO_CV_V + (MAX_V - CC_TO_CV_V) * (soc - 90) / 10
+
+
+def branchy_resistance(temperature):
+    """原 _update_temperature 中的内阻温度修正 (参考)"""
+    temp_factor = 1 + BATTERY_CONFIG["temperature_coefficient"] * (temperature - 25)
+    return BATTERY_CONFIG["default_internal_resistance"] * temp_factor
+
+
+def branchy_ocv_batch(soc):
+    """原 BatteryFleet.calculate_ocv 的嵌套 np.where 实现 (参考)"""
+    soc = np.clip(soc, 0, 100)
+    low = MIN_V + (NOMINAL_V - MIN_V) * soc / 10
+    mid = NOMINAL_V + (CC_TO_CV_V - NOMINAL_V) * (soc - 10) / 80
+    high = CC_TO_CV_V + (MAX_V - CC_TO_CV_V) * (soc - 90) / 10
+    return np.where(soc <= 10, low, np.where(soc <= 90, mid, high))
+
+
+def report(name, reference, table, number):
+    ref_time = min(timeit.repeat(reference, number=number, repeat=5)) / number
+    table_time = min(timeit.repeat(table, number=number, repeat=5)) / number
+    print(f"{name:<28} 分支代码 {ref_time * 1e9:10.0f} ns   查找表 {table_time * 1e9:10.0f} ns   "
+          f"加速 {ref_time / table_time:5.2f}x")
+
+
+if __name__ == "__main__":
+    ocv_table = build_ocv_table(MIN_V, NOMINAL_V, CC_TO_CV_V, MAX_V)
+    r0_table = load_battery_tables()["internal_resistance"]
+
+    socs = np.random.default_rng(0).uniform(-5, 105, 100000)
+    temperatures = np.random.default_rng(1).uniform(0, 60, 100000)
+    assert np.allclose(ocv_table.interp(socs), branchy_ocv_batch(socs), atol=1e-9)
+    assert all(abs(ocv_table.lookup(s) - branchy_ocv(s)) < 1e-9 for s in socs[:1000].tolist())
+    assert all(abs(r0_table.lookup(50.0, t) - branchy_resistance(t)) < 1e-12 for t in temperatures[:1000].tolist())
+
+    scalar_soc = 57.3
+    scalar_temperature = 31.2
+    report("OCV 标量", lambda: branchy_ocv(scalar_soc), lambda: ocv_table.lookup(scalar_soc), 200000)
+    report("R0 标量", lambda: branchy_resistance(scalar_temperature),
+           lambda: r0_table.lookup(scalar_soc, scalar_temperature), 200000)
+    for n in (100, 10000, 100000):
+        batch = socs[:n]
+        report(f"OCV 批量 n={n}", lambda: branchy_ocv_batch(batch), lambda: ocv_table.interp(batch),
+               max(10, 1000000 // n))
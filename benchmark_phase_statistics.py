@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+充电阶段统计基准
+对比原实现 (读取全部记录、逐条解析 charging_phases JSON 和 ISO 时间)、charging_phases 表上
+一条 GROUP BY 查询 (覆盖索引，迁移和一致性检查使用) 与读取 charging_phase_totals 汇总表 (统计接口使用)
+在 100 万个阶段下的耗时，并给出从 JSON 列迁移的耗时
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import logging
+import tempfile
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models import database
+
+RECORDS = 333_334  # 每条记录 3 个阶段，共约 100 万个阶段
+REPEATS = 5
+
+
+def record_phases(rng):
+    cc_end = 600 + rng.randint(0, 3000)
+    cv_end = cc_end + 300 + rng.randint(0, 1800)
+    stamp = lambda seconds: datetime.fromtimestamp(1_700_000_000 + seconds).isoformat()
+    return [{"phase": "cc", "start_time": stamp(0), "end_time": stamp(cc_end)},
+            {"phase": "cv", "start_time": stamp(cc_end), "end_time": stamp(cv_end)},
+            {"phase": "trickle", "start_time": stamp(cv_end), "end_time": stamp(cv_end + rng.randint(60, 600))}]
+
+
+def json_statistics():
+    """原实现的统计方式"""
+    conn = database.get_db_connection()
+    try:
+        stats = {phase: {"count": 0, "total_duration": 0} for phase in ("cc", "cv", "trickle")}
+        for record in conn.execute("SELECT charging_phases FROM charging_records").fetchall():
+            for phase in json.loads(record["charging_phases"]):
+                if phase.get("start_time") and phase.get("end_time"):
+                    duration = (datetime.fromisoformat(phase["end_time"]) -
+                                datetime.fromisoformat(phase["start_time"])).total_seconds()
+                    stats[phase["phase"]]["count"] += 1
+                    stats[phase["phase"]]["total_duration"] += duration
+        return stats
+    finally:
+        conn.close()
+
+
+def group_by_statistics():
+    """按阶段分组重新汇总 (扫描覆盖索引)"""
+    conn = database.get_db_connection()
+    try:
+        return {row["phase"]: row["count"] for row in conn.execute(database.CHARGING_PHASE_TOTALS_GROUP_BY_SQL)}
+    finally:
+        conn.close()
+
+
+def best_of(function, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    original_path = database.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "battery_data.db")
+        database.init_db()
+        rng = random.Random(0)
+        conn = database.get_db_connection(write=True)
+        conn.executemany(
+            "INSERT INTO charging_records (start_time, initial_soc, initial_temperature, "
+            "initial_internal_resistance, initial_polarization_resistance, charging_phases) "
+            "VALUES ('2023-11-14T22:13:20', 20, 25, 0.1, 0.05, ?)",
+            ((json.dumps(record_phases(rng)),) for _ in range(RECORDS)))
+        conn.execute("DELETE FROM charging_phases")
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+
+        start = time.perf_counter()
+        phases = database.migrate_charging_phases(conn)
+        migration = time.perf_counter() - start
+        conn.close()
+
+        json_ms, reference = best_of(json_statistics, 1)
+        group_by_ms, counts = best_of(group_by_statistics, REPEATS)
+        totals_ms, stats = best_of(database.get_charging_phases_statistics, REPEATS)
+        for phase in reference:
+            assert stats[phase]["count"] == counts[phase] == reference[phase]["count"]
+        database.close_pool()
+    database.DB_PATH = original_path
+
+    print(f"{RECORDS} 条充电记录，{phases} 个阶段 (迁移耗时 {migration:.1f} 秒)")
+    print(f"{'统计方式':<24}{'耗时 (ms)':>12}")
+    print(f"{'逐条解析 JSON':<24}{json_ms:>12.0f}")
+    print(f"{'GROUP BY (覆盖索引)':<24}{group_by_ms:>12.1f}")
+    print(f"{'汇总表 (统计接口)':<24}{totals_ms:>12.2f}")
+    print(f"提升 {json_ms / totals_ms:.0f}x")
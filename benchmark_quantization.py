@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+RUL 模型量化报告
+对比 float32、float16、int8 (按输出通道缩放) 三种权重变体 (在内存中保持量化后的权重直接计算) 的文件大小、
+加载后的进程内存 (RSS)、合并集成模型的单样本推理延迟，以及在 NASA 测试电池 B0018 上的 MAE / RMSE 与 float32 的差异
+
+B0018 只有每个放电循环的汇总数据 (没有训练时用于提取 10 维电压特征的充电曲线)，
+因此按仿真器运行时的方式构造输入: LSTM 为容量窗口，CNN 为电压窗口复制到 10 个通道，
+目标为下一个循环的容量，归一化方式与训练脚本相同 (每块电池单独 MinMax 缩放)。
+"""
+
+import sys
+import os
+import time
+import subprocess
+import numpy as np
+from pandas import read_csv
+from sklearn.preprocessing import MinMaxScaler
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.numpy_inference import NumpyRULModel, FusedEnsembleModel, quantized_path
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(ROOT, "battery-charging-simulator", "backend", "models")
+KERAS_MODELS = [os.path.join(MODEL_DIR, f"cnn_lstm_rul_model_k{i}.keras") for i in range(1, 4)]
+B0018_PATH = os.path.join(ROOT, "RUL_prediction", "data", "NASA", "discharge", "test", "B0018_discharge.csv")
+VARIANTS = (None, "float16", "int8")
+SEQ_LEN = 5
+CNN_CHANNELS = 10
+
+
+def load_ensemble(quantization):
+    return FusedEnsembleModel([NumpyRULModel.from_keras(path, quantization=quantization) for path in KERAS_MODELS])
+
+
+def rss_kb():
+    """当前进程的常驻内存 (KB)"""
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+
+
+def measure_rss(quantization):
+    """在独立进程中测量加载模型并推理一次后增加的常驻内存 (KB)"""
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--rss", str(quantization)],
+                            capture_output=True, text=True, check=True).stdout
+    return int(output.strip().splitlines()[-1])
+
+
+def b0018_dataset():
+    """B0018 的输入窗口和目标容量 (Ah)"""
+    data = read_csv(B0018_PATH).dropna()
+    capacity_scaler = MinMaxScaler().fit(data[["capacity"]].values)
+    capacity = capacity_scaler.transform(data[["capacity"]].values)[:, 0]
+    voltage = MinMaxScaler().fit_transform(data[["voltage_battery"]].values)[:, 0]
+    starts = np.arange(len(capacity) - SEQ_LEN)
+    windows = starts[:, None] + np.arange(SEQ_LEN)
+    lstm_input = capacity[windows][:, :, None]
+    cnn_input = np.repeat(voltage[windows][:, :, None], CNN_CHANNELS, axis=2)
+    target = data["capacity"].values[starts + SEQ_LEN]
+    return lstm_input, cnn_input, target, capacity_scaler
+
+
+def p50_latency_us(ensemble, lstm_input, cnn_input, repeats=2000):
+    ensemble.predict_folds(lstm_input, cnn_input)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        ensemble.predict_folds(lstm_input, cnn_input)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1e6
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--rss":
+        quantization = None if sys.argv[2] == "None" else sys.argv[2]
+        before = rss_kb()
+        ensemble = load_ensemble(quantization)
+        ensemble.predict_folds(np.zeros((1, SEQ_LEN, 1)), np.zeros((1, SEQ_LEN, CNN_CHANNELS)))
+        print(rss_kb() - before)
+        sys.exit(0)
+
+    for quantization in VARIANTS:
+        load_ensemble(quantization)  # 导出各变体的 .npz
+    lstm_input, cnn_input, target, capacity_scaler = b0018_dataset()
+
+    rows = []
+    for quantization in VARIANTS:
+        ensemble = load_ensemble(quantization)
+        size = sum(os.path.getsize(quantized_path(path, quantization)) for path in KERAS_MODELS)
+        folds = ensemble.predict_folds(lstm_input, cnn_input)
+        predicted = capacity_scaler.inverse_transform(folds.mean(axis=1, keepdims=True))[:, 0]
+        error = predicted - target
+        rows.append({
+            "name": quantization or "float32",
+            "size": size / 1024,
+            "rss": measure_rss(quantization) / 1024,
+            "latency": p50_latency_us(ensemble, lstm_input[:1], cnn_input[:1]),
+            "mae": float(np.mean(np.abs(error))),
+            "rmse": float(np.sqrt(np.mean(error ** 2))),
+            "folds": folds,
+        })
+
+    reference = rows[0]
+    print(f"B0018: {len(target)} 个样本，三个折模型的平均预测值，误差单位为 Ah")
+    print(f"{'权重':<10}{'文件 (KB)':>10}{'RSS (MB)':>10}{'延迟 (µs)':>11}{'MAE':>10}{'RMSE':>10}"
+          f"{'ΔMAE':>11}{'ΔRMSE':>11}{'最大偏差':>10}")
+    for row in rows:
+        deviation = np.abs(row["folds"] - reference["folds"]).max()
+        print(f"{row['name']:<10}{row['size']:>10.1f}{row['rss']:>10.2f}{row['latency']:>11.1f}"
+              f"{row['mae']:>10.5f}{row['rmse']:>10.5f}{row['mae'] - reference['mae']:>+11.5f}"
+              f"{row['rmse'] - reference['rmse']:>+11.5f}{deviation:>10.5f}")
+    keras_size = sum(os.path.getsize(path) for path in KERAS_MODELS) / 1024
+    print(f"(原始 .keras 文件共 {keras_size:.1f} KB；量化变体在内存中保持量化后的权重直接计算: "
+          f"float16 以半精度计算 (NumPy 的半精度矩阵乘法没有 BLAS 实现)，"
+          f"int8 的核保持 int8，矩阵乘法时转换为 float32 后结果乘以输出通道缩放系数)")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+RUL 推理延迟基准
+对比三个折模型逐个 Keras predict、共享推理服务的 tf.function 后端和 NumPy 后端
+在 1、8、64、512 个样本批量下的 p50 / p99 延迟
+"""
+
+import sys
+import os
+import time
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.rul_inference_service import RULInferenceService, TF_AVAILABLE
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "battery-charging-simulator", "backend", "models")
+KERAS_MODELS = [os.path.join(MODEL_DIR, f"cnn_lstm_rul_model_k{i}.keras") for i in range(1, 4)]
+BATCH_SIZES = (1, 8, 64, 512)
+
+
+def measure(predict, repeats):
+    """返回每次调用耗时的 p50 和 p99 (ms)"""
+    predict()  # 预热
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict()
+        samples.append(time.perf_counter() - start)
+    return np.percentile(samples, 50) * 1e3, np.percentile(samples, 99) * 1e3
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    inputs = {batch: (rng.uniform(0, 1, (batch, 5, 1)).astype(np.float32),
+                      rng.uniform(0, 1, (batch, 5, 10)).astype(np.float32)) for batch in BATCH_SIZES}
+
+    backends = []
+    if TF_AVAILABLE:
+        from tensorflow.keras.models import load_model
+        keras_folds = [load_model(path) for path in KERAS_MODELS]
+        backends.append(("Keras 逐个 predict", 30,
+                         lambda x: np.hstack([m.predict(x, verbose=0) for m in keras_folds])))
+        compiled = RULInferenceService()
+        compiled.load(KERAS_MODELS, backend="tensorflow")
+        backends.append(("tf.function 服务", 300, lambda x: compiled.predict_folds(*x)))
+    service = RULInferenceService()
+    service.load(KERAS_MODELS)
+    backends.append(("NumPy 服务", 1000, lambda x: service.predict_folds(*x)))
+
+    print(f"{'后端':<20}{'批量':>6}{'p50 (ms)':>12}{'p99 (ms)':>12}{'p50/样本 (µs)':>16}")
+    for name, repeats, predict in backends:
+        for batch in BATCH_SIZES:
+            p50, p99 = measure(lambda: predict(inputs[batch]), repeats)
+            print(f"{name:<20}{batch:>6}{p50:>12.3f}{p99:>12.3f}{p50 * 1e3 / batch:>16.1f}")
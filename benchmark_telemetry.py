@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+遥测数据存储基准
+对比 charging_telemetry (主键 (record_id, t) 聚簇存储，WITHOUT ROWID) 与普通 rowid 表 +
+(record_id, t) 索引在批量追加、时间范围查询 (返回 NumPy 数组) 和文件大小上的差异
+"""
+
+import sys
+import os
+import time
+import logging
+import tempfile
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models import database
+
+SESSIONS = 20
+SAMPLES_PER_SESSION = 20_000  # 每次充电的样本数 (每秒一个样本约 5.5 小时)
+QUERIES = 200
+QUERY_SPAN = 600.0  # 每次查询的时间范围 (秒)
+
+# 对照: 普通 rowid 表，按 (record_id, t) 查询需要先查索引再回表
+ROWID_SCHEMA = """
+    CREATE TABLE charging_telemetry (
+        record_id INTEGER NOT NULL,
+        t REAL NOT NULL,
+        soc REAL,
+        voltage REAL,
+        current REAL,
+        temperature REAL
+    );
+    CREATE UNIQUE INDEX idx_telemetry_record_t ON charging_telemetry (record_id, t);
+"""
+
+
+def session_samples(rng, record_id):
+    t = 1_700_000_000.0 + record_id * 86400 + np.arange(SAMPLES_PER_SESSION, dtype=np.float64)
+    soc = np.linspace(20, 100, SAMPLES_PER_SESSION)
+    return np.column_stack([t, soc, 3.6 + soc / 200 + rng.normal(0, 0.002, t.size),
+                            rng.uniform(0, 5, t.size), 25 + rng.normal(0, 0.5, t.size)])
+
+
+def run(path, schema=None):
+    database.DB_PATH = path
+    try:
+        if schema is not None:
+            conn = database.get_db_connection(write=True)
+            conn.executescript(schema)
+            conn.commit()
+            conn.close()
+        database.init_db()
+        rng = np.random.default_rng(0)
+        sessions = [session_samples(rng, record_id) for record_id in range(1, SESSIONS + 1)]
+
+        start = time.perf_counter()
+        for record_id, samples in enumerate(sessions, 1):
+            database.append_telemetry(record_id, samples)
+        ingest = SESSIONS * SAMPLES_PER_SESSION / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i in range(QUERIES):
+            record_id = 1 + i % SESSIONS
+            t0 = sessions[record_id - 1][0, 0] + rng.uniform(0, SAMPLES_PER_SESSION - QUERY_SPAN)
+            data = database.get_telemetry(record_id, t0, t0 + QUERY_SPAN)
+            assert data["t"].size == QUERY_SPAN
+        query_ms = (time.perf_counter() - start) / QUERIES * 1000
+    finally:
+        database.close_pool()
+    return ingest, query_ms, os.path.getsize(path) / 1024 / 1024
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    original_path = database.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        rowid = run(os.path.join(tmp, "rowid.db"), ROWID_SCHEMA)
+        clustered = run(os.path.join(tmp, "clustered.db"))
+    database.DB_PATH = original_path
+
+    print(f"{SESSIONS} 次充电 x {SAMPLES_PER_SESSION} 个样本，每次查询 {QUERY_SPAN:.0f} 秒的数据")
+    print(f"{'存储方式':<22}{'追加 (样本/秒)':>16}{'范围查询 (ms)':>16}{'文件 (MB)':>12}")
+    for name, (ingest, query_ms, size) in (("rowid 表 + 索引", rowid), ("WITHOUT ROWID 主键", clustered)):
+        print(f"{name:<22}{ingest:>16.0f}{query_ms:>16.2f}{size:>12.1f}")
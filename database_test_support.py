@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+数据库测试的公共工具
+在临时目录中使用独立的数据库文件，并提供最小的充电记录
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models import database
+
+
+def new_record(soc=20.0, charging_phases=None):
+    """构造一条可直接写入的充电记录"""
+    return {"start_time": "2024-01-01T00:00:00", "initial_soc": soc, "initial_temperature": 25.0,
+            "initial_internal_resistance": 0.1, "initial_polarization_resistance": 0.05,
+            "charging_phases": charging_phases if charging_phases is not None else []}
+
+
+class TemporaryDatabase:
+    """在临时目录中使用独立的数据库文件"""
+
+    def __enter__(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_path = database.DB_PATH
+        database.DB_PATH = os.path.join(self.tmp.name, "battery_data.db")
+        database.init_db()
+        return database.DB_PATH
+
+    def __exit__(self, *exc):
+        database.close_pool()
+        database.DB_PATH = self.original_path
+        self.tmp.cleanup()
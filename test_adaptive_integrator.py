@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+事件驱动自适应积分器测试
+与 1 秒定步长的离线仿真对比，验证在少量步数下充电过程的精度
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+import numpy as np
+
+from models.adaptive_integrator import AdaptiveChargeIntegrator, TRICKLE_TAPER_SOC
+from models.battery_fleet import MODE_TRICKLE
+from models.headless_simulator import HeadlessChargeSimulator, MODE_CODES, run_charge_session
+
+
+def test_adaptive_matches_fixed_step():
+    """20%→100% 充电: 充电时长偏差<0.5%，SOC偏差<0.1%，温度偏差<0.5°C，步数<500"""
+    reference = HeadlessChargeSimulator(dt=1.0).run(initial_soc=20.0, initial_temperature=25.0)
+    adaptive = AdaptiveChargeIntegrator().run(initial_soc=20.0, initial_temperature=25.0)
+
+    assert adaptive["completed"]
+    assert adaptive["steps"] < 500, f"步数过多: {adaptive['steps']}"
+    relative_error = abs(adaptive["charge_time"] - reference["charge_time"]) / reference["charge_time"]
+    assert relative_error < 0.005, f"充电时长偏差 {relative_error:.4f}"
+
+    soc_reference = np.interp(adaptive["time"], reference["time"], reference["soc"])
+    temperature_reference = np.interp(adaptive["time"], reference["time"], reference["temperature"])
+    assert np.abs(adaptive["soc"] - soc_reference).max() < 0.1
+    assert np.abs(adaptive["temperature"] - temperature_reference).max() < 0.5
+
+
+def test_mode_transitions_are_located():
+    """CC→CV 切换点的端电压等于切换电压，且模式按 CC→CV→涓流 顺序出现"""
+    integrator = AdaptiveChargeIntegrator()
+    result = integrator.run(initial_soc=50.0)
+    modes = result["charging_mode"]
+    first_cv = np.argmax(modes == MODE_CODES["cv"])
+    first_trickle = np.argmax(modes == MODE_CODES["trickle"])
+    assert 0 < first_cv < first_trickle
+    # 切换时刻由二分法定位，电压误差仅来自 event_tolerance
+    assert abs(result["voltage"][first_cv] - integrator.cc_to_cv_voltage) < 0.05
+    assert result["soc"][-1] >= 99.99
+
+
+def test_run_charge_session_adaptive_flag():
+    """run_charge_session(adaptive=True) 使用自适应积分器"""
+    result = run_charge_session(initial_soc=30.0, adaptive=True)
+    assert result["completed"]
+    assert result["steps"] == len(result["time"]) - 1
+
+
+def test_ambient_temperature_is_per_run():
+    """run() 的环境温度只作用于本次仿真，之后的仿真仍使用配置的环境温度"""
+    integrator = AdaptiveChargeIntegrator()
+    baseline = integrator.run(initial_soc=20.0)
+    hot = integrator.run(initial_soc=20.0, ambient_temperature=40.0)
+    again = integrator.run(initial_soc=20.0)
+    assert hot["temperature"][0] == 40.0 and hot["temperature"].max() > baseline["temperature"].max()
+    assert np.array_equal(again["temperature"], baseline["temperature"])
+    assert again["charge_time"] == baseline["charge_time"]
+
+
+def test_trickle_taper_boundary_makes_progress():
+    """涓流恒流段到达 99% 时 SOC 落在阈值上，下一步进入衰减段，不会停在零步长"""
+    integrator = AdaptiveChargeIntegrator()
+    ambient = integrator.ambient_temperature
+    h, soc, _, _, mode = integrator._step_constant_current(MODE_TRICKLE, 0.0, 98.9999999, ambient, 0.0, ambient)
+    assert soc == TRICKLE_TAPER_SOC and mode == MODE_TRICKLE
+    h, soc, _, _, _ = integrator._step_exponential(MODE_TRICKLE, h, soc, ambient, 0.0, ambient)
+    assert h > 0 and soc > TRICKLE_TAPER_SOC
+
+
+if __name__ == "__main__":
+    test_adaptive_matches_fixed_step()
+    test_mode_transitions_are_located()
+    test_run_charge_session_adaptive_flag()
+    test_ambient_temperature_is_per_run()
+    test_trickle_taper_boundary_makes_progress()
+
+    start = time.perf_counter()
+    result = AdaptiveChargeIntegrator().run(initial_soc=20.0)
+    elapsed = time.perf_counter() - start
+    print(f"20%→100% 充电: 仿真时长 {result['charge_time'] / 3600:.2f} 小时, "
+          f"{result['steps']} 步, 耗时 {elapsed * 1000:.1f} ms")
+    print("✅ 自适应积分器测试全部通过")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+老化引擎测试
+验证恒定工况下的闭式解、分块累加与单块计算一致，以及温度/放电深度对寿命的影响方向
+"""
+
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.aging_model import AgingEngine, DAYS_PER_YEAR
+
+
+def test_constant_profile_matches_closed_form():
+    """参考温度、100% DoD 下: 日历损失 = f·√(365t)，循环损失 = k·EFC"""
+    engine = AgingEngine(calendar_aging_factor=0.002, cycle_aging_factor=0.01)
+    result = engine.project(3 * DAYS_PER_YEAR, daily_charges=2.0, depth_of_discharge=100.0, record_interval=100)
+    days = result["day"]
+    np.testing.assert_allclose(result["calendar_loss"][0], 0.002 * np.sqrt(DAYS_PER_YEAR * days), rtol=1e-12)
+    np.testing.assert_allclose(result["cycle_loss"][0], 0.01 * 2.0 * days, rtol=1e-12)
+    np.testing.assert_allclose(result["equivalent_cycles"][0], 2.0 * days)
+    assert days[-1] == 3 * DAYS_PER_YEAR
+    # 第一年的平均日历损失等于 calendar_aging_factor
+    year = engine.project(DAYS_PER_YEAR, daily_charges=0.0)
+    assert np.isclose(year["calendar_loss"][0, -1], 0.002 * DAYS_PER_YEAR)
+
+
+def test_blocks_match_single_pass():
+    """分块累加 (含季节温度变化) 与一次性计算的结果一致"""
+    engine = AgingEngine()
+    profile = dict(daily_charges=[0.5, 1.0, 2.0], depth_of_discharge=[30.0, 80.0, 100.0],
+                   temperature=[15.0, 25.0, 35.0], temperature_amplitude=8.0)
+    blocked = engine.project(2000, block_days=97, **profile)
+    single = engine.project(2000, block_days=2000, **profile)
+    for key in ("health", "calendar_loss", "cycle_loss", "eol_day"):
+        np.testing.assert_allclose(blocked[key], single[key], rtol=1e-10)
+
+
+def test_end_of_life_and_rul():
+    """寿命终止天数与健康状态轨迹一致，剩余寿命随工况恶化而缩短"""
+    engine = AgingEngine(end_of_life_health=90.0)
+    result = engine.project(20 * DAYS_PER_YEAR, daily_charges=1.5, depth_of_discharge=90.0,
+                            temperature=[20.0, 30.0, 40.0], record_interval=1)
+    eol_day = result["eol_day"]
+    assert not np.isnan(eol_day).any()
+    assert eol_day[0] > eol_day[1] > eol_day[2], "温度越高寿命越短"
+    for i, day in enumerate(eol_day.astype(int)):
+        assert result["health"][i, day - 1] < 90.0 <= result["health"][i, day - 2]
+        assert result["rul_days"][i, day - 1] == 0
+    np.testing.assert_allclose(result["eol_cycles"], 1.5 * 0.9 * eol_day)
+
+    shallow = engine.remaining_useful_life(daily_charges=1.0, depth_of_discharge=40.0)
+    deep = engine.remaining_useful_life(daily_charges=0.5, depth_of_discharge=80.0)
+    assert shallow["rul_cycles"][0] > deep["rul_cycles"][0], "相同等效循环数下浅循环寿命更长"
+    assert np.isnan(engine.remaining_useful_life(max_years=1)["rul_days"][0])
+
+
+def test_unknown_parameter_rejected():
+    try:
+        AgingEngine(cycle_factor=0.1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("未知的老化参数应被拒绝")
+
+
+if __name__ == "__main__":
+    test_constant_profile_matches_closed_form()
+    test_blocks_match_single_pass()
+    test_end_of_life_and_rul()
+    test_unknown_parameter_rejected()
+    print("✅ 老化引擎测试全部通过")
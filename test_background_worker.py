@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+后台计算线程测试
+验证 LatestResultWorker 的有界队列丢弃最旧作业、调用方不阻塞地读取最近一次完成的结果，
+以及 EventLoopLagMonitor 能测出事件循环被同步代码占用的延迟
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.background_worker import LatestResultWorker, EventLoopLagMonitor
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "等待超时"
+        time.sleep(0.005)
+
+
+def test_latest_result_without_blocking():
+    """计算跟不上时丢弃最旧的待处理作业，只计算最新输入，提交和读取都不阻塞"""
+    release = threading.Event()
+    computed = []
+
+    def compute(job):
+        release.wait()
+        computed.append(job)
+        return job * 10
+
+    worker = LatestResultWorker(compute, max_pending=1, name="test-worker")
+    assert worker.latest() == (None, 0)
+    assert worker.submit(1)
+    wait_for(lambda: worker._queue.empty())  # 作业1正在计算
+    start = time.perf_counter()
+    assert worker.submit(2)
+    assert not worker.submit(3), "队列已满时丢弃作业2"
+    assert worker.latest() == (None, 0)
+    assert time.perf_counter() - start < 0.05
+
+    release.set()
+    wait_for(lambda: worker.sequence == 2)
+    assert computed == [1, 3]
+    assert worker.latest() == (30, 2)
+    metrics = worker.metrics()
+    assert metrics["submitted"] == 3 and metrics["dropped"] == 1 and metrics["completed"] == 2
+    worker.stop(timeout=1.0)
+    assert not worker.running
+
+
+def test_failure_keeps_previous_result():
+    """作业失败时保留上一次的结果"""
+    def compute(job):
+        if job < 0:
+            raise ValueError("invalid")
+        return job
+
+    worker = LatestResultWorker(compute)
+    worker.submit(5)
+    wait_for(lambda: worker.sequence == 1)
+    worker.submit(-1)
+    wait_for(lambda: worker.failed == 1)
+    assert worker.latest() == (5, 1)
+    worker.stop(timeout=1.0)
+
+
+def test_event_loop_lag_monitor():
+    """同步阻塞事件循环的时间被记录为延迟，交给工作线程则不产生延迟"""
+    async def run(block):
+        monitor = EventLoopLagMonitor(interval=0.01)
+        await monitor.start()
+        await asyncio.sleep(0.05)
+        block()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor.metrics()
+
+    blocked = asyncio.run(run(lambda: time.sleep(0.2)))
+    assert blocked["max_ms"] >= 150
+    assert blocked["histogram_ms"]["count"] == blocked["samples"] > 0
+
+    worker = LatestResultWorker(lambda job: time.sleep(job))
+    offloaded = asyncio.run(run(lambda: worker.submit(0.2)))
+    worker.stop(timeout=1.0)
+    assert offloaded["max_ms"] < 100
+
+
+if __name__ == "__main__":
+    test_latest_result_without_blocking()
+    test_failure_keeps_previous_result()
+    test_event_loop_lag_monitor()
+    print("✅ 后台计算线程测试全部通过")
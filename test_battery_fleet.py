@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+批量电池仿真引擎测试
+验证 BatteryFleet 的数组化状态更新与单体 BatteryModel 的结果一致
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.battery_model import BatteryModel
+from models.battery_fleet import BatteryFleet, CHARGING_MODES
+
+TOLERANCE = 1e-6
+
+
+def _reference_model(soc, temperature):
+    """创建不写数据库的参考模型"""
+    model = BatteryModel()
+    model.soc = soc
+    model.temperature = temperature
+    return model
+
+
+def _assert_matches(model, fleet, index, step):
+    state = fleet.get_state(index)
+    for key in ("soc", "voltage", "current", "temperature", "polarization_voltage", "internal_resistance"):
+        expected = getattr(model, key)
+        assert abs(state[key] - expected) <= TOLERANCE, f"第{step}步 {key}: {state[key]} != {expected}"
+    assert state["charging_mode"] == model.charging_mode, f"第{step}步 充电模式不一致"
+    assert state["is_charging"] == model.is_charging
+
+
+def test_fleet_matches_battery_model_full_charge():
+    """完整的 CC→CV→涓流 充电过程与 BatteryModel 一致"""
+    initial_socs = [20.0, 55.0, 92.0]
+    fleet = BatteryFleet(len(initial_socs), soc=initial_socs, temperature=25.0)
+    fleet.start_charging()
+
+    models = [_reference_model(soc, 25.0) for soc in initial_socs]
+    for model in models:
+        model.is_charging = True
+        model._switch_charging_mode("cc")
+
+    for step in range(20000):
+        fleet.step(1.0)
+        for i, model in enumerate(models):
+            model.update(elapsed_time=1.0)
+            _assert_matches(model, fleet, i, step)
+        if not fleet.is_charging.any():
+            break
+
+    assert not fleet.is_charging.any(), "所有电池包都应完成充电"
+    # 先充满的电池包随后进入待机自放电，因此SOC略低于99.99%
+    assert all(soc >= 99.9 for soc in fleet.soc)
+
+
+def test_fleet_discharge_and_idle():
+    """放电到5%自动停止，以及待机自放电"""
+    fleet = BatteryFleet(2, soc=[12.0, 50.0])
+    fleet.start_discharging([0])
+    models = [_reference_model(12.0, 25.0), _reference_model(50.0, 25.0)]
+    models[0].start_discharging()
+
+    for step in range(600):
+        fleet.step(2.0)
+        for i, model in enumerate(models):
+            model.update(elapsed_time=2.0)
+            _assert_matches(model, fleet, i, step)
+
+    assert not fleet.is_discharging[0]
+    assert CHARGING_MODES[fleet.charging_mode[1]] == "none"
+
+
+def test_fleet_per_pack_parameters():
+    """逐包参数 (如充电电流) 可以取不同值"""
+    fleet = BatteryFleet(2, soc=30.0, max_charging_current=[40.0, 80.0])
+    fleet.start_charging()
+    for _ in range(600):
+        fleet.step(1.0)
+    assert fleet.soc[1] > fleet.soc[0]
+
+
+if __name__ == "__main__":
+    test_fleet_matches_battery_model_full_charge()
+    test_fleet_discharge_and_idle()
+    test_fleet_per_pack_parameters()
+    print("✅ BatteryFleet 测试全部通过")
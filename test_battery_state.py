@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+电池状态快照测试
+验证 BatteryState 与原 get_state() 字典的字段一致，以及每周期只生成一个共享快照 (包括 RUL 优化充电)
+"""
+
+import sys
+import os
+import json
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from config import SIMULATOR_CONFIG
+from models.battery_model import BatteryModel
+from models.battery_state import BatteryState
+from models.sim_clock import SimulatedClock
+
+
+def test_snapshot_matches_state_dict():
+    """快照的字典形式包含原 get_state() 的全部字段，并支持按键读取"""
+    clock = SimulatedClock()
+    model = BatteryModel(clock=clock, persist_records=False)
+    model.soc = 40.0
+    model.is_charging = True
+    model._switch_charging_mode("cc")
+    original_factor = SIMULATOR_CONFIG["time_acceleration_factor"]
+    SIMULATOR_CONFIG["time_acceleration_factor"] = 2.0
+    try:
+        for _ in range(3):
+            clock.advance(1.0)
+            state = model.update()
+    finally:
+        SIMULATOR_CONFIG["time_acceleration_factor"] = original_factor
+
+    assert isinstance(state, BatteryState)
+    assert state is model.state, "update() 返回的快照应与模型保存的快照为同一对象"
+    data = state.to_dict()
+    assert len(data) == 27
+    assert list(data) == state.keys()
+    for key, value in data.items():
+        assert state[key] == value
+    assert state.get("missing", 1) == 1 and "soc" in state
+    assert data["display_current"] == data["current"] * 2.0
+    assert data["charging_current"] == data["current"]
+    assert json.loads(state.to_json())["charging_mode"] == "cc"
+
+
+def test_snapshot_is_isolated_from_model():
+    """快照生成后不受模型后续更新影响；to_dict() 返回可修改的新字典"""
+    model = BatteryModel(clock=SimulatedClock(), persist_records=False)
+    state = model.snapshot()
+    model.soc = 10.0
+    assert state.soc != 10.0
+    data = state.to_dict()
+    data["health_info"] = {}
+    assert "health_info" not in state.to_dict()
+
+
+def test_one_snapshot_per_tick_with_rul_charging():
+    """RUL 优化充电时控制器读取上一周期的快照，每个周期仍只生成一个快照"""
+    clock = SimulatedClock()
+    model = BatteryModel(clock=clock, persist_records=False)
+    model.rul_optimized_charging = True
+    model.soc = 40.0
+    model.is_charging = True
+    model._switch_charging_mode("cc")
+    model.update_charging_params({"cc_current": 0.5})
+    assert model.state.max_charging_current == 0.5 * model.capacity
+
+    snapshot = model.snapshot
+    calls = []
+    model.snapshot = lambda: calls.append(1) or snapshot()
+    ticks = 5
+    for _ in range(ticks):
+        clock.advance(1.0)
+        model.update()
+    assert len(calls) == ticks
+
+
+if __name__ == "__main__":
+    test_snapshot_matches_state_dict()
+    test_snapshot_is_isolated_from_model()
+    test_one_snapshot_per_tick_with_rul_charging()
+    print("✅ 电池状态快照测试全部通过")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+充电阶段表测试
+验证 charging_phases JSON 列迁移到规范化的 charging_phases 表 (只迁移一次)，写入/更新/删除充电记录时
+阶段行和各阶段汇总同步更新，以及阶段统计读取汇总表，结果与按阶段分组重新汇总和逐条解析 JSON 一致
+"""
+
+import sys
+import os
+import json
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models import database
+from models.db_writer import DatabaseWriter
+from database_test_support import TemporaryDatabase, new_record
+
+
+def phases_for(i):
+    phases = [{"phase": "cc", "start_time": "2024-01-01T08:00:00", "end_time": f"2024-01-01T08:{10 + i % 40:02d}:00"},
+              {"phase": "cv", "start_time": f"2024-01-01T08:{10 + i % 40:02d}:00", "end_time": "2024-01-01T09:00:00"}]
+    if i % 3 == 0:
+        phases.append({"phase": "trickle", "start_time": "2024-01-01T09:00:00", "end_time": None})  # 未结束
+    return phases
+
+
+def json_statistics():
+    """原实现: 逐条解析 JSON 统计各阶段时长"""
+    stats = {phase: {"count": 0, "total_duration": 0} for phase in ("cc", "cv", "trickle")}
+    for record in database.get_all_charging_records():
+        for phase in record["charging_phases"]:
+            if phase.get("phase") in stats and phase.get("start_time") and phase.get("end_time"):
+                duration = (datetime.fromisoformat(phase["end_time"]) -
+                            datetime.fromisoformat(phase["start_time"])).total_seconds()
+                stats[phase["phase"]]["count"] += 1
+                stats[phase["phase"]]["total_duration"] += duration
+    return stats
+
+
+def insert_legacy_records(count):
+    """按迁移前的方式直接写入带 JSON 阶段列的记录 (不写 charging_phases 表)"""
+    conn = database.get_db_connection(write=True)
+    conn.executemany(
+        "INSERT INTO charging_records (start_time, end_time, initial_soc, initial_temperature, "
+        "initial_internal_resistance, initial_polarization_resistance, charging_phases) "
+        "VALUES ('2024-01-01T08:00:00', '2024-01-01T09:00:00', 20, 25, 0.1, 0.05, ?)",
+        [(json.dumps(phases_for(i)),) for i in range(count)] + [("not json",), ("[]",)])
+    conn.commit()
+    conn.close()
+
+
+def test_migration_from_json():
+    """已有数据库的 JSON 阶段迁移到 charging_phases 表，再次初始化不重复迁移"""
+    with TemporaryDatabase():
+        conn = database.get_db_connection(write=True)
+        conn.execute("DROP TABLE charging_phases")
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+        conn.close()
+        insert_legacy_records(300)
+
+        database.init_db()
+        conn = database.get_db_connection()
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_VERSION
+        assert conn.execute("SELECT COUNT(*) FROM charging_phases").fetchone()[0] == 300 * 2 + 100
+        row = conn.execute("SELECT * FROM charging_phases WHERE record_id = 1 AND seq = 0").fetchone()
+        conn.close()
+        assert row["phase"] == "cc" and row["duration"] == 600.0
+        assert row["start_ts"] == datetime.fromisoformat("2024-01-01T08:00:00").timestamp()
+
+        conn = database.get_db_connection(write=True)
+        try:
+            assert database.migrate_charging_phases(conn) == 0
+        finally:
+            conn.close()
+
+        assert_totals_consistent()
+        stats = database.get_charging_phases_statistics()
+        reference = json_statistics()
+        for phase in ("cc", "cv", "trickle"):
+            assert stats[phase]["count"] == reference[phase]["count"]
+            assert abs(stats[phase]["total_duration"] - reference[phase]["total_duration"]) < 1e-6
+        assert stats["trickle"] == {"count": 0, "total_duration": 0, "avg_duration": 0}
+        assert stats["cc"]["avg_duration"] == stats["cc"]["total_duration"] / 300
+
+
+def test_statistics_query_plan():
+    """重新汇总只扫描 (phase, duration) 覆盖索引"""
+    with TemporaryDatabase():
+        conn = database.get_db_connection()
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN " + database.CHARGING_PHASE_TOTALS_GROUP_BY_SQL))
+        conn.close()
+        assert "COVERING INDEX idx_charging_phases_phase_duration" in plan
+
+
+def assert_totals_consistent():
+    """触发器维护的汇总与按阶段分组重新汇总的结果一致"""
+    conn = database.get_db_connection()
+    try:
+        totals = {row["phase"]: (row["count"], row["total_duration"]) for row in conn.execute(
+            "SELECT phase, count, total_duration FROM charging_phase_totals WHERE count > 0")}
+        reference = {row["phase"]: (row["count"], row["total_duration"]) for row in conn.execute(
+            database.CHARGING_PHASE_TOTALS_GROUP_BY_SQL)}
+    finally:
+        conn.close()
+    assert totals.keys() == reference.keys()
+    for phase, (count, total) in reference.items():
+        assert totals[phase][0] == count and abs(totals[phase][1] - total) < 1e-6
+
+
+def test_phase_rows_follow_writes():
+    """同步写入和后台写入的插入/更新都同步阶段行，删除记录时删除阶段行"""
+    with TemporaryDatabase():
+        record = new_record(charging_phases=phases_for(1)[:1])
+        first = database.add_charging_record(record)
+        writer = DatabaseWriter(flush_interval=0.0)
+        second = writer.insert_charging_record(record)
+        writer.update_charging_record(second, {"start_time": "2024-01-01T08:00:00",
+                                               "end_time": "2024-01-01T09:00:00", "charging_phases": phases_for(3)})
+        database.update_charging_record(first, {"end_time": "2024-01-01T09:00:00", "charging_phases": phases_for(1)})
+        assert writer.stop(5.0)
+
+        stats = database.get_charging_phases_statistics()
+        assert stats["cc"]["count"] == 2 and stats["cv"]["count"] == 2
+        assert stats["cc"]["total_duration"] == 11 * 60 + 13 * 60
+
+        assert_totals_consistent()
+
+        assert database.delete_charging_record(first)
+        assert database.get_charging_phases_statistics()["cc"]["count"] == 1
+        assert_totals_consistent()
+        assert database.delete_all_charging_records()
+        assert database.get_charging_phases_statistics() == {
+            phase: {"count": 0, "total_duration": 0, "avg_duration": 0} for phase in ("cc", "cv", "trickle")}
+
+
+if __name__ == "__main__":
+    test_migration_from_json()
+    test_statistics_query_plan()
+    test_phase_rows_follow_writes()
+    print("✅ 充电阶段表测试全部通过")
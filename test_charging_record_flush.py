@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+充电记录增量更新测试
+验证充电过程中的记录保存在内存中，只在阶段切换、停止充电和定时刷新时按主键写入数据库，
+每个周期执行的 SQL 与数据库中已有记录数无关 (10 万条记录)，以及写入的充电阶段完整
+(写入经过后台写入线程，读取前先等待写入完成)
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from config import SIMULATOR_CONFIG
+from models import database
+from models.battery_model import BatteryModel
+from models.db_writer import get_db_writer
+from models.sim_clock import SimulatedClock
+
+STORED_RECORDS = 100_000
+
+
+class StatementLog:
+    """记录测试期间执行的全部 SQL 语句"""
+
+    def __init__(self):
+        self.statements = []
+        self._connect = database.get_db_connection
+
+    def __call__(self, write=False):
+        conn = self._connect(write)
+        conn.set_trace_callback(self.statements.append)
+        return conn
+
+
+def fill_records(count):
+    conn = database.get_db_connection(write=True)
+    conn.executemany(
+        "INSERT INTO charging_records (start_time, end_time, initial_soc, final_soc, initial_temperature, "
+        "final_temperature, initial_internal_resistance, initial_polarization_resistance, duration_seconds, "
+        "charging_phases) VALUES ('2024-01-01T00:00:00', '2024-01-01T01:00:00', 20, 80, 25, 30, 0.1, 0.05, "
+        "3600, ?)", ((json.dumps([{"phase": "cc", "start_time": "2024-01-01T00:00:00"}]),) for _ in range(count)))
+    conn.commit()
+    conn.close()
+
+
+def run_charging(ticks, dt=1.0):
+    clock = SimulatedClock(1_700_000_000.0)
+    model = BatteryModel(clock=clock)
+    model.reset()
+    model.soc = 79.0
+    record_id = model.start_charging()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        clock.advance(dt)
+        model.update()
+        if not model.is_charging:
+            break
+    elapsed = time.perf_counter() - start
+    model.stop_charging()
+    return model, record_id, elapsed
+
+
+def test_incremental_flush():
+    """每个周期不读取整张表，按主键定时刷新；停止充电后数据库中的记录包含全部阶段"""
+    original_path, original_connect = database.DB_PATH, database.get_db_connection
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "battery_data.db")
+        try:
+            database.init_db()
+            fill_records(STORED_RECORDS)
+            log = StatementLog()
+            database.get_db_connection = log
+            ticks = 600
+            model, record_id, elapsed = run_charging(ticks)
+            get_db_writer().flush()
+            database.get_db_connection = original_connect
+
+            assert record_id == STORED_RECORDS + 1
+            # 只有插入和按主键更新 (以及第一次分配记录ID时读取最大ID)，没有读取整张表的查询
+            selects = [sql for sql in log.statements if sql.lstrip().upper().startswith("SELECT")]
+            assert len(selects) <= 1 and all("MAX(id)" in sql for sql in selects)
+            updates = [sql for sql in log.statements if sql.lstrip().upper().startswith("UPDATE")]
+            assert all("WHERE id = ?" in " ".join(sql.split()) or f"WHERE id = {record_id}" in sql
+                       for sql in updates)
+            interval = SIMULATOR_CONFIG["charging_record_flush_interval"]
+            phases = model.current_charging_record["charging_phases"]
+            assert len(updates) <= ticks / interval + len(phases) + 2
+            print(f"{STORED_RECORDS} 条已有记录，{ticks} 个周期写入 {len(updates)} 次，"
+                  f"平均每周期 {elapsed / ticks * 1e3:.3f} ms")
+
+            stored = database.get_charging_record_by_id(record_id)
+            assert [phase["phase"] for phase in stored["charging_phases"]] == [phase["phase"] for phase in phases]
+            assert stored["final_soc"] == model.current_charging_record["final_soc"]
+            assert stored["duration_seconds"] > 0
+        finally:
+            database.DB_PATH, database.get_db_connection = original_path, original_connect
+
+
+if __name__ == "__main__":
+    test_incremental_flush()
+    print("✅ 充电记录增量更新测试全部通过")
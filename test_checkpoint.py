@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+仿真检查点测试
+验证 BatteryModel / BatteryFleet / SeriesPackModel 保存恢复后继续仿真的结果与不中断仿真完全一致，
+以及内存分叉的状态相互独立
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.battery_model import BatteryModel
+from models.battery_fleet import BatteryFleet
+from models.checkpoint import SimulationCheckpoint
+from models.lookup_tables import build_ocv_table
+from models.series_pack import SeriesPackModel
+from models.sim_clock import SimulatedClock
+
+
+def new_charging_model(cell_pack=None):
+    clock = SimulatedClock(1000.0)
+    model = BatteryModel(clock=clock, persist_records=False, cell_pack=cell_pack)
+    model.reset()
+    model.cycle_count = 12.5
+    model.start_charging()
+    return clock, model
+
+
+def run(clock, model, steps):
+    for _ in range(steps):
+        clock.advance(10.0)
+        state = model.update()
+    return state
+
+
+def test_model_save_load_resumes_exactly():
+    """保存到文件并恢复到新模型后继续仿真，与不中断的仿真逐位一致"""
+    clock, model = new_charging_model(SeriesPackModel(series=10, parallel=2, soc_spread=1.0, seed=3))
+    run(clock, model, 400)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.npz")
+        model.save_checkpoint(path)
+        restored_clock = SimulatedClock()
+        restored = BatteryModel(clock=restored_clock, persist_records=False, cell_pack=SeriesPackModel(series=10, parallel=2))
+        restored.load_checkpoint(path)
+
+    assert restored_clock() == clock()
+    assert restored.charging_mode == model.charging_mode and restored.is_charging
+    assert restored.cycle_count == 12.5
+    assert restored.current_charging_record == model.current_charging_record
+    assert restored.current_charging_phase is restored.current_charging_record["charging_phases"][-1]
+    np.testing.assert_array_equal(restored.battery_history.window(), model.battery_history.window())
+
+    expected = run(clock, model, 300)
+    actual = run(restored_clock, restored, 300)
+    assert actual.to_dict() == expected.to_dict()
+    np.testing.assert_array_equal(restored.cell_pack.cell_voltages, model.cell_pack.cell_voltages)
+
+
+def test_model_fork_is_independent():
+    """分叉后的模型可以取不同参数独立继续，原模型不受影响"""
+    clock, model = new_charging_model()
+    run(clock, model, 200)
+    reference = model.checkpoint()
+
+    fork = model.fork()
+    assert fork.clock is not model.clock and fork.clock() == clock()
+    fork.update_charging_params({"cc_current": 0.5})
+    run(fork.clock, fork, 200)
+    assert fork.current_charging_record["charging_phases"] is not model.current_charging_record["charging_phases"]
+
+    # 原模型的状态未被分叉修改
+    assert model.checkpoint().arrays["state"].tolist() == reference.arrays["state"].tolist()
+    baseline = run(clock, model, 200)
+    assert fork.soc < baseline.soc
+
+
+def test_fleet_checkpoint_and_fork():
+    """电池包阵列的检查点 (含OCV表) 和分叉"""
+    fleet = BatteryFleet(64, soc=np.linspace(10, 80, 64), ocv_table=build_ocv_table(290.0, 375.0, 392.0, 400.0),
+                         max_charging_current=60.0)
+    fleet.start_charging()
+    for _ in range(100):
+        fleet.step(5.0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fleet.npz")
+        fleet.checkpoint().save(path)
+        restored = BatteryFleet.from_checkpoint(SimulationCheckpoint.load(path))
+    fork = fleet.fork()
+
+    for other in (restored, fork):
+        for _ in range(100):
+            other.step(5.0)
+    for _ in range(100):
+        fleet.step(5.0)
+    for other in (restored, fork):
+        np.testing.assert_array_equal(other.soc, fleet.soc)
+        np.testing.assert_array_equal(other.charging_mode, fleet.charging_mode)
+        np.testing.assert_array_equal(other.voltage, fleet.voltage)
+
+    fork.stop_charging()
+    assert fleet.is_charging.any()
+
+
+def test_checkpoint_type_mismatch():
+    """恢复类型不匹配的检查点时抛出 ValueError"""
+    fleet_checkpoint = BatteryFleet(4).checkpoint()
+    model = BatteryModel(clock=SimulatedClock(), persist_records=False)
+    try:
+        model.restore(fleet_checkpoint)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("类型不匹配的检查点应被拒绝")
+
+
+if __name__ == "__main__":
+    test_model_save_load_resumes_exactly()
+    test_model_fork_is_independent()
+    test_fleet_checkpoint_and_fork()
+    test_checkpoint_type_mismatch()
+    print("✅ 仿真检查点测试全部通过")
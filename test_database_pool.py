@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+数据库连接池测试
+验证 SQLite 参数 (WAL、synchronous、mmap、cache)，每个线程复用读连接，写操作串行使用同一个写连接，
+未提交的写入在交还连接时回滚，以及关闭连接池后按需重建
+"""
+
+import sys
+import os
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from config import DATABASE_CONFIG
+from models import database
+from database_test_support import TemporaryDatabase, new_record
+
+
+def test_pragmas():
+    """连接按 DATABASE_CONFIG 设置 WAL、synchronous、mmap 和页缓存"""
+    with TemporaryDatabase():
+        conn = database.get_db_connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA mmap_size").fetchone()[0] == DATABASE_CONFIG["mmap_size"]
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == DATABASE_CONFIG["cache_size"]
+        conn.close()
+
+
+def test_reader_per_thread():
+    """同一线程复用读连接，不同线程使用各自的读连接，写连接全局唯一"""
+    with TemporaryDatabase():
+        first = database.get_db_connection()
+        first.close()
+        assert database.get_db_connection() is first
+        others = []
+        thread = threading.Thread(target=lambda: others.append(database.get_db_connection()))
+        thread.start()
+        thread.join()
+        assert others[0] is not first
+        writer = database.get_db_connection(write=True)
+        writer.close()
+        other_writers = []
+
+        def write():
+            conn = database.get_db_connection(write=True)
+            other_writers.append(conn)
+            conn.close()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join()
+        assert other_writers[0] is writer
+
+
+def test_concurrent_writes_are_serialized():
+    """多个线程同时写入，全部成功且读连接立即可见"""
+    with TemporaryDatabase():
+        ids = []
+
+        def insert():
+            for i in range(25):
+                ids.append(database.add_charging_record(new_record(i)))
+
+        threads = [threading.Thread(target=insert) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert None not in ids and len(set(ids)) == 200
+        assert database.get_charging_statistics()["total_count"] == 200
+        assert database.get_charging_record_by_id(ids[-1])["initial_soc"] == 24.0
+
+
+def test_uncommitted_write_rolled_back():
+    """未提交的写入在交还写连接时回滚，写锁释放后其他线程可以写入"""
+    with TemporaryDatabase():
+        conn = database.get_db_connection(write=True)
+        conn.execute("INSERT INTO charging_records (start_time, initial_soc, initial_temperature, "
+                     "initial_internal_resistance, initial_polarization_resistance) "
+                     "VALUES ('2024-01-01T00:00:00', 1, 25, 0.1, 0.05)")
+        conn.close()
+        assert database.get_charging_statistics()["total_count"] == 0
+        result = []
+        thread = threading.Thread(target=lambda: result.append(database.add_charging_record(new_record())))
+        thread.start()
+        thread.join(5.0)
+        assert result == [1]
+
+
+def test_unpooled_mode():
+    """关闭连接池时每次返回新连接，close() 真正关闭连接"""
+    with TemporaryDatabase():
+        DATABASE_CONFIG["pool_connections"] = False
+        try:
+            first = database.get_db_connection()
+            first.close()
+            assert database.get_db_connection() is not first
+            assert database.add_charging_record(new_record()) == 1
+        finally:
+            DATABASE_CONFIG["pool_connections"] = True
+
+
+if __name__ == "__main__":
+    test_pragmas()
+    test_reader_per_thread()
+    test_concurrent_writes_are_serialized()
+    test_uncommitted_write_rolled_back()
+    test_unpooled_mode()
+    print("✅ 数据库连接池测试全部通过")
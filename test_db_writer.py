@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+后台数据库写入线程测试
+验证同一记录的更新合并、按 flush_size 批量提交、队列已满时的背压、停止时写完队列，
+停止后的写入在调用线程同步执行，整批失败时逐项重试，以及读取和删除记录前先写完排队中的写入
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models import database
+from models.db_writer import DatabaseWriter
+from database_test_support import TemporaryDatabase, new_record
+
+
+def test_coalesce_updates():
+    """写入线程忙碌期间同一记录的多次更新合并为一次，写入最后的值"""
+    with TemporaryDatabase():
+        writer = DatabaseWriter(flush_interval=0.0)
+        # 持有写连接，写入线程提交第一批 (插入) 时阻塞
+        blocker = database.get_db_connection(write=True)
+        record_id = writer.insert_charging_record(new_record())
+        phases = []
+        for tick in range(100):
+            phases.append({"phase": "cc", "tick": tick})
+            writer.update_charging_record(record_id, {
+                "start_time": "2024-01-01T00:00:00", "end_time": f"2024-01-01T00:{tick // 60:02d}:{tick % 60:02d}",
+                "final_soc": 20.0 + tick * 0.1, "final_temperature": 25.0, "charging_phases": phases})
+        blocker.close()
+        assert writer.flush(5.0)
+
+        assert writer.coalesced == 99
+        stored = database.get_charging_record_by_id(record_id)
+        assert abs(stored["final_soc"] - 29.9) < 1e-9
+        assert stored["duration_seconds"] == 99
+        assert len(stored["charging_phases"]) == 100
+        assert writer.metrics()["pending_updates"] == 0
+        assert writer.stop(5.0)
+
+
+def test_batches_and_update_without_start_time():
+    """插入按 flush_size 分批提交；不含开始时间的更新使用数据库中记录的开始时间计算时长"""
+    with TemporaryDatabase():
+        writer = DatabaseWriter(flush_size=50, flush_interval=0.2)
+        blocker = database.get_db_connection(write=True)
+        ids = [writer.insert_charging_record(new_record(soc)) for soc in range(200)]
+        writer.update_charging_record(ids[-1], {"end_time": "2024-01-01T00:10:00", "final_soc": 80.0})
+        blocker.close()
+        assert writer.flush(5.0)
+
+        assert ids == list(range(1, 201))
+        assert writer.rows_written == 201
+        assert writer.batches <= 6
+        records = database.get_all_charging_records()
+        assert sorted(record["id"] for record in records) == ids
+        assert database.get_charging_record_by_id(ids[-1])["duration_seconds"] == 600
+        assert writer.stop(5.0)
+
+
+def test_backpressure():
+    """队列已满时提交方阻塞，写入线程腾出空间后继续，不丢弃写入"""
+    with TemporaryDatabase():
+        writer = DatabaseWriter(max_queue=4, flush_size=2, flush_interval=0.0)
+        blocker = database.get_db_connection(write=True)
+        submitter = threading.Thread(target=lambda: [writer.insert_charging_record(new_record()) for _ in range(20)])
+        submitter.start()
+        time.sleep(0.3)
+        assert submitter.is_alive()
+        assert writer.metrics()["queue_depth"] == 4
+        blocker.close()
+        submitter.join(5.0)
+        assert not submitter.is_alive()
+        assert writer.flush(5.0)
+
+        assert writer.blocked_puts >= 1
+        assert len(database.get_all_charging_records()) == 20
+        assert writer.stop(5.0)
+
+
+def test_stop_drains_queue():
+    """stop() 写完队列中的全部写入；停止后的写入在调用线程同步执行"""
+    with TemporaryDatabase():
+        writer = DatabaseWriter(flush_interval=10.0)
+        ids = [writer.insert_charging_record(new_record()) for _ in range(10)]
+        start = time.perf_counter()
+        assert writer.stop(5.0)
+        assert time.perf_counter() - start < 5.0
+        assert not writer.running
+        assert len(database.get_all_charging_records()) == 10
+
+        writer.update_charging_record(ids[0], {"start_time": "2024-01-01T00:00:00",
+                                               "end_time": "2024-01-01T00:00:30", "final_soc": 50.0})
+        assert database.get_charging_record_by_id(ids[0])["final_soc"] == 50.0
+        assert writer.insert_charging_record(new_record()) == 11
+        assert database.get_charging_record_by_id(11) is not None
+
+
+def test_record_ids_shared_with_sync_inserts():
+    """同步插入和后台插入使用同一个ID分配，不会冲突"""
+    with TemporaryDatabase():
+        writer = DatabaseWriter(flush_interval=0.0)
+        first = writer.insert_charging_record(new_record())
+        second = database.add_charging_record(new_record())
+        third = writer.insert_charging_record(new_record())
+        assert writer.stop(5.0)
+        assert [first, second, third] == [1, 2, 3]
+        assert len(database.get_all_charging_records()) == 3
+
+
+def test_failed_batch_retried_per_item():
+    """一项写入失败时整批逐项重试，同一批次中其他记录的插入和更新仍然写入"""
+    with TemporaryDatabase():
+        writer = DatabaseWriter(flush_interval=0.2)
+        blocker = database.get_db_connection(write=True)
+        first = writer.insert_charging_record(new_record())
+        writer.insert_rows(database.INSERT_TELEMETRY_SQL, [(first, 0.0, 20.0)])  # 参数个数错误
+        second = writer.insert_charging_record(new_record())
+        writer.update_charging_record(first, {"end_time": "2024-01-01T00:01:00", "final_soc": 60.0})
+        blocker.close()
+        assert writer.flush(5.0)
+
+        assert writer.failed == 1
+        assert writer.retried_batches == 1
+        assert database.get_charging_record_by_id(first)["final_soc"] == 60.0
+        assert database.get_charging_record_by_id(second) is not None
+        assert writer.stop(5.0)
+
+
+def test_delete_waits_for_queued_writes():
+    """删除前先写完排队中的插入和更新，删除后到达的更新不会留下阶段行"""
+    with TemporaryDatabase():
+        writer = DatabaseWriter(flush_interval=10.0)
+        database.register_pending_writes(writer.flush)
+        try:
+            record_id = writer.insert_charging_record(new_record())
+            phases = [{"phase": "cc", "start_time": "2024-01-01T00:00:00", "end_time": "2024-01-01T00:01:00"}]
+            writer.update_charging_record(record_id, {"end_time": "2024-01-01T00:01:00", "charging_phases": phases})
+            assert database.delete_charging_record(record_id)
+
+            writer.update_charging_record(record_id, {"end_time": "2024-01-01T00:02:00", "charging_phases": phases})
+            assert writer.flush(5.0)
+            assert database.get_charging_record_by_id(record_id) is None
+            assert database.get_charging_phases_statistics()["cc"]["count"] == 0
+            assert writer.failed == 0
+        finally:
+            database._pending_write_flushers.remove(writer.flush)
+            assert writer.stop(5.0)
+
+
+def test_reads_wait_for_queued_writes():
+    """读取函数先写完排队中的写入 (读到自己的写入)；没有待写入项目时 flush 立即返回"""
+    with TemporaryDatabase():
+        writer = DatabaseWriter(flush_interval=10.0)
+        database.register_pending_writes(writer.flush)
+        try:
+            record_id = writer.insert_charging_record(new_record())
+            writer.update_charging_record(record_id, {"end_time": "2024-01-01T00:01:00", "final_soc": 70.0})
+            assert database.get_charging_record_by_id(record_id)["final_soc"] == 70.0
+            assert writer.metrics()["queue_depth"] == 0
+            assert writer.flush(0)  # 没有待写入项目，不等待写入线程
+        finally:
+            database._pending_write_flushers.remove(writer.flush)
+            assert writer.stop(5.0)
+
+
+if __name__ == "__main__":
+    test_coalesce_updates()
+    test_batches_and_update_without_start_time()
+    test_backpressure()
+    test_stop_drains_queue()
+    test_record_ids_shared_with_sync_inserts()
+    test_failed_batch_retried_per_item()
+    test_delete_waits_for_queued_writes()
+    test_reads_wait_for_queued_writes()
+    print("✅ 后台数据库写入线程测试全部通过")
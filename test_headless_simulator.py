@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+离线快进充电仿真测试
+验证注入仿真时钟后充电过程可确定性复现，且不受时间加速因子影响，
+以及不写入数据库的离线仿真在充电结束时同样更新循环次数和健康状态
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+import numpy as np
+
+from config import SIMULATOR_CONFIG
+from models.headless_simulator import HeadlessChargeSimulator, MODE_CODES
+
+
+def test_full_session_is_deterministic():
+    """同一初始状态重复仿真结果完全一致，并依次经过 CC→CV→涓流"""
+    simulator = HeadlessChargeSimulator(dt=1.0)
+    first = simulator.run(initial_soc=20.0, initial_temperature=25.0)
+    second = simulator.run(initial_soc=20.0, initial_temperature=25.0)
+
+    assert first["completed"]
+    assert simulator.model.current_charging_record_id is None, "离线仿真不应写入数据库"
+    for key in ("time", "soc", "voltage", "current", "temperature", "charging_mode"):
+        assert np.array_equal(first[key], second[key]), f"{key} 不可复现"
+
+    modes = first["charging_mode"]
+    first_index = {mode: np.argmax(modes == MODE_CODES[mode]) for mode in ("cc", "cv", "trickle")}
+    assert first_index["cc"] < first_index["cv"] < first_index["trickle"]
+    assert first["soc"][-1] >= 99.99
+
+
+def test_time_acceleration_does_not_distort_session():
+    """仿真时钟驱动时忽略时间加速因子"""
+    simulator = HeadlessChargeSimulator(dt=1.0)
+    baseline = simulator.run(initial_soc=50.0)
+    original_factor = SIMULATOR_CONFIG["time_acceleration_factor"]
+    SIMULATOR_CONFIG["time_acceleration_factor"] = 10.0
+    try:
+        accelerated = simulator.run(initial_soc=50.0)
+    finally:
+        SIMULATOR_CONFIG["time_acceleration_factor"] = original_factor
+    assert np.array_equal(baseline["soc"], accelerated["soc"])
+    assert baseline["charge_time"] == accelerated["charge_time"]
+
+
+def test_session_updates_cycle_count_and_health():
+    """离线仿真与在线模型一样，在充电结束时累计循环次数并更新健康状态"""
+    simulator = HeadlessChargeSimulator(dt=1.0)
+    result = simulator.run(initial_soc=20.0)
+    model = simulator.model
+    assert result["completed"]
+    assert model.current_charging_record_id is None
+    assert abs(model.cycle_count - (result["soc"][-1] - 20.0) / 100) < 1e-9
+    assert model.health < 100.0
+
+    simulator.run(initial_soc=20.0)
+    assert abs(model.cycle_count - 2 * (result["soc"][-1] - 20.0) / 100) < 1e-6
+
+
+if __name__ == "__main__":
+    test_full_session_is_deterministic()
+    test_time_acceleration_does_not_distort_session()
+    test_session_updates_cycle_count_and_health()
+
+    simulator = HeadlessChargeSimulator(dt=1.0)
+    start = time.perf_counter()
+    result = simulator.run(initial_soc=20.0)
+    elapsed = time.perf_counter() - start
+    print(f"20%→100% 充电: 仿真时长 {result['charge_time'] / 3600:.2f} 小时, "
+          f"{len(result['time'])} 个样本, 耗时 {elapsed * 1000:.1f} ms")
+    print("✅ 离线快进仿真测试全部通过")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+历史数据环形缓冲区测试
+验证环绕覆盖、零拷贝窗口视图，以及健康评估对环形缓冲区和字典列表给出相同结果
+"""
+
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.battery_model import BatteryModel
+from models.cnn_lstm_rul_model import CNNLSTM_RULModel
+from models.history_buffer import HistoryRingBuffer, history_column
+from models.sim_clock import SimulatedClock
+
+
+def make_record(i):
+    return {
+        "timestamp": float(i),
+        "soc": 20.0 + i * 0.1,
+        "voltage": 360.0 + np.sin(i),
+        "current": 50.0 if i % 3 else -10.0,
+        "temperature": 25.0 + i * 0.01,
+        "internal_resistance": 0.05 + i * 1e-4,
+    }
+
+
+def test_wraparound_matches_list():
+    """超过容量后只保留最近的记录，顺序与列表切片一致"""
+    buffer = HistoryRingBuffer(50)
+    records = []
+    for i in range(137):
+        record = make_record(i)
+        buffer.append(record)
+        records.append(record)
+        records = records[-50:]
+        assert len(buffer) == len(records)
+        for name in ("timestamp", "voltage", "current"):
+            for n in (None, 1, 20, 50, 80):
+                np.testing.assert_array_equal(buffer.column(name, n), history_column(records, name, n))
+    assert buffer.latest("soc") == records[-1]["soc"]
+    assert buffer.records(2) == records[-2:]
+    buffer.clear()
+    assert len(buffer) == 0 and buffer.column("soc").size == 0
+
+
+def test_window_is_zero_copy():
+    """窗口和单列都是底层存储的视图，不分配新数组"""
+    buffer = HistoryRingBuffer(10)
+    for i in range(25):
+        buffer.append(make_record(i))
+    window = buffer.window(5)
+    assert np.shares_memory(window, buffer._data)
+    assert np.shares_memory(buffer.column("voltage", 5), buffer._data)
+    assert window.shape == (5, len(buffer.fields))
+
+
+def test_model_records_history_into_buffer():
+    """BatteryModel 每周期向环形缓冲区追加一条记录，长度不超过上限"""
+    clock = SimulatedClock()
+    model = BatteryModel(clock=clock, persist_records=False)
+    model.soc = 30.0
+    model.is_charging = True
+    model._switch_charging_mode("cc")
+    for _ in range(model.max_history_length + 20):
+        clock.advance(1.0)
+        state = model.update()
+    history = model.battery_history
+    assert isinstance(history, HistoryRingBuffer)
+    assert len(history) == model.max_history_length
+    assert history.latest("soc") == state.soc
+    assert history.latest("timestamp") == clock()
+    assert np.all(np.diff(history.column("timestamp")) == 1.0)
+
+
+def test_health_evaluation_accepts_buffer():
+    """健康评估对环形缓冲区和等价的字典列表给出相同结果"""
+    records = [make_record(i) for i in range(40)]
+    buffer = HistoryRingBuffer(30)
+    for record in records:
+        buffer.append(record)
+
+    model = CNNLSTM_RULModel.__new__(CNNLSTM_RULModel)
+    static_features = np.array([100, 95.0, 25.0])
+    from_list = model.evaluate_battery_health(records[-30:], static_features, 90.0)
+    from_buffer = model.evaluate_battery_health(buffer, static_features, 90.0)
+    for key in ("voltage_stability", "internal_resistance", "internal_resistance_trend", "temperature_stability",
+                "max_temperature", "avg_temperature", "charge_efficiency", "score"):
+        assert np.isclose(from_list[key], from_buffer[key], rtol=1e-12), key
+    assert from_buffer["charge_efficiency"] > 0
+
+
+if __name__ == "__main__":
+    test_wraparound_matches_list()
+    test_window_is_zero_copy()
+    test_model_records_history_into_buffer()
+    test_health_evaluation_accepts_buffer()
+    print("✅ 历史数据环形缓冲区测试全部通过")
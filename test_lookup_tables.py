@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+查找表测试
+验证默认表与原分段线性模型一致，以及CSV加载的二维表标量/批量查询一致
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+import numpy as np
+
+from config import BATTERY_CONFIG
+from models.lookup_tables import LookupTable2D, build_ocv_table, load_battery_tables
+
+
+def test_default_tables_match_formulas():
+    """默认 OCV 表和 R0 温度表与原公式一致 (含超出范围的钳位)"""
+    table = build_ocv_table(290.0, 375.0, 395.0, 400.0)
+    expected = {-5.0: 290.0, 0.0: 290.0, 5.0: 332.5, 10.0: 375.0, 50.0: 385.0, 90.0: 395.0, 95.0: 397.5,
+                100.0: 400.0, 120.0: 400.0}
+    for soc, voltage in expected.items():
+        assert abs(table.lookup(soc) - voltage) < 1e-9
+    assert np.allclose(table.interp(np.array(list(expected))), list(expected.values()))
+
+    r0_table = load_battery_tables()["internal_resistance"]
+    k = BATTERY_CONFIG["temperature_coefficient"]
+    for temperature in (0.0, 25.0, 47.5):
+        expected_r0 = BATTERY_CONFIG["default_internal_resistance"] * (1 + k * (temperature - 25))
+        assert abs(r0_table.lookup(60.0, temperature) - expected_r0) < 1e-12
+    # 单段表的快速路径同样在坐标轴范围外钳位
+    assert r0_table.lookup(60.0, -50.0) == r0_table.lookup(60.0, -40.0) == r0_table.values[0, 0]
+    assert r0_table.lookup(60.0, 130.0) == r0_table.values[0, -1]
+
+
+def test_battery_model_uses_resistance_tables():
+    """BatteryModel 的 R0/R1 与 BatteryFleet 的批量查询使用同一组表，结果一致"""
+    from models.battery_model import BatteryModel
+    from models.battery_fleet import BatteryFleet
+    model = BatteryModel(persist_records=False)
+    model.temperature = 37.5
+    model._update_temperature(0.0)
+    fleet = BatteryFleet(1)
+    assert model.internal_resistance_table is fleet.internal_resistance_table
+    assert model.polarization_resistance_table is fleet.polarization_resistance_table
+    assert model.internal_resistance == model.internal_resistance_table.lookup(model.soc, model.temperature)
+    r0 = fleet.internal_resistance_table.interp([model.soc], [model.temperature])[0]
+    r1 = fleet.polarization_resistance_table.interp([model.soc], [model.temperature])[0]
+    assert abs(model.internal_resistance - r0) < 1e-12
+    assert abs(model.polarization_resistance - r1) < 1e-12
+
+
+def test_csv_table_bilinear():
+    """CSV加载的 OCV(SOC, T) 表: 标量与批量查询一致，网格点上精确"""
+    content = "soc,0,25,45\n0,300,302,303\n50,380,382,384\n100,398,400,401\n"
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+        f.write(content)
+        path = f.name
+    try:
+        table = LookupTable2D.from_csv(path)
+    finally:
+        os.remove(path)
+
+    assert table.lookup(50.0, 25.0) == 382.0
+    assert abs(table.lookup(25.0, 12.5) - (300 + 302 + 380 + 382) / 4) < 1e-9
+    socs = np.random.default_rng(0).uniform(-10, 110, 200)
+    temperatures = np.random.default_rng(1).uniform(-10, 60, 200)
+    batched = table.interp(socs, temperatures)
+    scalar = [table.lookup(s, t) for s, t in zip(socs.tolist(), temperatures.tolist())]
+    assert np.allclose(batched, scalar, atol=1e-9)
+
+
+if __name__ == "__main__":
+    test_default_tables_match_formulas()
+    test_battery_model_uses_resistance_tables()
+    test_csv_table_bilinear()
+    print("✅ 查找表测试全部通过")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+模型延迟加载测试
+验证导入模型模块和创建延迟加载的 CNNLSTM_RULModel 不会导入 TensorFlow/sklearn、不加载模型文件，
+加载完成前 RUL 使用简单估计，在后台线程中加载后切换到模型预测并记录各阶段耗时
+"""
+
+import sys
+import os
+import subprocess
+import threading
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.cnn_lstm_rul_model import CNNLSTM_RULModel
+from models.rul_inference_service import RULInferenceService
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "battery-charging-simulator", "backend")
+
+
+def test_startup_does_not_import_tensorflow():
+    """导入模型模块并创建服务器启动时使用的对象，不会导入 TensorFlow 和 sklearn (两者合计导入需要数秒)"""
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "from models.battery_model import BatteryModel\n"
+        "from models.rul_model import BatteryRULModel\n"
+        "from models.cnn_lstm_rul_model import CNNLSTM_RULModel\n"
+        "BatteryModel(); BatteryRULModel(); model = CNNLSTM_RULModel(lazy=True)\n"
+        "assert model.load_state == 'pending' and not model.models_ready\n"
+        "print('tensorflow' in sys.modules or 'sklearn' in sys.modules, time.perf_counter() - start)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True,
+                            check=True).stdout.split()
+    assert output[0] == "False"
+    print(f"导入并创建延迟加载的模型耗时 {float(output[1]) * 1000:.0f} ms")
+
+
+def test_background_load():
+    """加载完成前使用简单估计，后台线程加载后使用模型预测"""
+    cwd = os.getcwd()
+    os.chdir(BACKEND_DIR)
+    try:
+        model = CNNLSTM_RULModel(inference_service=RULInferenceService(), lazy=True)
+        history = [{"voltage": 360.0 + i, "soc": 40.0 + i} for i in range(10)]
+        static_features = np.array([10, 98.0, 25.0])
+        assert model.predict_rul(history, static_features) == model._simple_estimate(static_features)
+
+        loader = threading.Thread(target=model.load)
+        loader.start()
+        loader.join()
+    finally:
+        os.chdir(cwd)
+    assert model.models_ready and model.load_state == "ready"
+    assert {"scalers", "cnn_lstm_rul_model_k1.keras", "inference_service", "total"} <= set(model.load_times)
+    assert model.load_times["total"] >= model.load_times["inference_service"]
+    assert model.predict_rul(history, static_features) != model._simple_estimate(static_features)
+
+
+def test_load_without_models():
+    """没有模型文件时加载状态为 unavailable，继续使用简单估计"""
+    model = CNNLSTM_RULModel(model_path="missing.keras", inference_service=RULInferenceService(), lazy=True)
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(BACKEND_DIR))  # 该目录下没有 models/cnn_lstm_rul_model_k*.keras
+    try:
+        ready = model.load()
+    finally:
+        os.chdir(cwd)
+    assert model.load_state in ("unavailable", "failed") and not ready
+    assert not model.models_ready
+
+
+if __name__ == "__main__":
+    test_startup_does_not_import_tensorflow()
+    test_background_load()
+    test_load_without_models()
+    print("✅ 模型延迟加载测试全部通过")
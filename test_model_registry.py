@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+模型注册表测试
+验证同一模型文件只加载一次并由全部持有者共享，引用计数归零后卸载，
+并发请求只加载一次，内存统计，以及电池/控制器数量增加时模型内存保持不变
+"""
+
+import sys
+import os
+import threading
+import time
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.model_registry import ModelRegistry, estimate_model_bytes
+from models.numpy_inference import NumpyRULModel
+from models.rul_inference_service import RULInferenceService
+from models.dynamic_charging_controller import DynamicChargingController
+from models.battery_model import BatteryModel
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "battery-charging-simulator", "backend", "models")
+KERAS_MODELS = [os.path.join(MODEL_DIR, f"cnn_lstm_rul_model_k{i}.keras") for i in range(1, 4)]
+
+
+class CountingLoader:
+    """记录调用次数的加载函数"""
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return NumpyRULModel.from_keras(KERAS_MODELS[0])
+
+
+def test_shared_and_refcounted():
+    """同一个键只加载一次，最后一个句柄释放后卸载"""
+    registry = ModelRegistry()
+    loader = CountingLoader()
+    first = registry.acquire("k1", loader)
+    second = registry.acquire("k1", loader)
+    assert loader.calls == 1 and first.model is second.model
+    assert registry.refcount("k1") == 2
+    first.release()
+    first.release()  # 重复释放无效
+    assert "k1" in registry and registry.refcount("k1") == 1
+    with second:
+        pass
+    assert "k1" not in registry and registry.unloads == 1
+    registry.acquire("k1", loader)
+    assert loader.calls == 2 and registry.loads == 2
+
+
+def test_concurrent_acquire_loads_once():
+    """多个线程同时请求同一个模型，只加载一次"""
+    registry = ModelRegistry()
+    loader = CountingLoader(delay=0.05)
+    handles = []
+    threads = [threading.Thread(target=lambda: handles.append(registry.acquire("k1", loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loader.calls == 1 and registry.refcount("k1") == 8
+    assert len({id(handle.model) for handle in handles}) == 1
+
+
+def test_failed_load_is_not_cached():
+    """加载失败不留下注册表项，下一次请求重新加载"""
+    registry = ModelRegistry()
+
+    def broken():
+        raise IOError("文件损坏")
+
+    try:
+        registry.acquire("k1", broken)
+        raise AssertionError("加载失败应抛出异常")
+    except IOError:
+        pass
+    assert len(registry) == 0
+    assert registry.acquire("k1", CountingLoader()).model is not None
+
+
+def test_memory_metrics():
+    """注册表按模型统计内存占用"""
+    registry = ModelRegistry()
+    handle = registry.acquire("k1", CountingLoader())
+    assert handle.memory_bytes == estimate_model_bytes(handle.model) > 0
+    metrics = registry.metrics()
+    assert metrics["total_memory_bytes"] == handle.memory_bytes
+    assert metrics["models"][0]["refcount"] == 1 and metrics["loads"] == 1
+
+
+def test_memory_flat_across_controllers():
+    """任意数量的控制器/推理服务加载同一模型文件，注册表中只有一份模型"""
+    registry = ModelRegistry()
+    footprints = []
+    for count in (1, 4, 16):
+        services = [RULInferenceService(warmup_batch_sizes=(1,), registry=registry) for _ in range(count)]
+        controllers = [DynamicChargingController(model_path=KERAS_MODELS[0], inference_service=service)
+                       for service in services]
+        assert all(controller.model_available for controller in controllers)
+        assert len(registry) == 1 and registry.metrics()["models"][0]["refcount"] == count
+        footprints.append(registry.metrics()["total_memory_bytes"])
+        # 替换模型时释放旧句柄
+        for service in services:
+            service.set_models([NumpyRULModel.from_keras(KERAS_MODELS[1])])
+        assert len(registry) == 0
+    assert footprints[0] == footprints[1] == footprints[2]
+    assert registry.loads == 3
+
+
+def test_battery_models_share_inference_service():
+    """创建多个电池模型不加载额外的模型副本"""
+    batteries = [BatteryModel() for _ in range(8)]
+    services = {id(battery.dynamic_charging_controller.inference) for battery in batteries}
+    assert len(services) == 1
+
+
+def test_service_reloads_modified_file():
+    """模型文件被覆盖 (修改时间变化) 后重新加载，而不是返回注册表中的旧模型"""
+    registry = ModelRegistry()
+    service = RULInferenceService(warmup_batch_sizes=(1,), registry=registry)
+    assert service.load(KERAS_MODELS[:1])
+    original = service.models[0]
+    mtime = os.path.getmtime(KERAS_MODELS[0])
+    os.utime(KERAS_MODELS[0], (mtime, mtime + 1))
+    try:
+        assert service.load(KERAS_MODELS[:1])
+    finally:
+        os.utime(KERAS_MODELS[0], (mtime, mtime))
+    assert service.models[0] is not original
+    assert len(registry) == 1 and registry.loads == 2 and registry.unloads == 1
+    np.testing.assert_allclose(service.models[0].predict([np.zeros((1, 5, 1)), np.zeros((1, 5, 10))]),
+                               original.predict([np.zeros((1, 5, 1)), np.zeros((1, 5, 10))]))
+
+
+if __name__ == "__main__":
+    test_shared_and_refcounted()
+    test_concurrent_acquire_loads_once()
+    test_failed_load_is_not_cached()
+    test_memory_metrics()
+    test_memory_flat_across_controllers()
+    test_battery_models_share_inference_service()
+    test_service_reloads_modified_file()
+    print("✅ 模型注册表测试全部通过")
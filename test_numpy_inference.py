@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+NumPy 推理引擎测试
+验证从 .keras 导出的权重在 NumPy 前向计算下与 TensorFlow 的输出一致 (误差 < 1e-5)，
+合并的集成模型与逐个计算各折模型的结果一致，
+以及 CNNLSTM_RULModel 在不依赖 Keras 模型的情况下完成集成预测
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.numpy_inference import NumpyRULModel, FusedEnsembleModel, export_keras_weights
+from models.cnn_lstm_rul_model import CNNLSTM_RULModel, TF_AVAILABLE
+from models.rul_inference_service import RULInferenceService
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "battery-charging-simulator", "backend", "models")
+KERAS_MODELS = [os.path.join(MODEL_DIR, f"cnn_lstm_rul_model_k{i}.keras") for i in range(1, 4)]
+
+
+def random_inputs(batch, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 1, (batch, 5, 1)), rng.uniform(0, 1, (batch, 5, 10))
+
+
+def test_export_roundtrip():
+    """导出的 .npz 包含全部权重，加载后与直接从 .keras 加载的结果相同"""
+    with tempfile.TemporaryDirectory() as tmp:
+        npz_path = export_keras_weights(KERAS_MODELS[0], os.path.join(tmp, "k1.npz"))
+        exported = NumpyRULModel.from_npz(npz_path)
+    assert exported.meta["cnn_input_shape"] == [5, 10]
+    lstm_input, cnn_input = random_inputs(16)
+    reference = NumpyRULModel.from_keras(KERAS_MODELS[0]).predict([lstm_input, cnn_input])
+    np.testing.assert_array_equal(exported.predict([lstm_input, cnn_input]), reference)
+    assert reference.shape == (16, 1)
+
+
+def test_matches_tensorflow():
+    """三个K折模型的 NumPy 前向计算与 Keras predict 误差 < 1e-5 (float32 和 float64)"""
+    if not TF_AVAILABLE:
+        print("TensorFlow 不可用，跳过与 Keras 的对比")
+        return
+    from tensorflow.keras.models import load_model
+    lstm_input, cnn_input = random_inputs(64, seed=1)
+    for path in KERAS_MODELS:
+        expected = load_model(path).predict([lstm_input, cnn_input], verbose=0)
+        for dtype in (np.float32, np.float64):
+            actual = NumpyRULModel.from_keras(path, dtype=dtype).predict([lstm_input, cnn_input])
+            np.testing.assert_allclose(actual, expected, atol=1e-5)
+        # 单样本与批量的结果一致
+        single = NumpyRULModel.from_keras(path).predict([lstm_input[:1], cnn_input[:1]])
+        np.testing.assert_allclose(single, expected[:1], atol=1e-5)
+
+
+def test_fused_ensemble_matches_folds():
+    """合并的集成模型一次返回各折预测值，与逐个计算的结果一致"""
+    folds = [NumpyRULModel.from_keras(path) for path in KERAS_MODELS]
+    ensemble = FusedEnsembleModel(folds)
+    lstm_input, cnn_input = random_inputs(32, seed=2)
+    expected = np.hstack([model.predict([lstm_input, cnn_input]) for model in folds])
+    actual = ensemble.predict_folds(lstm_input, cnn_input)
+    assert actual.shape == (32, 3)
+    np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+
+def test_rul_model_uses_numpy_engine():
+    """CNNLSTM_RULModel 加载 NumPy 推理引擎并完成集成预测"""
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(MODEL_DIR))
+    try:
+        model = CNNLSTM_RULModel()
+    finally:
+        os.chdir(cwd)
+    assert model.is_trained and len(model.models) == 3
+    assert all(isinstance(m, NumpyRULModel) for m in model.models)
+    assert isinstance(model.ensemble, FusedEnsembleModel) and model.ensemble.folds == 3
+    history = [{"voltage": 360.0 + i, "soc": 40.0 + i} for i in range(10)]
+    static_features = np.array([10, 98.0, 25.0])
+    rul = model.predict_rul(history, static_features)
+    assert np.isfinite(rul)
+    assert rul != model._simple_estimate(static_features)
+
+    # 共享推理服务 (合并的集成模型) 与逐个调用各折模型的置信度加权结果相同
+    service, model.inference = model.inference, RULInferenceService()
+    assert np.isclose(model.predict_rul(history, static_features), rul, rtol=1e-5)
+    model.inference = service
+
+
+if __name__ == "__main__":
+    test_export_roundtrip()
+    test_matches_tensorflow()
+    test_fused_ensemble_matches_folds()
+    test_rul_model_uses_numpy_engine()
+    print("✅ NumPy 推理引擎测试全部通过")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+充电策略参数扫描测试
+验证并行扫描结果与单次离线仿真一致，并能导出CSV结果表
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+import numpy as np
+
+from models.headless_simulator import HeadlessChargeSimulator
+from models.parameter_sweep import run_parameter_sweep, save_sweep_results, RESULT_COLUMNS
+
+
+def test_sweep_matches_headless_simulation():
+    """扫描结果与按相同参数调用 update_charging_params 的离线仿真一致"""
+    result = run_parameter_sweep([0.5, 1.0], [395.0, 400.0], [25.0, 35.0], [40.0, 70.0], max_workers=2)
+    assert result["completed"].all()
+    assert sum(stats["sessions"] for stats in result["worker_stats"]) == 16
+
+    simulator = HeadlessChargeSimulator(dt=1.0)
+    for index in (0, 7, 15):
+        simulator.model.update_charging_params({"cc_current": result["cc_current"][index],
+                                                "cv_voltage": result["cv_voltage"][index]})
+        session = simulator.run(initial_soc=result["initial_soc"][index],
+                                ambient_temperature=result["ambient_temperature"][index])
+        assert session["charge_time"] == result["charge_time"][index]
+        charging = session["charging_mode"][1:] != 0
+        assert abs(session["temperature"][1:][charging].max() - result["peak_temperature"][index]) < 1e-6
+
+    # 电流越大充电越快，但温升越高
+    fast = (result["cc_current"] == 1.0) & (result["initial_soc"] == 40.0)
+    slow = (result["cc_current"] == 0.5) & (result["initial_soc"] == 40.0)
+    assert result["charge_time"][fast].mean() < result["charge_time"][slow].mean()
+    assert result["peak_temperature"][fast].mean() > result["peak_temperature"][slow].mean()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "sweep.csv")
+        save_sweep_results(result, path)
+        table = np.loadtxt(path, delimiter=",", skiprows=1)
+        assert table.shape == (16, len(RESULT_COLUMNS))
+
+
+if __name__ == "__main__":
+    test_sweep_matches_headless_simulation()
+
+    result = run_parameter_sweep(np.linspace(0.25, 1.0, 4), [395.0, 400.0], [15.0, 25.0, 35.0], [10.0, 30.0, 50.0, 70.0])
+    for stats in result["worker_stats"]:
+        print(f"工作进程 {stats['pid']}: {stats['sessions']} 次仿真, {stats['throughput']:.1f} 次/秒")
+    print(f"{len(result['charge_time'])} 个组合, 总耗时 {result['elapsed']:.2f} 秒")
+    print("✅ 参数扫描测试全部通过")
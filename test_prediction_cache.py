@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+RUL 预测缓存测试
+验证量化键的容差、LRU 淘汰和 TTL 过期，以及 CNNLSTM_RULModel 对几乎不变的窗口命中缓存、
+同一批量中相同窗口只计算一次、替换模型后缓存失效
+"""
+
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.prediction_cache import QuantizedLRUCache
+from models.cnn_lstm_rul_model import CNNLSTM_RULModel
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "battery-charging-simulator", "backend")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_quantized_keys():
+    """差异小于半个量化步长的输入得到相同的键，前缀不同则键不同"""
+    cache = QuantizedLRUCache(tolerance=0.01)
+    base = np.full((1, 5, 1), 0.5)
+    same = cache.keys(0, base, base)[0]
+    assert cache.keys(0, base + 0.004, base)[0] == same
+    assert cache.keys(0, base + 0.006, base)[0] != same
+    assert cache.keys(1, base, base)[0] != same
+    batch = cache.keys(0, np.stack([base[0], base[0] + 0.2]), np.stack([base[0], base[0]]))
+    assert batch[0] == same and batch[1] != same
+
+
+def test_lru_and_ttl():
+    clock = FakeClock()
+    cache = QuantizedLRUCache(max_size=2, ttl=10.0, clock=clock)
+    cache.put("a", 1.0)
+    cache.put("b", 2.0)
+    assert cache.get("a") == 1.0  # a 变为最近使用
+    cache.put("c", 3.0)           # 淘汰 b
+    assert cache.get("b") is None and cache.get("c") == 3.0
+    clock.now = 10.5
+    assert cache.get("a") is None
+    metrics = cache.metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["evictions"], metrics["expirations"]) == (2, 2, 1, 1)
+    assert metrics["size"] == 1
+
+
+def test_rul_model_cache():
+    """几乎不变的历史窗口命中缓存，批量中相同的窗口只计算一次，替换模型后不再命中"""
+    cwd = os.getcwd()
+    os.chdir(BACKEND_DIR)
+    try:
+        model = CNNLSTM_RULModel()
+    finally:
+        os.chdir(cwd)
+    static_features = np.array([10, 98.0, 25.0])
+    history = [{"voltage": 360.0 + i, "soc": 40.0 + i} for i in range(10)]
+    rul = model.predict_rul(history, static_features)
+    assert model.cache_metrics()["misses"] == 1
+
+    # 空闲阶段: 电压的变化远小于量化步长
+    idle = [dict(h, voltage=h["voltage"] + 1e-6) for h in history]
+    assert model.predict_rul(idle, static_features) == rul
+    assert model.cache_metrics()["hits"] == 1
+
+    # 多个会话的窗口相同: 一次批量中只计算一次
+    lstm_input, cnn_input = model.prepare_rul_inputs([{"voltage": 350.0 + i, "soc": 20.0 + 2 * i} for i in range(10)])
+    ruls = model.predict_rul_batch(np.repeat(lstm_input, 4, axis=0), np.repeat(cnn_input, 4, axis=0))
+    assert len(set(ruls.tolist())) == 1
+    metrics = model.cache_metrics()
+    assert metrics["deduplicated"] == 3 and metrics["misses"] == 2 and metrics["size"] == 2
+
+    # 替换模型后缓存键变化，重新计算
+    model.inference.set_models(model.inference.models)
+    assert np.isclose(model.predict_rul(history, static_features), rul)
+    assert model.cache_metrics()["misses"] == 3
+
+
+if __name__ == "__main__":
+    test_quantized_keys()
+    test_lru_and_ttl()
+    test_rul_model_cache()
+    print("✅ RUL 预测缓存测试全部通过")
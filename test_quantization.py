@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+RUL 模型量化变体测试
+验证 int8 (按输出通道缩放) 和 float16 权重的量化误差、文件体积，
+量化模型在内存中保持量化后的权重并直接计算 (预测与 float32 模型一致)，以及推理服务加载量化变体
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.numpy_inference import (NumpyRULModel, WEIGHT_NAMES, QUANTIZED_KERNELS, quantize_weights,
+                                    dequantize_weights, export_keras_weights, export_quantized_weights, quantized_path)
+from models.rul_inference_service import RULInferenceService
+from models.model_registry import estimate_model_bytes
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "battery-charging-simulator", "backend", "models")
+KERAS_MODELS = [os.path.join(MODEL_DIR, f"cnn_lstm_rul_model_k{i}.keras") for i in range(1, 4)]
+
+
+def random_inputs(batch, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 1, (batch, 5, 1)), rng.uniform(0, 1, (batch, 5, 10))
+
+
+def test_int8_roundtrip_error():
+    """int8 权重按输出通道缩放，反量化误差不超过半个量化步长，偏置保持 float32"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with np.load(export_keras_weights(KERAS_MODELS[0], os.path.join(tmp, "k1.npz"))) as data:
+            weights = {name: data[name] for name in WEIGHT_NAMES}
+    quantized = quantize_weights(weights, "int8")
+    for name in QUANTIZED_KERNELS:
+        assert quantized[name].dtype == np.int8
+        assert quantized[name + "_scale"].shape == (weights[name].shape[-1],)
+    assert quantized["conv_bias"].dtype == np.float32
+    restored = dequantize_weights(quantized, "int8")
+    for name in QUANTIZED_KERNELS:
+        error = np.abs(restored[name] - weights[name])
+        assert np.all(error <= quantized[name + "_scale"] / 2 + 1e-7)
+    np.testing.assert_array_equal(restored["conv_bias"], weights["conv_bias"])
+    assert "conv_kernel_scale" not in restored
+
+
+def test_quantized_files_are_smaller():
+    """量化后的 .npz 小于 float32 权重文件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = export_keras_weights(KERAS_MODELS[0], os.path.join(tmp, "k1.npz"))
+        sizes = {mode: os.path.getsize(export_quantized_weights(KERAS_MODELS[0], mode, quantized_path(base, mode)))
+                 for mode in ("float16", "int8")}
+        float32_size = os.path.getsize(base)
+    assert quantized_path(base, "int8").endswith("k1.int8.npz")
+    assert sizes["int8"] < sizes["float16"] < float32_size
+
+
+def test_quantized_predictions_match_float32():
+    """量化模型与 float32 模型的预测值接近 (归一化容量)"""
+    lstm_input, cnn_input = random_inputs(64, seed=3)
+    for path in KERAS_MODELS:
+        reference = NumpyRULModel.from_keras(path).predict([lstm_input, cnn_input])
+        float16 = NumpyRULModel.from_keras(path, quantization="float16")
+        int8 = NumpyRULModel.from_keras(path, quantization="int8")
+        assert float16.meta["quantization"] == "float16" and int8.meta["quantization"] == "int8"
+        np.testing.assert_allclose(float16.predict([lstm_input, cnn_input]), reference, atol=1e-3)
+        np.testing.assert_allclose(int8.predict([lstm_input, cnn_input]), reference, atol=2e-2)
+
+
+def test_quantized_weights_stay_quantized():
+    """加载后不反量化: float16 变体以半精度计算，int8 变体的核保持 int8，内存占用小于 float32 模型"""
+    lstm_input, cnn_input = random_inputs(4, seed=5)
+    reference = NumpyRULModel.from_keras(KERAS_MODELS[0])
+    float16 = NumpyRULModel.from_keras(KERAS_MODELS[0], quantization="float16")
+    int8 = NumpyRULModel.from_keras(KERAS_MODELS[0], quantization="int8")
+    assert float16.dtype == np.float16 and float16.conv_matrix.dtype == np.float16
+    assert float16.predict([lstm_input, cnn_input]).dtype == np.float16
+    for name in ("lstm_kernel", "lstm_recurrent_kernel", "conv_matrix", "hidden_kernel_lstm", "hidden_kernel_cnn",
+                 "output_kernel"):
+        assert getattr(int8, name).dtype == np.int8
+    assert all(int8.weights[name].dtype == np.int8 for name in QUANTIZED_KERNELS)
+    assert int8.predict([lstm_input, cnn_input]).dtype == np.float32
+    assert estimate_model_bytes(int8) < estimate_model_bytes(float16) < estimate_model_bytes(reference)
+
+
+def test_service_loads_quantized_variant():
+    """推理服务的 numpy 后端加载量化变体，tensorflow 后端拒绝量化选项"""
+    service = RULInferenceService(warmup_batch_sizes=(1,))
+    assert service.load(KERAS_MODELS, quantization="int8")
+    assert service.backend == "numpy" and service.folds == 3
+    assert all(model.meta["quantization"] == "int8" for model in service.models)
+    assert service.ensemble.conv_matrix.dtype == np.int8 and service.ensemble.lstm_recurrent_kernel.dtype == np.int8
+    lstm_input, cnn_input = random_inputs(8, seed=4)
+    reference = RULInferenceService(warmup_batch_sizes=(1,))
+    reference.load(KERAS_MODELS)
+    np.testing.assert_allclose(service.predict_folds(lstm_input, cnn_input),
+                               reference.predict_folds(lstm_input, cnn_input), atol=2e-2)
+    assert not RULInferenceService().load(KERAS_MODELS, backend="tensorflow", quantization="int8")
+
+
+if __name__ == "__main__":
+    test_int8_roundtrip_error()
+    test_quantized_files_are_smaller()
+    test_quantized_predictions_match_float32()
+    test_quantized_weights_stay_quantized()
+    test_service_loads_quantized_variant()
+    print("✅ 量化变体测试全部通过")
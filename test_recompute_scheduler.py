@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+RUL 重新计算调度测试
+验证间隔、状态变化阈值和充电阶段切换触发重新计算，以及一次完整充电中
+重新计算的次数远少于仿真周期数
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.recompute_scheduler import RecomputeScheduler
+from models.battery_model import BatteryModel
+from models.sim_clock import SimulatedClock
+
+
+def state(soc=50.0, temperature=25.0, internal_resistance=0.1, charging_mode="cc", is_charging=True):
+    return {"soc": soc, "temperature": temperature, "internal_resistance": internal_resistance,
+            "charging_mode": charging_mode, "is_charging": is_charging, "is_discharging": False}
+
+
+def test_triggers():
+    scheduler = RecomputeScheduler(interval=60.0, soc_delta=1.0, temperature_delta=1.0, internal_resistance_delta=0.002)
+    assert scheduler.due(state(), 0.0) == "initial"
+    scheduler.mark(state(), 0.0, "initial")
+    assert scheduler.due(state(soc=50.9, temperature=25.5, internal_resistance=0.101), 30.0) is None
+    assert scheduler.due(state(soc=51.0), 30.0) == "soc"
+    assert scheduler.due(state(temperature=23.9), 30.0) == "temperature"
+    assert scheduler.due(state(internal_resistance=0.103), 30.0) == "internal_resistance"
+    assert scheduler.due(state(charging_mode="cv"), 1.0) == "phase"
+    assert scheduler.due(state(is_charging=False), 1.0) == "phase"
+    assert scheduler.due(state(), 60.0) == "interval"
+
+    # 变化量相对于上次计算时的状态累计
+    scheduler.mark(state(soc=50.6), 30.0, "soc")
+    assert scheduler.due(state(soc=51.2), 40.0) is None
+    assert scheduler.due(state(soc=51.6), 40.0) == "soc"
+    scheduler.reset()
+    assert scheduler.due(state(), 41.0) == "initial"
+    assert scheduler.metrics()["recomputations"] == 2
+
+
+def test_full_charge_recomputes_rarely():
+    """1秒周期的完整充电过程: 每个周期都发布结果，但只有少数周期重新计算，阶段切换时必定重新计算"""
+    clock = SimulatedClock(0.0)
+    model = BatteryModel(clock=clock, persist_records=False)
+    model.reset()
+    model.start_charging()
+    scheduler = RecomputeScheduler()
+    ticks = 0
+    phase_changes = 0
+    previous_mode = None
+    while model.is_charging and ticks < 20000:
+        clock.advance(1.0)
+        snapshot = model.update()
+        ticks += 1
+        reason = scheduler.due(snapshot, model.simulated_time)
+        if previous_mode is not None and snapshot["charging_mode"] != previous_mode:
+            phase_changes += 1
+            assert reason == "phase"
+        if reason is not None:
+            scheduler.mark(snapshot, model.simulated_time, reason)
+        previous_mode = snapshot["charging_mode"]
+
+    assert model.simulated_time == ticks
+    recomputations = scheduler.metrics()["recomputations"]
+    assert phase_changes >= 2
+    assert recomputations < ticks / 10, f"{recomputations} 次重新计算 / {ticks} 个周期"
+    print(f"完整充电 {ticks} 个周期，重新计算 {recomputations} 次: {scheduler.metrics()['reasons']}")
+
+
+def test_simulated_time_in_checkpoint():
+    clock = SimulatedClock(0.0)
+    model = BatteryModel(clock=clock, persist_records=False)
+    for _ in range(10):
+        clock.advance(2.0)
+        model.update()
+    restored = BatteryModel(clock=SimulatedClock(), persist_records=False)
+    restored.restore(model.checkpoint())
+    assert restored.simulated_time == model.simulated_time == 20.0
+
+
+if __name__ == "__main__":
+    test_triggers()
+    test_full_charge_recomputes_rarely()
+    test_simulated_time_in_checkpoint()
+    print("✅ RUL 重新计算调度测试全部通过")
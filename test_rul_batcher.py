@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+RUL 微批处理队列测试
+验证多个会话的并发请求被合并成批量推理、结果与逐个调用 predict_rul 一致，
+以及批量大小上限、历史不足时的回退和直方图统计
+"""
+
+import sys
+import os
+import asyncio
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.cnn_lstm_rul_model import CNNLSTM_RULModel
+from models.rul_batcher import RULMicroBatcher, Histogram
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "battery-charging-simulator", "backend")
+
+
+def load_rul_model():
+    cwd = os.getcwd()
+    os.chdir(BACKEND_DIR)
+    try:
+        return CNNLSTM_RULModel()
+    finally:
+        os.chdir(cwd)
+
+
+def session_history(seed):
+    rng = np.random.default_rng(seed)
+    return [{"voltage": v, "soc": s} for v, s in zip(rng.uniform(340, 395, 10), np.sort(rng.uniform(10, 90, 10)))]
+
+
+def test_concurrent_sessions_are_batched():
+    """并发请求合并为批量推理，结果与逐个预测一致"""
+    model = load_rul_model()
+    assert model.is_trained
+    model.cache = None  # 每个请求都经过批量推理
+    histories = [session_history(seed) for seed in range(40)]
+    static_features = np.array([10, 98.0, 25.0])
+    # 先逐个预测 (同时拟合缩放器)
+    expected = [model.predict_rul(history, static_features) for history in histories]
+
+    async def run():
+        batcher = RULMicroBatcher(model, max_batch_size=16, max_wait_ms=20.0)
+        results = await asyncio.gather(*(batcher.predict_rul(h, static_features) for h in histories))
+        await batcher.stop()
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+    np.testing.assert_allclose(results, expected, rtol=1e-5)
+    metrics = batcher.metrics()
+    assert metrics["requests"] == 40
+    assert metrics["batches"] == 3, "40 个请求按上限 16 分为 16+16+8"
+    assert metrics["batch_size"]["buckets"][4] == (16, 3)
+    assert metrics["queue_depth"]["count"] == 3 and metrics["pending"] == 0
+    assert not batcher.running
+
+
+def test_single_request_waits_at_most_max_wait():
+    """单个请求在等待超时后独立成批"""
+    model = load_rul_model()
+    static_features = np.array([10, 98.0, 25.0])
+
+    async def run():
+        batcher = RULMicroBatcher(model, max_batch_size=64, max_wait_ms=1.0)
+        first = await batcher.predict_rul(session_history(1), static_features)
+        second = await batcher.predict_rul(session_history(2), static_features)
+        await batcher.stop()
+        return batcher, first, second
+
+    batcher, first, second = asyncio.run(run())
+    assert np.isfinite(first) and np.isfinite(second)
+    assert batcher.batches == 2 and batcher.batch_size.sum == 2
+
+
+def test_insufficient_history_falls_back():
+    """历史数据不足时直接返回简单估计值，不进入队列"""
+    model = load_rul_model()
+    static_features = np.array([100, 0.9, 25.0])
+
+    async def run():
+        batcher = RULMicroBatcher(model)
+        return batcher, await batcher.predict_rul(session_history(0)[:3], static_features)
+
+    batcher, rul = asyncio.run(run())
+    assert rul == model._simple_estimate(static_features)
+    assert not batcher.running and batcher.requests == 0
+
+
+def test_histogram_buckets():
+    histogram = Histogram(bounds=(1, 4, 16))
+    for value in (1, 3, 4, 20):
+        histogram.observe(value)
+    exported = histogram.to_dict()
+    assert exported["buckets"] == [(1, 1), (4, 3), (16, 3), ("+Inf", 4)]
+    assert exported["count"] == 4 and exported["sum"] == 28
+
+
+if __name__ == "__main__":
+    test_concurrent_sessions_are_batched()
+    test_single_request_waits_at_most_max_wait()
+    test_insufficient_history_falls_back()
+    test_histogram_buckets()
+    print("✅ RUL 微批处理队列测试全部通过")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+RUL 共享推理服务测试
+验证 NumPy 后端与编译的 TensorFlow 后端结果一致、固定输入签名不会因批量大小变化重新追踪，
+以及 CNNLSTM_RULModel 和 DynamicChargingController 共用同一个服务
+"""
+
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models.numpy_inference import NumpyRULModel, FusedEnsembleModel
+from models.rul_inference_service import RULInferenceService, get_inference_service, TF_AVAILABLE
+from models.cnn_lstm_rul_model import CNNLSTM_RULModel
+from models.dynamic_charging_controller import DynamicChargingController
+from models.history_buffer import HistoryRingBuffer
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "battery-charging-simulator", "backend", "models")
+KERAS_MODELS = [os.path.join(MODEL_DIR, f"cnn_lstm_rul_model_k{i}.keras") for i in range(1, 4)]
+
+
+def random_inputs(batch, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 1, (batch, 5, 1)), rng.uniform(0, 1, (batch, 5, 10))
+
+
+def test_numpy_backend():
+    """NumPy 后端使用合并的集成模型，单样本与批量结果一致"""
+    service = RULInferenceService()
+    assert not service.ready
+    assert service.load(KERAS_MODELS)
+    assert service.ready and service.backend == "numpy" and service.folds == 3
+    assert isinstance(service.ensemble, FusedEnsembleModel)
+    assert service.cnn_input_shape == (5, 10)
+
+    lstm_input, cnn_input = random_inputs(8)
+    expected = FusedEnsembleModel([NumpyRULModel.from_keras(path) for path in KERAS_MODELS]) \
+        .predict_folds(lstm_input, cnn_input)
+    batch = service.predict_folds(lstm_input, cnn_input)
+    assert batch.shape == (8, 3)
+    np.testing.assert_allclose(batch, expected, atol=1e-6)
+    np.testing.assert_allclose(service.predict_one(lstm_input[:1], cnn_input[:1]), expected[0], atol=1e-6)
+
+
+def test_tensorflow_backend_is_compiled_once():
+    """tf.function 后端与 NumPy 后端一致，预热后任意批量大小都不再重新追踪"""
+    if not TF_AVAILABLE:
+        print("TensorFlow 不可用，跳过编译推理测试")
+        return
+    service = RULInferenceService()
+    assert service.load(KERAS_MODELS, backend="tensorflow")
+    assert service.backend == "tensorflow" and service.ensemble is None
+    single, batch = service._functions
+    traces = (single.experimental_get_tracing_count(), batch.experimental_get_tracing_count())
+    assert traces == (1, 1), "加载时应已完成预热追踪"
+
+    reference = RULInferenceService()
+    reference.load(KERAS_MODELS)
+    for size in (1, 3, 17, 64):
+        lstm_input, cnn_input = random_inputs(size, seed=size)
+        np.testing.assert_allclose(service.predict_folds(lstm_input, cnn_input),
+                                   reference.predict_folds(lstm_input, cnn_input), atol=1e-5)
+    assert (single.experimental_get_tracing_count(), batch.experimental_get_tracing_count()) == traces
+
+
+def test_callers_share_one_service():
+    """RUL 模型和动态充电控制器共用进程内的推理服务"""
+    service = get_inference_service()
+    assert get_inference_service() is service
+
+    controller = DynamicChargingController(inference_service=RULInferenceService())
+    state = {"soc": 50.0, "max_charging_current": 100.0, "temperature": 25.0}
+    history = HistoryRingBuffer(10, fields=("soc",))
+    history.extend(np.full((10, 1), 50.0))
+    assert not controller.model_available
+    assert controller.adjust_cc_parameters(state, history) == {"current": 100.0}
+
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(MODEL_DIR))
+    try:
+        model = CNNLSTM_RULModel()
+    finally:
+        os.chdir(cwd)
+    controller = DynamicChargingController()
+    assert model.inference is service and controller.inference is service
+    assert service.ready and model.ensemble is service.ensemble
+    assert controller.model_available
+    assert controller.adjust_cc_parameters(state, history) == {"current": 85.0}
+
+
+if __name__ == "__main__":
+    test_numpy_backend()
+    test_tensorflow_backend_is_compiled_once()
+    test_callers_share_one_service()
+    print("✅ RUL 共享推理服务测试全部通过")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+多单体串联电池包模型测试
+验证单体一致时与集总模型等价，以及单体不一致时的并联分流和被动均衡
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+import numpy as np
+
+from models.battery_model import BatteryModel
+from models.series_pack import SeriesPackModel
+
+
+def test_uniform_pack_matches_lumped_model():
+    """单体参数一致时，恒流充电段的整包电压、SOC和温度与 BatteryModel 一致
+
+    (BatteryModel 的整包电压会被钳位到 max_voltage，故只比较钳位前的 CC 阶段)
+    """
+    pack = SeriesPackModel(soc=30.0, capacity_spread=0.0, resistance_spread=0.0)
+    pack.balancing_enabled = False
+    model = BatteryModel(cell_pack=pack)
+    model.soc = 30.0
+    pack.reset(30.0)
+    model.is_charging = True
+    model._switch_charging_mode("cc")
+
+    for _ in range(600):
+        model.update(elapsed_time=1.0)
+        assert abs(pack.pack_voltage - model.voltage) < 1e-6
+        assert np.allclose(pack.soc, model.soc, atol=1e-9)
+        assert np.allclose(pack.temperature, model.temperature, atol=1e-9)
+
+    state = model.get_state()
+    assert state["cell_voltage_spread"] < 1e-9
+
+
+def test_parallel_split_and_balancing():
+    """并联单体电流之和等于整包电流；被动均衡减小单体间SOC差异"""
+    pack = SeriesPackModel(series=100, parallel=4, soc=60.0, soc_spread=1.0, seed=7)
+    pack.step(-100.0, 1.0)
+    group_current = pack.current.sum(axis=1)
+    assert np.allclose(group_current[~pack.balancing], -100.0)
+
+    balanced = SeriesPackModel(series=20, parallel=2, soc=60.0, soc_spread=5.0, seed=3)
+    unbalanced = SeriesPackModel(series=20, parallel=2, soc=60.0, soc_spread=5.0, seed=3)
+    balanced.balancing_current = 2.0
+    unbalanced.balancing_enabled = False
+    for _ in range(3600):
+        balanced.step(0.0, 10.0)
+        unbalanced.step(0.0, 10.0)
+    assert balanced.get_statistics()["cell_voltage_spread"] < unbalanced.get_statistics()["cell_voltage_spread"]
+
+
+if __name__ == "__main__":
+    test_uniform_pack_matches_lumped_model()
+    test_parallel_split_and_balancing()
+
+    pack = SeriesPackModel(series=100, parallel=4, soc=50.0, seed=1)
+    steps = 10000
+    start = time.perf_counter()
+    for _ in range(steps):
+        pack.step(80.0, 1.0)
+    elapsed = time.perf_counter() - start
+    print(f"100S×4P 单步耗时 {elapsed / steps * 1e6:.1f} µs, 单体压差 {pack.get_statistics()['cell_voltage_spread'] * 1000:.1f} mV")
+    print("✅ 串联电池包模型测试全部通过")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+充电遥测数据存储测试
+验证遥测表以 (record_id, t) 为聚簇主键 (WITHOUT ROWID)，时间范围查询直接返回按时间排序的 NumPy 数组
+并使用主键检索，批量追加速度不低于 10 万样本/秒，充电过程中每个周期记录一个样本，以及删除充电记录时删除其遥测数据
+(排队中的遥测样本不会在删除后重新写入)
+"""
+
+import sys
+import os
+import time
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), "battery-charging-simulator", "backend"))
+
+from models import database
+from models.battery_model import BatteryModel
+from models.db_writer import DatabaseWriter, get_db_writer
+from models.sim_clock import SimulatedClock
+from database_test_support import TemporaryDatabase, new_record
+
+
+def samples(count, t0=0.0):
+    t = t0 + np.arange(count, dtype=np.float64)
+    return np.column_stack([t, t * 0.01, 3.7 + t * 1e-4, np.full(count, 2.0), 25.0 + t * 1e-3])
+
+
+def test_schema_and_range_query():
+    """主键聚簇存储；范围查询使用主键检索，返回按时间排序的数组，相同时间的样本覆盖旧值"""
+    with TemporaryDatabase():
+        conn = database.get_db_connection()
+        sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'charging_telemetry'").fetchone()[0]
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT t, soc FROM charging_telemetry WHERE record_id = 1 AND t >= 0 AND t < 10"))
+        conn.close()
+        assert "WITHOUT ROWID" in sql
+        assert "PRIMARY KEY" in plan
+
+        data = samples(100)
+        # 乱序追加，另一条记录的数据不影响查询
+        assert database.append_telemetry(1, data[50:]) == 50
+        assert database.append_telemetry(1, data[:50]) == 50
+        database.append_telemetry(2, samples(10))
+        database.append_telemetry(1, [(10.0, 99.0, 4.2, 1.0, 30.0)])
+
+        result = database.get_telemetry(1, start=5, end=20)
+        assert set(result) == {"t", "soc", "voltage", "current", "temperature"}
+        assert all(isinstance(values, np.ndarray) and values.dtype == np.float64 for values in result.values())
+        assert np.array_equal(result["t"], np.arange(5, 20, dtype=np.float64))
+        assert result["soc"][5] == 99.0
+        assert np.allclose(result["voltage"][:5], data[5:10, 2])
+
+        everything = database.get_telemetry(1, columns=("soc",))
+        assert set(everything) == {"t", "soc"} and everything["t"].size == 100
+        assert database.get_telemetry(3)["t"].size == 0
+
+
+def test_ingest_rate():
+    """批量追加至少 10 万样本/秒"""
+    with TemporaryDatabase():
+        data = samples(200_000)
+        start = time.perf_counter()
+        database.append_telemetry(1, data)
+        rate = data.shape[0] / (time.perf_counter() - start)
+        print(f"遥测批量追加: {rate:.0f} 样本/秒")
+        assert rate >= 100_000
+        assert database.get_telemetry(1, start=1000, end=2000)["t"].size == 1000
+
+
+def test_charging_session_telemetry():
+    """充电过程中每个周期记录一个样本，随充电记录写入；删除充电记录时删除遥测数据"""
+    with TemporaryDatabase():
+        clock = SimulatedClock(1_700_000_000.0)
+        model = BatteryModel(clock=clock)
+        model.reset()
+        record_id = model.start_charging()
+        for _ in range(120):
+            clock.advance(1.0)
+            model.update()
+        model.stop_charging()
+        assert get_db_writer().flush(5.0)
+
+        telemetry = database.get_telemetry(record_id)
+        assert telemetry["t"].size >= 120
+        assert np.all(np.diff(telemetry["t"]) > 0)
+        assert telemetry["t"][-1] == clock()
+        assert telemetry["soc"][-1] == model.soc
+        assert np.all(np.diff(telemetry["soc"]) >= 0)
+        assert model.telemetry_buffer == []
+
+        assert database.delete_charging_record(record_id)
+        assert database.get_telemetry(record_id)["t"].size == 0
+
+
+def test_writer_telemetry_follows_records():
+    """后台写入的遥测样本只写入存在的记录: 同一批次中新插入的记录正常写入，已删除的记录不再出现遥测数据"""
+    with TemporaryDatabase():
+        first = database.add_charging_record(new_record())
+        writer = DatabaseWriter(flush_interval=0.2)
+        blocker = database.get_db_connection(write=True)
+        writer.append_telemetry(first, samples(10))
+        second = writer.insert_charging_record(new_record())
+        writer.append_telemetry(second, samples(10))
+        blocker.close()
+        assert writer.flush(5.0)
+        assert database.get_telemetry(first)["t"].size == 10
+        assert database.get_telemetry(second)["t"].size == 10
+
+        assert database.delete_charging_record(second)
+        writer.append_telemetry(second, samples(10, t0=10.0))
+        assert writer.stop(5.0)
+        assert writer.failed == 0
+        assert database.get_telemetry(second)["t"].size == 0
+
+
+if __name__ == "__main__":
+    test_schema_and_range_query()
+    test_ingest_rate()
+    test_charging_session_telemetry()
+    test_writer_telemetry_follows_records()
+    print("✅ 充电遥测数据存储测试全部通过")